@@ -0,0 +1,113 @@
+"""
+Unit tests for batch_runner utility module.
+"""
+import unittest
+import os
+import json
+import time
+import tempfile
+import shutil
+from utils.batch_runner import parse_batch_config, load_batch_config, run_batch, RunLock, main
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for TOML-driven batch runs."""
+
+    def setUp(self):
+        """Set up two roots with old and new venvs and a config file."""
+        self.test_dir = tempfile.mkdtemp()
+        self.state_dir = os.path.join(self.test_dir, "state")
+        old = time.time() - 100 * 86400
+        self.old_venvs = []
+        for root in ("work", "scratch"):
+            for name in ("old1", "old2", "fresh"):
+                venv_path = os.path.join(self.test_dir, root, name, "venv")
+                os.makedirs(venv_path)
+                with open(os.path.join(venv_path, "pyvenv.cfg"), "w") as f:
+                    f.write("version = 3.11.7\n")
+                if name != "fresh":
+                    os.utime(venv_path, (old, old))
+                    self.old_venvs.append(venv_path)
+        self.config_path = os.path.join(self.test_dir, "venv_remover.toml")
+        self._write_config()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write_config(self):
+        """Write a config with one target per root."""
+        work, scratch = (os.path.join(self.test_dir, root).replace("\\", "/") for root in ("work", "scratch"))
+        state = self.state_dir.replace("\\", "/")
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write(f'dry_run = false\nworkers = 2\nlock_path = "{state}/batch.lock"\n'
+                    f'results_path = "{state}/results.jsonl"\nscan_result_path = "{state}/scan.vrs"\n\n'
+                    f'[[targets]]\nroots = ["{work}"]\ndays_unused = 30\nmin_size_mb = 0\n\n'
+                    f'[[targets]]\nroots = ["{scratch}"]\npolicy = "age_days > 30 and project_name == \'old1\'"\n')
+
+    def test_parse_config(self):
+        """Test defaults, policy filling and rejection of invalid settings."""
+        config = load_batch_config(self.config_path)
+        self.assertEqual((config["dry_run"], config["workers"], config["time_budget_minutes"]), (False, 2, 0.0))
+        self.assertEqual(config["targets"][0]["policy"], "age_days > 30 and size_mb > 0")
+        self.assertEqual(config["targets"][1]["artifact_types"], ["venv"])
+        target = {"roots": ["/tmp"]}
+        for bad in ({"targets": []}, {"wrokers": 2, "targets": [target]}, {"workers": "2", "targets": [target]},
+                    {"dry_run": 1, "targets": [target]}, {"targets": [{"roots": []}]},
+                    {"targets": [{"roots": ["/tmp"], "policy": "age_days >"}]},
+                    {"targets": [{"roots": ["/tmp"], "artifact_types": ["bogus"]}]}):
+            with self.assertRaises(ValueError):
+                parse_batch_config(bad)
+
+    def test_run_deletes_per_target_policy(self):
+        """Test that each target's policy decides and results are saved."""
+        summary = run_batch(load_batch_config(self.config_path))
+        self.assertEqual((summary["scanned"], summary["total"], summary["successful"]), (6, 3, 3))
+        self.assertFalse(summary["budget_exhausted"])
+        remaining = [path for path in self.old_venvs if os.path.exists(path)]
+        self.assertEqual(remaining, [os.path.join(self.test_dir, "scratch", "old2", "venv")])
+        with open(os.path.join(self.state_dir, "results.jsonl"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(sorted(row["operation"] for row in rows), ["delete"] * 3)
+        self.assertTrue(os.path.exists(os.path.join(self.state_dir, "scan.vrs")))
+
+    def test_overlapping_targets(self):
+        """Test that a folder found by several targets is handled once, by the first target it matches."""
+        config = load_batch_config(self.config_path)
+        config["dry_run"] = True
+        config["targets"][0].update(roots=[self.test_dir], policy="age_days > 30 and project_name == 'old1'")
+        config["targets"][1].update(roots=[os.path.join(self.test_dir, "work")],
+                                    policy="project_name == 'old1' or project_name == 'fresh'")
+        summary = run_batch(config)
+        self.assertEqual((summary["scanned"], summary["total"], summary["successful"]), (6, 3, 3))
+        handled = sorted(os.path.relpath(venv_path, self.test_dir) for venv_path, _, _ in summary["results"])
+        self.assertEqual(handled, [os.path.join(root, name, "venv")
+                                   for root, name in (("scratch", "old1"), ("work", "fresh"), ("work", "old1"))])
+
+    def test_time_budget_stops_cleanly(self):
+        """Test that an exhausted budget skips remaining work and still saves results."""
+        config = load_batch_config(self.config_path)
+        config["time_budget_minutes"] = 1e-9
+        summary = run_batch(config)
+        self.assertTrue(summary["budget_exhausted"])
+        self.assertEqual(summary["successful"], 0)
+        self.assertEqual(summary["skipped"], summary["total"])
+        self.assertTrue(all(os.path.exists(path) for path in self.old_venvs))
+        self.assertTrue(os.path.exists(os.path.join(self.state_dir, "scan.vrs")))
+
+    def test_lock_prevents_overlapping_runs(self):
+        """Test that a second run exits while the lock is held, and missing roots only fail their target."""
+        with RunLock(os.path.join(self.state_dir, "batch.lock")) as lock:
+            self.assertTrue(lock.acquired)
+            self.assertEqual(main(["--config", self.config_path]), 3)
+        self.assertTrue(all(os.path.exists(path) for path in self.old_venvs))
+
+        shutil.rmtree(os.path.join(self.test_dir, "scratch"))
+        self.assertEqual(main(["--config", self.config_path, "--dry-run"]), 1)
+        self.assertTrue(all(os.path.exists(path) for path in self.old_venvs[:2]))
+        self.assertEqual(main(["--config", os.path.join(self.test_dir, "missing.toml")]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Unit tests for fleet_report utility module.
+"""
+import unittest
+import os
+import gzip
+import json
+import tempfile
+import shutil
+import threading
+import functools
+import http.server
+from utils.fleet_report import (
+    write_host_report,
+    iter_report,
+    list_report_sources,
+    aggregate_reports,
+    _TopK
+)
+
+
+class TestFleetReport(unittest.TestCase):
+    """Test cases for fleet report functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.report_dir = os.path.join(self.test_dir, "reports")
+        for host_index in range(3):
+            venv_list = [
+                {
+                    "venv_path": f"/builds/project{index}/venv",
+                    "project_name": f"project{index}",
+                    "artifact_type": "venv",
+                    "age_days": 90.0,
+                    "size_mb": 100.0 * (index + 1) * (host_index + 1),
+                    "python_version": "3.11.7",
+                    "fingerprint": f"fp{index}",
+                    "root_dir": "/builds",
+                    "in_use": index == 0,
+                    "meets_criteria": True
+                }
+                for index in range(4)
+            ]
+            write_host_report(venv_list, os.path.join(self.report_dir, f"agent{host_index}.jsonl.gz"), f"agent{host_index}")
+        self.sources = list_report_sources(self.report_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_report_round_trip(self):
+        """Test that a report stores host metadata and compact records."""
+        pairs = list(iter_report(self.sources[0]))
+        self.assertEqual(len(pairs), 4)
+        header, record = pairs[1]
+        self.assertEqual(header["host"], "agent0")
+        self.assertEqual(header["root_dirs"], ["/builds"])
+        self.assertEqual(record["venv_path"], "/builds/project1/venv")
+        self.assertNotIn("root_dir", record)
+
+    def test_aggregate_rankings(self):
+        """Test fleet totals and rankings by host, project and fingerprint."""
+        summary = aggregate_reports(self.sources, top_n=2)
+        self.assertEqual(summary["reports"], 3)
+        self.assertEqual(summary["records"], 12)
+        self.assertAlmostEqual(summary["total_mb"], 1000.0 * 6)
+        self.assertAlmostEqual(summary["reclaimable_mb"], 900.0 * 6)
+        self.assertEqual([host["host"] for host in summary["hosts"]], ["agent2", "agent1", "agent0"])
+        self.assertEqual(summary["projects"][0][:3], ("project3", 2400.0, 3))
+        self.assertEqual([key for key, _, _, _ in summary["fingerprints"]], ["fp3", "fp2"])
+        self.assertEqual(summary["largest"][0], (1200.0, "agent2", "/builds/project3/venv"))
+        self.assertEqual(summary["failed"], [])
+
+    def test_aggregate_over_http(self):
+        """Test reading reports from a local HTTP server."""
+        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=self.report_dir)
+        handler.log_message = lambda *args: None
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+            summary = aggregate_reports([f"{base_url}/agent1.jsonl.gz", f"{base_url}/missing.jsonl.gz"])
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(summary["reports"], 1)
+        self.assertEqual(summary["hosts"][0]["host"], "agent1")
+        self.assertEqual(len(summary["failed"]), 1)
+
+    def test_empty_and_repeated_host_reports(self):
+        """Test that hosts without venvs are listed and only a host's newest report counts."""
+        empty_path = os.path.join(self.report_dir, "idle.jsonl.gz")
+        write_host_report([], empty_path, "idle")
+        stale_path = os.path.join(self.test_dir, "agent2-old.jsonl.gz")
+        with gzip.open(stale_path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"report": 1, "host": "agent2", "generated_at": "2000-01-01T00:00:00"}) + "\n")
+            f.write(json.dumps({"venv_path": "/old/venv", "size_mb": 99999.0, "meets_criteria": True}) + "\n")
+        summary = aggregate_reports(self.sources + [stale_path, empty_path])
+        self.assertEqual(summary["reports"], 4)
+        self.assertEqual(summary["superseded"], [stale_path])
+        self.assertAlmostEqual(summary["total_mb"], 1000.0 * 6)
+        idle = [host for host in summary["hosts"] if host["host"] == "idle"]
+        self.assertEqual([(host["count"], host["total_mb"]) for host in idle], [(0, 0.0)])
+
+    def test_invalid_reports(self):
+        """Test that unreadable reports are listed as failed."""
+        bogus_path = os.path.join(self.test_dir, "bogus.jsonl.gz")
+        with open(bogus_path, "wb") as f:
+            f.write(b"not gzip")
+        summary = aggregate_reports([bogus_path, os.path.join(self.test_dir, "missing.jsonl.gz")] + self.sources)
+        self.assertEqual(summary["reports"], 3)
+        self.assertEqual(len(summary["failed"]), 2)
+        with self.assertRaises(ValueError):
+            aggregate_reports(self.sources, top_n=0)
+
+    def test_top_k_is_bounded(self):
+        """Test that the ranking summary keeps a fixed number of counters."""
+        top_k = _TopK(capacity=10)
+        for index in range(1000):
+            top_k.add(f"small{index}", 1.0)
+            if index % 10 == 0:
+                top_k.add("heavy", 50.0)
+        self.assertEqual(len(top_k.counters), 10)
+        key, weight, _, error = top_k.ranked(1)[0]
+        self.assertEqual(key, "heavy")
+        self.assertLessEqual(weight - error, 5000.0)
+        self.assertGreaterEqual(weight, 5000.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for fs_backend utility module.
+"""
+import unittest
+import os
+import time
+import errno
+import subprocess
+from utils.fs_backend import FsBackend, MemoryBackend
+from utils.venv_scanner import scan_for_venvs, get_folder_size
+from utils.venv_deleter import delete_venv, delete_multiple_venvs
+from utils.requirements_generator import generate_requirements_for_multiple_venvs
+
+
+ROOT = "/projects"
+OLD = time.time() - 200 * 86400
+
+
+class TestFsBackend(unittest.TestCase):
+    """Test cases for running the scanner, deleter and generator on an in-memory tree."""
+
+    def setUp(self):
+        """Set up an in-memory tree with two old venvs."""
+        self.fs = MemoryBackend()
+        self.venv_paths = []
+        for name in ("alpha", "beta"):
+            venv_path = os.path.join(ROOT, name, "venv")
+            self.fs.make_dirs(venv_path, mtime=OLD)
+            self.fs.add_file(os.path.join(venv_path, "pyvenv.cfg"), content="home = /usr/bin\nversion = 3.11.7\n", mtime=OLD)
+            self.fs.add_file(os.path.join(venv_path, "bin", "python"), size=1024, mtime=OLD)
+            for index in range(20):
+                self.fs.add_file(os.path.join(venv_path, "lib", "python3.11", "site-packages", f"mod{index}.py"),
+                                 size=1024 * 1024, mtime=OLD)
+            self.venv_paths.append(venv_path)
+
+    def test_scan_large_tree(self):
+        """Test scanning a tree of 100,000 files without touching the disk."""
+        for index in range(100000):
+            self.fs.add_file(os.path.join(ROOT, "big", "venv", "pkg", f"d{index // 1000}", f"f{index}.py"), size=1000)
+        self.fs.make_dirs(os.path.join(ROOT, "big", "venv"), mtime=OLD)
+        start = time.perf_counter()
+        venvs = scan_for_venvs(ROOT, days_unused=30, min_size_mb=0, fs=self.fs)
+        self.assertLess(time.perf_counter() - start, 30)
+        by_path = {info["venv_path"]: info for info in venvs}
+        self.assertEqual(len(by_path), 3)
+        self.assertAlmostEqual(by_path[os.path.join(ROOT, "big", "venv")]["size_mb"], 100000 * 1000 / (1024 * 1024))
+        self.assertEqual(by_path[self.venv_paths[0]]["python_version"], "3.11.7")
+        with self.assertRaises(ValueError):
+            scan_for_venvs(ROOT, fs=self.fs, size_mode="record")
+
+    def test_latency_and_op_counts(self):
+        """Test that latency is added per operation and operations are counted."""
+        slow = MemoryBackend(latency=0.002)
+        for index in range(10):
+            slow.add_file(f"/venv/f{index}", size=10)
+        start = time.perf_counter()
+        self.assertAlmostEqual(get_folder_size("/venv", fs=slow), 100 / (1024 * 1024))
+        self.assertGreaterEqual(time.perf_counter() - start, 10 * 0.002)
+        self.assertEqual(slow.op_counts["lstat"], 10)
+        self.assertEqual(slow.op_counts["listdir"], 1)
+
+    def test_delete_faults(self):
+        """Test deletion with busy, read-only and vanishing files."""
+        alpha, beta = self.venv_paths
+        self.fs.inject_fault(os.path.join(alpha, "bin"), "unlink", errno.EBUSY, times=None)
+        self.fs.add_file(os.path.join(beta, "locked.pyd"), size=10, read_only=True)
+        result = delete_multiple_venvs(self.venv_paths, dry_run=False, fs=self.fs)
+        self.assertEqual(result["failed"], 1)
+        self.assertIn("busy", result["results"][0][2])
+        self.assertEqual(result["leftover_bytes"], {alpha: 1024})
+        self.assertTrue(result["results"][1][1])
+        self.assertFalse(self.fs.exists(beta))
+
+        # A file vanishing during deletion is not a failure
+        self.fs.inject_fault(os.path.join(alpha, "bin"), "*", errno.ENOENT)
+        success, message = delete_venv(alpha, dry_run=False, fs=self.fs)
+        self.assertTrue(success, message)
+        self.assertFalse(self.fs.exists(alpha))
+        with self.assertRaises(ValueError):
+            delete_venv(alpha, dry_run=False, archive_store="/store", fs=self.fs)
+
+    def test_scan_skips_unreadable(self):
+        """Test that permission errors while scanning skip only the affected folder."""
+        self.fs.inject_fault(os.path.join(ROOT, "alpha"), "listdir", errno.EACCES, times=None)
+        venvs = scan_for_venvs(ROOT, days_unused=30, min_size_mb=0, fs=self.fs)
+        self.assertEqual([info["venv_path"] for info in venvs], [self.venv_paths[1]])
+
+    def test_active_paths_come_from_backend(self):
+        """Test that in-use detection asks the backend instead of /proc and the interface is abstract."""
+        self.fs.set_active_paths([os.path.join(self.venv_paths[0], "bin", "python")])
+        venvs = scan_for_venvs(ROOT, days_unused=30, min_size_mb=0, fs=self.fs)
+        self.assertEqual([info["in_use"] for info in venvs], [True, False])
+        self.assertEqual(self.fs.op_counts["active_paths"], 1)
+        with self.assertRaises(TypeError):
+            FsBackend()
+
+    def test_requirements_with_process_handler(self):
+        """Test pip freeze through the backend's process handler, including a timeout."""
+        def handler(args):
+            if "beta" in args[0]:
+                raise subprocess.TimeoutExpired(args, 30)
+            return 0, "requests==2.31.0\nsix==1.16.0\n", ""
+
+        self.fs.set_process_handler(handler)
+        venv_infos = [{"venv_path": path, "project_path": os.path.dirname(path)} for path in self.venv_paths]
+        result = generate_requirements_for_multiple_venvs(venv_infos, fs=self.fs)
+        self.assertEqual((result["successful"], result["failed"]), (1, 1))
+        self.assertIn("2 packages", result["results"][0][2])
+        self.assertIn("timed out", result["results"][1][2])
+        self.assertEqual(self.fs.read_text(os.path.join(ROOT, "alpha", "requirements.txt")).count("=="), 2)
+        self.assertEqual(self.fs.op_counts["run"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Unit tests for inventory_service utility module.
+"""
+import unittest
+import os
+import time
+import threading
+import tempfile
+import stat
+import shutil
+from unittest import mock
+from utils.inventory_service import InventoryService, InventoryClient, query_inventory
+
+
+class TestInventoryService(unittest.TestCase):
+    """Test cases for the shared inventory service."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.root_dir = os.path.join(self.test_dir, "root")
+        self.venv_paths = []
+        for project, age_days in (("old_project", 100), ("new_project", 1)):
+            venv_path = os.path.join(self.root_dir, project, "venv")
+            os.makedirs(venv_path)
+            with open(os.path.join(venv_path, "file.bin"), "wb") as f:
+                f.write(b"x" * 1024 * 1024)
+            os.utime(venv_path, (time.time() - age_days * 86400,) * 2)
+            self.venv_paths.append(venv_path)
+        self.socket_path = os.path.join(self.test_dir, "inventory.sock")
+        self.service = InventoryService(self.root_dir, self.socket_path, days_unused=60, min_size_mb=0)
+        self.service.start()
+        self.client = InventoryClient(self.socket_path)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.client.close()
+        self.service.stop()
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _wait_for_job(self, job_id):
+        """Poll a job until it has finished."""
+        for _ in range(100):
+            job = self.client.job(job_id)
+            if job["state"] in ("done", "failed"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_list_filter_and_sizes(self):
+        """Test the read queries."""
+        self.assertEqual(sorted(record["venv_path"] for record in self.client.list()), sorted(self.venv_paths))
+        self.assertEqual([record["venv_path"] for record in self.client.filter()], [self.venv_paths[0]])
+        self.assertEqual([record["venv_path"] for record in self.client.filter("age_days < 10")], [self.venv_paths[1]])
+        sizes = self.client.sizes()
+        self.assertEqual(sizes["count"], 2)
+        self.assertEqual(sizes["reclaimable_count"], 1)
+        self.assertAlmostEqual(sizes["total_mb"], 2.0, places=2)
+
+    def test_delete_job(self):
+        """Test that deletion jobs run on the service and update the inventory."""
+        job = self._wait_for_job(self.client.delete([self.venv_paths[0]], dry_run=True))
+        self.assertEqual(job["state"], "done")
+        self.assertTrue(os.path.exists(self.venv_paths[0]))
+
+        job = self._wait_for_job(self.client.delete([self.venv_paths[0]], dry_run=False))
+        self.assertEqual(job["result"]["successful"], 1)
+        self.assertFalse(os.path.exists(self.venv_paths[0]))
+        self.client.request("rescan")
+        self.assertEqual([record["venv_path"] for record in self.client.list()], [self.venv_paths[1]])
+
+    def test_rejects_unknown_paths_and_ops(self):
+        """Test that only inventory paths and known ops are accepted."""
+        with self.assertRaises(ValueError):
+            self.client.delete([self.test_dir], dry_run=False)
+        with self.assertRaises(ValueError):
+            self.client.request("format_disk")
+        with self.assertRaises(ValueError):
+            self.client.job(99)
+        self.assertTrue(os.path.exists(self.test_dir))
+
+    def test_socket_mode_and_job_eviction(self):
+        """Test that the socket is owner-only and old finished jobs are forgotten."""
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+        with mock.patch("utils.inventory_service.MAX_FINISHED_JOBS", 2):
+            job_ids = [self.client.delete([self.venv_paths[0]], dry_run=True) for _ in range(4)]
+            self.assertEqual(job_ids, [1, 2, 3, 4])
+            self._wait_for_job(4)
+            for job_id in (1, 2):
+                with self.assertRaises(ValueError):
+                    self.client.job(job_id)
+            self.assertEqual(self.client.job(3)["state"], "done")
+
+    def test_concurrent_queries_are_coalesced(self):
+        """Test that identical concurrent queries share one evaluation."""
+        calls = []
+        release = threading.Event()
+
+        def slow_query():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.service._coalesce(("slow",), slow_query)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while self.service.coalesced < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 5)
+
+    def test_query_inventory_for_scans(self):
+        """Test answering a scan of a covered directory from the service."""
+        records = query_inventory(os.path.join(self.root_dir, "new_project"), 0, 0, socket_path=self.socket_path)
+        self.assertEqual([record["venv_path"] for record in records], [self.venv_paths[1]])
+        self.assertTrue(records[0]["meets_criteria"])
+        self.assertIsNone(query_inventory(self.test_dir, socket_path=self.socket_path))
+        self.assertIsNone(query_inventory(self.root_dir, artifact_types=None, socket_path=self.socket_path))
+        self.assertIsNone(query_inventory(self.root_dir, socket_path=os.path.join(self.test_dir, "missing.sock")))
+
+    def test_second_service_on_same_socket(self):
+        """Test that a second service refuses a socket already being served."""
+        other = InventoryService(self.root_dir, self.socket_path)
+        with self.assertRaises(OSError):
+            other.start()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Unit tests for io_order utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.io_order import get_folder_size_inode_order, rmtree_inode_order, benchmark
+from utils.venv_scanner import get_folder_size
+from utils.venv_deleter import delete_venv, delete_multiple_venvs
+
+
+class TestIoOrder(unittest.TestCase):
+    """Test cases for inode-ordered sizing and deletion."""
+
+    def setUp(self):
+        """Set up a nested tree with a symlink to a file outside it."""
+        self.test_dir = tempfile.mkdtemp()
+        self.outside_file = os.path.join(self.test_dir, "outside.bin")
+        with open(self.outside_file, "wb") as f:
+            f.write(b"o" * 5000)
+        self.venv_dir = os.path.join(self.test_dir, "project", "venv")
+        for index in range(30):
+            directory = os.path.join(self.venv_dir, "lib", f"pkg{index % 4}", "sub" if index % 3 else "")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"module{index}.py"), "wb") as f:
+                f.write(b"x" * (100 * index))
+        if hasattr(os, "symlink"):
+            try:
+                os.symlink(self.outside_file, os.path.join(self.venv_dir, "linked.bin"))
+            except OSError:
+                pass
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_size_matches_walk(self):
+        """Test that inode-ordered sizing counts the same bytes as a walk, for any batch size."""
+        expected = get_folder_size(self.venv_dir)
+        self.assertAlmostEqual(get_folder_size_inode_order(self.venv_dir, batch_size=7), expected)
+        self.assertAlmostEqual(get_folder_size(self.venv_dir, mode="inode"), expected)
+
+    def test_rmtree_keeps_symlink_targets(self):
+        """Test that deletion removes the whole tree without following symlinks."""
+        rmtree_inode_order(self.venv_dir, batch_size=5)
+        self.assertFalse(os.path.exists(self.venv_dir))
+        self.assertTrue(os.path.exists(self.outside_file))
+
+    def test_delete_venv_io_order(self):
+        """Test inode-ordered deletion through the deleter."""
+        result = delete_multiple_venvs([self.venv_dir], dry_run=False, io_order="inode")
+        self.assertEqual(result["successful"], 1)
+        self.assertFalse(os.path.exists(self.venv_dir))
+        with self.assertRaises(ValueError):
+            delete_venv(self.outside_file, io_order="random")
+
+    def test_benchmark(self):
+        """Test that the benchmark times both orders and cleans up after itself."""
+        timings = benchmark(self.test_dir, file_count=40, files_per_dir=10, drop_caches=False)
+        for key in ("size_listing_s", "size_inode_s", "delete_listing_s", "delete_inode_s"):
+            self.assertGreaterEqual(timings[key], 0)
+        self.assertFalse(timings["cold_cache"])
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["outside.bin", "project"])
+
+
+if __name__ == "__main__":
+    unittest.main()
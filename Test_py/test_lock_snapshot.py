@@ -0,0 +1,129 @@
+"""
+Unit tests for lock_snapshot utility module.
+"""
+import unittest
+import os
+import json
+import base64
+import hashlib
+import tempfile
+import shutil
+from utils.lock_snapshot import build_lock_snapshots, lock_multiple_venvs, read_distribution, LOCK_FILENAME
+
+
+def _record_hash(content):
+    """Return the RECORD notation of a sha256 digest."""
+    return "sha256=" + base64.urlsafe_b64encode(hashlib.sha256(content).digest()).rstrip(b"=").decode("ascii")
+
+
+class TestLockSnapshot(unittest.TestCase):
+    """Test cases for lock snapshots."""
+
+    def setUp(self):
+        """Set up two venvs, one with an editable install."""
+        self.test_dir = tempfile.mkdtemp()
+        self.venv_infos = []
+        for name in ("alpha", "beta"):
+            project_path = os.path.join(self.test_dir, name)
+            venv_path = os.path.join(project_path, "venv")
+            os.makedirs(venv_path)
+            with open(os.path.join(venv_path, "pyvenv.cfg"), "w") as f:
+                f.write("home = /usr/bin\nversion = 3.11.7\n")
+            self.venv_infos.append({"venv_path": venv_path, "project_path": project_path})
+
+        self._install(self.venv_infos[0]["venv_path"], "requests", "2.31.0", {"requests/__init__.py": b"print('hi')\n"})
+        self._install(self.venv_infos[0]["venv_path"], "mylib", "0.1.0", {"mylib.pth": b"/src/mylib\n"},
+                      direct_url={"url": "file:///src/mylib", "dir_info": {"editable": True}})
+        self._install(self.venv_infos[1]["venv_path"], "six", "1.16.0", {"six.py": b"# six\n"})
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _install(self, venv_path, name, version, files, direct_url=None):
+        """Create a distribution with METADATA, INSTALLER, RECORD and optional direct_url.json."""
+        site_packages = os.path.join(venv_path, "lib", "python3.11", "site-packages")
+        dist_info = os.path.join(site_packages, f"{name}-{version}.dist-info")
+        os.makedirs(dist_info)
+        files = dict(files, **{
+            f"{name}-{version}.dist-info/METADATA": f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\nText\n".encode(),
+            f"{name}-{version}.dist-info/INSTALLER": b"pip\n",
+        })
+        if direct_url is not None:
+            files[f"{name}-{version}.dist-info/direct_url.json"] = json.dumps(direct_url).encode()
+        lines = []
+        for relative_path, content in files.items():
+            file_path = os.path.join(site_packages, relative_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(content)
+            lines.append(f"{relative_path},{_record_hash(content)},{len(content)}")
+        lines.append(f"{name}-{version}.dist-info/RECORD,,")
+        with open(os.path.join(dist_info, "RECORD"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return dist_info
+
+    def test_snapshot_contents(self):
+        """Test that the snapshot records interpreter, installer, origin and digests."""
+        alpha, beta = build_lock_snapshots([info["venv_path"] for info in self.venv_infos])
+        self.assertEqual(alpha["python_version"], "3.11.7")
+        self.assertEqual([entry["name"] for entry in alpha["distributions"]], ["mylib", "requests"])
+        mylib, requests = alpha["distributions"]
+        self.assertTrue(mylib["editable"])
+        self.assertEqual(mylib["direct_url"]["url"], "file:///src/mylib")
+        self.assertFalse(requests["editable"])
+        self.assertEqual((requests["version"], requests["installer"], requests["files"]), ("2.31.0", "pip", 4))
+        self.assertTrue(requests["record_digest"].startswith("sha256:"))
+        self.assertEqual([entry["name"] for entry in beta["distributions"]], ["six"])
+        self.assertNotIn("content_digest", requests)
+
+    def test_verify_detects_modified_files(self):
+        """Test that verification hashes files and reports those that differ from RECORD."""
+        venv_path = self.venv_infos[0]["venv_path"]
+        dist_info = os.path.join(venv_path, "lib", "python3.11", "site-packages", "requests-2.31.0.dist-info")
+        clean = read_distribution(dist_info, verify=True)
+        self.assertEqual(clean["modified"], [])
+
+        with open(os.path.join(venv_path, "lib", "python3.11", "site-packages", "requests", "__init__.py"), "a") as f:
+            f.write("# patched\n")
+        patched = read_distribution(dist_info, verify=True)
+        self.assertEqual(patched["modified"], ["requests/__init__.py"])
+        self.assertNotEqual(patched["content_digest"], clean["content_digest"])
+        self.assertEqual(patched["record_digest"], clean["record_digest"])
+
+    def test_malformed_metadata(self):
+        """Test that odd direct_url.json content is ignored and a broken RECORD only fails its distribution."""
+        venv_path = self.venv_infos[1]["venv_path"]
+        self._install(venv_path, "listy", "1.0", {"listy.py": b"\n"}, direct_url=["not", "an", "object"])
+        self._install(venv_path, "odd", "1.0", {"odd.py": b"\n"}, direct_url={"dir_info": "editable"})
+        broken = self._install(venv_path, "broken", "1.0", {"broken.py": b"\n"})
+        with open(os.path.join(broken, "RECORD"), "w", encoding="utf-8") as f:
+            f.write('"' + "x" * (1 << 18) + "\n")
+
+        snapshot, = build_lock_snapshots([venv_path])
+        entries = {entry["name"]: entry for entry in snapshot["distributions"]}
+        self.assertEqual(sorted(entries), ["listy", "odd", "six"])
+        self.assertEqual((entries["listy"]["direct_url"], entries["listy"]["editable"]), (None, False))
+        self.assertFalse(entries["odd"]["editable"])
+        self.assertEqual(len(snapshot["errors"]), 1)
+        self.assertTrue(snapshot["errors"][0].startswith("broken-1.0.dist-info"))
+
+    def test_lock_multiple_venvs(self):
+        """Test writing venv.lock.json into each project folder."""
+        venv_infos = self.venv_infos + [{"venv_path": os.path.join(self.test_dir, "ghost", "venv")}]
+        written = []
+        result = lock_multiple_venvs(venv_infos, on_result=lambda path, ok, message: written.append(ok))
+        self.assertEqual((result["total"], result["successful"], result["failed"]), (3, 2, 1))
+        self.assertEqual(written, [True, True, False])
+        with open(os.path.join(self.venv_infos[1]["project_path"], LOCK_FILENAME), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["distributions"][0]["name"], "six")
+
+        again = lock_multiple_venvs(self.venv_infos)
+        self.assertEqual(again["failed"], 2)
+        self.assertIn("already exists", again["results"][0][2])
+        self.assertEqual(lock_multiple_venvs(self.venv_infos, overwrite=True)["successful"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
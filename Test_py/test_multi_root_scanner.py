@@ -0,0 +1,81 @@
+"""
+Unit tests for multi_root_scanner utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.multi_root_scanner import (
+    resolve_roots,
+    iter_multi_root_artifacts,
+    scan_multiple_roots
+)
+from utils.venv_scanner import scan_for_artifacts
+
+
+class TestMultiRootScanner(unittest.TestCase):
+    """Test cases for multi-root scanning."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = os.path.realpath(tempfile.mkdtemp())
+        self.root_a = os.path.join(self.test_dir, "volume_a")
+        self.root_b = os.path.join(self.test_dir, "volume_b")
+        self.venv_paths = []
+        for root_dir in (self.root_a, self.root_b):
+            for project in ("project1", "project2"):
+                venv_path = os.path.join(root_dir, project, "venv")
+                os.makedirs(venv_path)
+                with open(os.path.join(venv_path, "file.txt"), "w") as f:
+                    f.write("x" * 100)
+                self.venv_paths.append(venv_path)
+        os.makedirs(os.path.join(self.root_a, "node_modules"))
+        self.link_to_a = os.path.join(self.test_dir, "link_to_a")
+        os.symlink(self.root_a, self.link_to_a)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_resolve_roots_drops_overlaps(self):
+        """Test that nested and aliased roots are dropped."""
+        roots = resolve_roots([self.root_a, os.path.join(self.root_a, "project1"), self.link_to_a, self.root_b])
+        self.assertEqual(roots, [self.root_a, self.root_b])
+        self.assertEqual(resolve_roots([os.path.join(self.root_b, "project1"), self.test_dir]), [self.test_dir])
+
+    def test_resolve_roots_invalid(self):
+        """Test resolving missing or empty roots."""
+        with self.assertRaises(ValueError):
+            resolve_roots([])
+        with self.assertRaises(ValueError):
+            resolve_roots([os.path.join(self.test_dir, "missing")])
+
+    def test_merged_results_match_single_scans(self):
+        """Test that the merged result equals the union of per-root scans."""
+        merged = scan_multiple_roots([self.root_a, self.link_to_a, self.root_b], 0, 0)
+        expected = sorted(
+            record["venv_path"]
+            for root_dir in (self.root_a, self.root_b)
+            for record in scan_for_artifacts(root_dir, 0, 0)
+        )
+        self.assertEqual([record["venv_path"] for record in merged], expected)
+        roots_by_path = {record["venv_path"]: record["root_dir"] for record in merged}
+        self.assertEqual(roots_by_path[self.venv_paths[2]], self.root_b)
+        self.assertEqual(sorted(record["venv_path"] for record in merged if record["meets_criteria"]), sorted(self.venv_paths))
+
+    def test_stream_is_deduplicated(self):
+        """Test that each artifact is streamed exactly once."""
+        streamed = [record["venv_path"] for record in
+                    iter_multi_root_artifacts([self.test_dir, self.root_a, self.root_b], 0, 0, ("venv",),
+                                              workers_per_device=1)]
+        self.assertEqual(sorted(streamed), sorted(self.venv_paths))
+
+    def test_invalid_workers(self):
+        """Test that a non-positive worker count is rejected."""
+        with self.assertRaises(ValueError):
+            scan_multiple_roots([self.root_a], workers_per_device=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Unit tests for reclaim_planner utility module.
+"""
+import unittest
+import os
+import time
+import tempfile
+import shutil
+from unittest import mock
+from utils.reclaim_planner import (
+    estimate_venv_size_mb,
+    plan_reclaim,
+    execute_plan
+)
+
+
+class TestReclaimPlanner(unittest.TestCase):
+    """Test cases for reclaim planner functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.old_time = time.time() - 100 * 24 * 60 * 60
+        self.venvs = {}
+        for name, size_kb in (("small", 100), ("medium", 300), ("large", 600)):
+            self.venvs[name] = self._make_venv(name, size_kb)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _make_venv(self, project_name, size_kb, old=True):
+        """Create a venv with one file of the given size."""
+        venv_path = os.path.join(self.test_dir, project_name, "venv")
+        os.makedirs(venv_path, exist_ok=True)
+        with open(os.path.join(venv_path, "blob.bin"), "wb") as f:
+            f.write(b"x" * size_kb * 1024)
+        if old:
+            os.utime(venv_path, (self.old_time, self.old_time))
+        return venv_path
+
+    def test_estimate_uses_size_hints(self):
+        """Test that cached sizes take precedence over estimates."""
+        hints = {self.venvs["small"]: 1234.0}
+        self.assertEqual(estimate_venv_size_mb(self.venvs["small"], hints), 1234.0)
+
+    def test_plan_reclaim_selects_fewest_venvs(self):
+        """Test that one large venv is chosen when it reaches the target."""
+        hints = {path: size for path, size in zip(self.venvs.values(), (0.1, 0.3, 0.6))}
+        plan = plan_reclaim(self.test_dir, target_mb=0.5, days_unused=60, size_hints=hints)
+        self.assertTrue(plan["target_reached"])
+        self.assertEqual([info["venv_path"] for info in plan["selected"]], [self.venvs["large"]])
+        self.assertEqual(plan["candidates"], 3)
+        self.assertEqual(plan["sized"], 1)
+
+    def test_plan_reclaim_combines_venvs(self):
+        """Test that several venvs are combined to reach a larger target."""
+        plan = plan_reclaim(self.test_dir, target_mb=0.8, days_unused=60)
+        self.assertTrue(plan["target_reached"])
+        selected = sorted(info["venv_path"] for info in plan["selected"])
+        self.assertEqual(selected, sorted([self.venvs["large"], self.venvs["medium"]]))
+
+    def test_plan_reclaim_respects_age_policy(self):
+        """Test that recently used venvs are never planned."""
+        self._make_venv("fresh", 2000, old=False)
+        plan = plan_reclaim(self.test_dir, target_mb=100, days_unused=60)
+        self.assertFalse(plan["target_reached"])
+        self.assertEqual(plan["candidates"], 3)
+        self.assertNotIn("fresh", [info["project_name"] for info in plan["selected"]])
+
+    def test_plan_reclaim_skips_venvs_in_use(self):
+        """Test that venvs used by a running interpreter are never planned."""
+        active = {os.path.join(self.venvs["large"], "bin", "python")}
+        with mock.patch("utils.reclaim_planner.get_active_venv_paths", return_value=active):
+            plan = plan_reclaim(self.test_dir, target_mb=0.5, days_unused=60)
+        self.assertEqual((plan["candidates"], plan["in_use"]), (2, 1))
+        self.assertNotIn(self.venvs["large"], [info["venv_path"] for info in plan["selected"]])
+        self.assertTrue(all(info["in_use"] is False for info in plan["selected"]))
+
+    def test_plan_reclaim_invalid_target(self):
+        """Test planning with a non-positive target."""
+        with self.assertRaises(ValueError):
+            plan_reclaim(self.test_dir, target_mb=0)
+
+    def test_execute_plan_dry_run(self):
+        """Test executing a plan in dry run mode."""
+        plan = plan_reclaim(self.test_dir, target_mb=0.5, days_unused=60)
+        result = execute_plan(plan, dry_run=True)
+        self.assertEqual(result["total"], len(plan["selected"]))
+        self.assertEqual(result["failed"], 0)
+        self.assertTrue(os.path.exists(self.venvs["large"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
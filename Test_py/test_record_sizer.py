@@ -0,0 +1,107 @@
+"""
+Unit tests for record_sizer utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.record_sizer import measure_venv_by_record, format_package_breakdown
+from utils.venv_scanner import get_folder_size, scan_for_venvs
+
+
+class TestRecordSizer(unittest.TestCase):
+    """Test cases for metadata-based venv sizing."""
+
+    def setUp(self):
+        """Set up a venv with two installed packages and a console script."""
+        self.test_dir = tempfile.mkdtemp()
+        self.venv_dir = os.path.join(self.test_dir, "project", "venv")
+        self.site_packages = os.path.join(self.venv_dir, "lib", "python3.11", "site-packages")
+        with open(self._write("pyvenv.cfg", 0, root=self.venv_dir), "w") as f:
+            f.write("version = 3.11.4\n")
+        self._write(os.path.join("bin", "python"), 4000, root=self.venv_dir)
+
+        self._install("requests", "2.31.0", {
+            "requests/__init__.py": 5000,
+            "requests/adapters.py": 20000,
+            "requests/__pycache__/__init__.cpython-311.pyc": 3000,
+            "../../../bin/requests-cli": 300,
+        })
+        self._install("six", "1.16.0", {
+            "six.py": 34000,
+            "__pycache__/six.cpython-311.pyc": 29000,
+        })
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, relative_path, size, root=None):
+        """Create a file of the given size below root (site-packages by default)."""
+        file_path = os.path.normpath(os.path.join(root or self.site_packages, relative_path))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(b"x" * size)
+        return file_path
+
+    def _install(self, name, version, files):
+        """Create package files and a dist-info folder whose RECORD lists them."""
+        dist_info = f"{name}-{version}.dist-info"
+        files = dict(files, **{f"{dist_info}/METADATA": 700})
+        lines = []
+        for relative_path, size in files.items():
+            self._write(relative_path, size)
+            lines.append(f"{relative_path},sha256=abc,{size}")
+        lines.append(f"{dist_info}/RECORD,,")
+        record_path = self._write(f"{dist_info}/RECORD", 0)
+        with open(record_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def test_matches_full_walk(self):
+        """Test that an accurate RECORD gives the walked size and a package breakdown."""
+        measurement = measure_venv_by_record(self.venv_dir, validate=True)
+        self.assertAlmostEqual(measurement["size_mb"], get_folder_size(self.venv_dir))
+        self.assertAlmostEqual(measurement["drift_mb"], 0.0)
+        self.assertEqual(measurement["records_read"], 2)
+        self.assertEqual([package["name"] for package in measurement["packages"]], ["six", "requests"])
+        # Only the two RECORD files, pyvenv.cfg and bin/python are stat'ed
+        self.assertEqual(measurement["files_stat"], 4)
+        self.assertIn("requests:", format_package_breakdown(measurement))
+
+    def test_reports_drift(self):
+        """Test that files added inside a package are counted and changed files show up as drift."""
+        self._write("requests/__pycache__/adapters.cpython-311.pyc", 10 * 1024)
+        measurement = measure_venv_by_record(self.venv_dir, validate=True)
+        self.assertAlmostEqual(measurement["drift_mb"], 0.0)
+        self.assertAlmostEqual(measurement["unrecorded_mb"], 10 / 1024)
+        self.assertIn("not in RECORD", format_package_breakdown(measurement))
+
+        # A file rewritten after installation keeps its RECORD size
+        self._write("requests/adapters.py", 20000 + 10 * 1024)
+        measurement = measure_venv_by_record(self.venv_dir, validate=True)
+        self.assertAlmostEqual(measurement["drift_mb"], -10 / 1024)
+        self.assertLess(measurement["drift_percent"], 0)
+        self.assertIn("drift", format_package_breakdown(measurement))
+
+    def test_unrecorded_packages_are_walked(self):
+        """Test that a package without RECORD and a broken RECORD are measured by walking."""
+        self._write("legacy_pkg/module.py", 8000)
+        os.remove(os.path.join(self.site_packages, "six-1.16.0.dist-info", "RECORD"))
+        measurement = measure_venv_by_record(self.venv_dir)
+        self.assertEqual(measurement["records_read"], 1)
+        self.assertAlmostEqual(measurement["size_mb"], get_folder_size(self.venv_dir))
+
+    def test_size_mode(self):
+        """Test the record mode of get_folder_size and the scanner."""
+        self.assertAlmostEqual(get_folder_size(self.venv_dir, mode="record"), get_folder_size(self.venv_dir))
+        venvs = scan_for_venvs(self.test_dir, 0, 0, size_mode="record")
+        self.assertAlmostEqual(venvs[0]["size_mb"], get_folder_size(self.venv_dir))
+        with self.assertRaises(ValueError):
+            get_folder_size(self.venv_dir, mode="guess")
+        with self.assertRaises(ValueError):
+            scan_for_venvs(self.test_dir, size_mode="guess")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for result_exporter utility module.
+"""
+import unittest
+import os
+import csv
+import json
+import sqlite3
+import tempfile
+import shutil
+from utils.result_exporter import (
+    create_exporter,
+    export_records,
+    SqliteExporter,
+    RESULT_FIELDS,
+    RESULT_TABLE
+)
+from utils.venv_scanner import scan_for_venvs
+from utils.venv_deleter import delete_multiple_venvs
+from utils.requirements_generator import generate_requirements_for_multiple_venvs
+
+
+class TestResultExporter(unittest.TestCase):
+    """Test cases for streaming exporters."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.records = [
+            {"venv_path": f"/data/project{index}/venv", "project_name": f"project{index}",
+             "size_mb": float(index), "meets_criteria": index % 2 == 0}
+            for index in range(5)
+        ]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_csv_and_jsonl_export(self):
+        """Test exporting records to CSV and JSON lines."""
+        csv_path = os.path.join(self.test_dir, "scan.csv")
+        jsonl_path = os.path.join(self.test_dir, "scan.jsonl")
+        self.assertTrue(export_records(iter(self.records), csv_path)[0])
+        self.assertTrue(export_records(self.records, jsonl_path)[0])
+
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[3]["venv_path"], "/data/project3/venv")
+        with open(jsonl_path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[2]["size_mb"], 2.0)
+        self.assertTrue(lines[2]["meets_criteria"])
+
+    def test_sqlite_batches(self):
+        """Test batched SQLite transactions and that existing rows are kept."""
+        db_path = os.path.join(self.test_dir, "scan.db")
+        exporter = SqliteExporter(db_path, batch_size=2)
+        for record in self.records:
+            exporter.write(record)
+        self.assertEqual(exporter.transactions, 2)
+        exporter.close()
+        self.assertEqual(exporter.transactions, 3)
+        with sqlite3.connect(db_path) as connection:
+            count, total = connection.execute("SELECT COUNT(*), SUM(size_mb) FROM scan_results").fetchone()
+        self.assertEqual((count, total), (5, 10.0))
+        self.assertTrue(export_records(self.records, db_path)[0])
+        with sqlite3.connect(db_path) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM scan_results").fetchone()[0], 10)
+
+        # Replacing rows has to be asked for explicitly
+        with self.assertRaises(ValueError):
+            create_exporter(db_path, append=False)
+        create_exporter(db_path, append=False, overwrite=True).close()
+        with sqlite3.connect(db_path) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM scan_results").fetchone()[0], 0)
+
+    def test_on_result_callbacks(self):
+        """Test streaming scan, requirements and deletion results."""
+        venv_path = os.path.join(self.test_dir, "project", "venv")
+        os.makedirs(venv_path)
+        db_path = os.path.join(self.test_dir, "history.db")
+
+        scanned = []
+        scan_for_venvs(self.test_dir, 0, 0, on_result=scanned.append)
+        self.assertEqual([record["venv_path"] for record in scanned], [venv_path])
+        self.assertIn("in_use", scanned[0])
+
+        with create_exporter(db_path, RESULT_FIELDS, RESULT_TABLE, append=True) as exporter:
+            generate_requirements_for_multiple_venvs(scanned, on_result=exporter.result_callback("requirements"))
+            delete_multiple_venvs([venv_path], dry_run=False, on_result=exporter.result_callback("delete"))
+        with sqlite3.connect(db_path) as connection:
+            rows = connection.execute("SELECT operation, venv_path, success FROM operation_results").fetchall()
+        self.assertEqual(rows, [("requirements", venv_path, 0), ("delete", venv_path, 1)])
+
+    def test_unsupported_format(self):
+        """Test exporting to an unknown extension and to a path that cannot be created."""
+        with self.assertRaises(ValueError):
+            create_exporter(os.path.join(self.test_dir, "scan.xlsx"))
+        blocker = os.path.join(self.test_dir, "not_a_dir")
+        with open(blocker, "w") as f:
+            f.write("")
+        for name in ("scan.csv", "scan.db"):
+            success, message = export_records([], os.path.join(blocker, name))
+            self.assertFalse(success)
+            self.assertIn("Error exporting results", message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for robust_deleter utility module.
+"""
+import unittest
+import os
+import time
+import errno
+import tempfile
+import shutil
+from utils.fs_backend import MemoryBackend
+from utils.robust_deleter import classify_error, delete_tree, format_error_counts
+from utils.venv_deleter import delete_multiple_venvs, format_deletion_failures
+
+
+class TestRobustDeleter(unittest.TestCase):
+    """Test cases for deleting trees past per-file failures."""
+
+    def setUp(self):
+        """Set up an in-memory venv and a temporary folder."""
+        self.fs = MemoryBackend()
+        self.venv_path = "/projects/app/venv"
+        for index in range(50):
+            self.fs.add_file(f"{self.venv_path}/lib/pkg{index % 5}/mod{index}.py", size=100)
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_classify_error(self):
+        """Test classification of read-only, busy, vanished and permission errors."""
+        self.fs.add_file(f"{self.venv_path}/locked.pyd", size=10, read_only=True)
+        writable = f"{self.venv_path}/lib/pkg0/mod0.py"
+        denied = OSError(errno.EACCES, "Permission denied")
+        self.assertEqual(classify_error(denied, f"{self.venv_path}/locked.pyd", self.fs), "read_only")
+        self.assertEqual(classify_error(denied, writable, self.fs), "permission")
+        self.assertEqual(classify_error(OSError(errno.EBUSY, "Busy"), writable, self.fs), "busy")
+        self.assertEqual(classify_error(FileNotFoundError(errno.ENOENT, "Gone"), writable, self.fs), "vanished")
+        self.assertEqual(classify_error(OSError(errno.EIO, "I/O error"), writable, self.fs), "other")
+        sharing_violation = PermissionError(errno.EACCES, "In use")
+        sharing_violation.winerror = 32
+        self.assertEqual(classify_error(sharing_violation, writable, self.fs), "busy")
+
+    def test_large_tree_with_scattered_failures(self):
+        """Test that a 100,000-file tree is deleted past failures with exact leftovers."""
+        for index in range(100000):
+            self.fs.add_file(f"{self.venv_path}/site/d{index // 500}/f{index}.py", size=10,
+                             read_only=index % 1000 == 0)
+        for index in range(5):
+            self.fs.inject_fault(f"{self.venv_path}/site/d{index * 40}/f{index * 40 * 500 + 1}.py", "unlink",
+                                 errno.EBUSY, times=None)
+        start = time.perf_counter()
+        report = delete_tree(self.venv_path, self.fs, retry_delay=0, sample_limit=3)
+        self.assertLess(time.perf_counter() - start, 60)
+        self.assertEqual(report["retried"], 100)
+        # 100 read-only files once, the five busy files in both rounds
+        self.assertEqual(report["retry_attempts"], 110)
+        self.assertEqual((report["leftover_files"], report["leftover_bytes"]), (5, 50))
+        self.assertEqual(report["removed_files"], 100050 - 5)
+        self.assertEqual(report["errors"]["read_only"], 100)
+        self.assertEqual(report["errors"]["busy"], 5)
+        self.assertEqual(len(report["samples"]), 3)
+        # The five folders holding busy files, site/ and the venv itself remain
+        self.assertEqual(report["leftover_dirs"], 7)
+        self.assertEqual(format_error_counts(report["errors"]), "read_only 100, busy 5")
+
+    def test_read_only_folders(self):
+        """Test that folders refusing rmdir for lack of write permission are made writable and removed."""
+        for index in range(5):
+            self.fs.chmod(f"{self.venv_path}/lib/pkg{index}", 0o555)
+        report = delete_tree(self.venv_path, self.fs, retry_delay=0)
+        self.assertEqual((report["leftover_files"], report["leftover_dirs"]), (0, 0))
+        self.assertEqual(report["errors"]["read_only"], 5)
+        self.assertEqual((report["retried"], report["retry_attempts"]), (5, 5))
+        self.assertFalse(self.fs.exists(self.venv_path))
+
+    def test_real_filesystem(self):
+        """Test deleting a real tree without following symlinks."""
+        outside = os.path.join(self.test_dir, "outside")
+        os.makedirs(outside)
+        with open(os.path.join(outside, "keep.txt"), "w") as f:
+            f.write("keep")
+        venv_path = os.path.join(self.test_dir, "venv")
+        os.makedirs(os.path.join(venv_path, "lib"))
+        with open(os.path.join(venv_path, "lib", "mod.py"), "w") as f:
+            f.write("x")
+        os.chmod(os.path.join(venv_path, "lib", "mod.py"), 0o444)
+        if hasattr(os, "symlink"):
+            try:
+                os.symlink(outside, os.path.join(venv_path, "linked"), target_is_directory=True)
+            except OSError:
+                pass
+        report = delete_tree(venv_path)
+        self.assertEqual((report["leftover_files"], report["leftover_dirs"]), (0, 0))
+        self.assertFalse(os.path.exists(venv_path))
+        self.assertTrue(os.path.exists(os.path.join(outside, "keep.txt")))
+
+    def test_delete_multiple_venvs_report(self):
+        """Test aggregated error counts and leftover bytes across venvs."""
+        other = "/projects/other/venv"
+        self.fs.add_file(f"{other}/lib/mod.py", size=100)
+        self.fs.inject_fault(f"{self.venv_path}/lib/pkg1", "unlink", errno.EACCES, times=None)
+        result = delete_multiple_venvs([self.venv_path, other], dry_run=False, fs=self.fs)
+        self.assertEqual((result["successful"], result["failed"]), (1, 1))
+        self.assertEqual(result["errors"]["permission"], 10)
+        self.assertEqual(result["leftover_bytes"], {self.venv_path: 1000})
+        summary = format_deletion_failures(result)
+        self.assertIn("Errors: permission 10", summary)
+        self.assertIn("Partially deleted", summary)
+        self.assertFalse(self.fs.exists(other))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for scan_checkpoint utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.scan_checkpoint import ScanSession
+from utils.venv_scanner import scan_for_venvs
+
+
+class TestScanCheckpoint(unittest.TestCase):
+    """Test cases for checkpointed scan sessions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.root_dir = os.path.join(self.test_dir, "root")
+        self.journal_path = os.path.join(self.test_dir, "journal", "scan.jsonl")
+        for group in range(3):
+            for project in range(4):
+                venv_path = os.path.join(self.root_dir, f"group{group}", f"project{project}", "venv")
+                os.makedirs(venv_path, exist_ok=True)
+                with open(os.path.join(venv_path, "file.txt"), "w") as f:
+                    f.write("x" * 100)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _session(self):
+        """Create a session over the fixture tree."""
+        return ScanSession(self.root_dir, self.journal_path, days_unused=0, min_size_mb=0)
+
+    def _stop_after(self, count):
+        """Build a should_stop callback that stops after count directories."""
+        calls = {"n": 0}
+
+        def should_stop():
+            calls["n"] += 1
+            return calls["n"] > count
+        return should_stop
+
+    def test_full_scan_matches_scan_for_venvs(self):
+        """Test that an uninterrupted session finds every venv."""
+        session = self._session()
+        results = session.run()
+        self.assertTrue(session.completed)
+        expected = sorted(info["venv_path"] for info in scan_for_venvs(self.root_dir, 0, 0))
+        self.assertEqual(sorted(info["venv_path"] for info in results), expected)
+
+    def test_interrupted_scan_resumes(self):
+        """Test that a resumed scan finishes without losing or repeating results."""
+        first = self._session()
+        partial = first.run(should_stop=self._stop_after(6))
+        self.assertFalse(first.completed)
+        self.assertLess(len(partial), 12)
+
+        second = self._session()
+        results = second.run(resume=True)
+        self.assertTrue(second.completed)
+        paths = [info["venv_path"] for info in results]
+        self.assertEqual(len(paths), 12)
+        self.assertEqual(len(set(paths)), 12)
+
+    def test_partial_batch_is_discarded(self):
+        """Test that a torn write after the last checkpoint is ignored."""
+        self._session().run(should_stop=self._stop_after(6))
+        with open(self.journal_path, "ab") as f:
+            f.write(b'{"r":{"venv_path":"/bogus"')
+        results = self._session().run(resume=True)
+        self.assertNotIn("/bogus", [info["venv_path"] for info in results])
+        self.assertEqual(len(results), 12)
+
+    def test_completed_journal_is_reused(self):
+        """Test that resuming a finished scan returns its results immediately."""
+        self._session().run()
+        shutil.rmtree(os.path.join(self.root_dir, "group0"))
+        results = self._session().run(resume=True)
+        self.assertEqual(len(results), 12)
+        self.assertEqual(len(self._session().run(resume=False)), 8)
+
+    def test_journal_from_other_root(self):
+        """Test that a journal for another root is rejected."""
+        self._session().run()
+        other_root = os.path.join(self.root_dir, "group1")
+        with self.assertRaises(ValueError):
+            ScanSession(other_root, self.journal_path).run(resume=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for scan_progress utility module.
+"""
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from utils.scan_progress import ScanProgress, estimate_total_entries, format_progress, used_inodes
+from utils.venv_scanner import scan_for_venvs
+
+
+class TestScanProgress(unittest.TestCase):
+    """Test cases for scan progress reporting."""
+
+    def setUp(self):
+        """Set up a tree of 20 projects, each with a venv."""
+        self.test_dir = tempfile.mkdtemp()
+        self.root_dir = os.path.join(self.test_dir, "root")
+        for index in range(20):
+            project = os.path.join(self.root_dir, f"group{index % 4}", f"project{index}")
+            os.makedirs(os.path.join(project, "venv"))
+            with open(os.path.join(project, "main.py"), "w") as f:
+                f.write("print()\n")
+        self.stats_path = os.path.join(self.test_dir, "stats.json")
+        self.reports = []
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_scan_reports_and_finishes(self):
+        """Test that the scan ticks every folder it walks or sizes and sends a final report."""
+        progress = ScanProgress(self.root_dir, self.reports.append, interval=0, stats_path=self.stats_path)
+        venvs = scan_for_venvs(self.root_dir, days_unused=0, min_size_mb=0, progress=progress)
+        self.assertEqual(len(venvs), 20)
+        # root, 4 groups and 20 projects are walked, then the 20 venvs are sized
+        self.assertEqual(len(self.reports), 45 + 1)
+        final = self.reports[-1]
+        self.assertEqual((final["dirs"], final["files"], final["percent"], final["done"]), (45, 20, 100.0, True))
+        self.assertTrue(all(report["percent"] is None or report["percent"] <= 99.0 for report in self.reports[:-1]))
+
+        # Every size mode reads the same entries
+        for size_mode in ("inode", "record"):
+            progress = ScanProgress(self.root_dir, self.reports.append, interval=60, stats_path=None)
+            scan_for_venvs(self.root_dir, days_unused=0, min_size_mb=0, size_mode=size_mode, progress=progress)
+            self.assertEqual((self.reports[-1]["dirs"], self.reports[-1]["files"]), (45, 20))
+
+    def test_callback_is_sampled(self):
+        """Test that only the final report is sent when the scan is shorter than the interval."""
+        progress = ScanProgress(self.root_dir, self.reports.append, interval=60, stats_path=None)
+        scan_for_venvs(self.root_dir, days_unused=0, min_size_mb=0, progress=progress)
+        self.assertEqual(len(self.reports), 1)
+        self.assertEqual(self.reports[0]["estimate_source"], "unknown")
+
+    def test_estimate_from_history(self):
+        """Test that the next scan of a root is estimated from the stored entry count."""
+        if used_inodes(self.root_dir) is not None:
+            estimate, source = estimate_total_entries(self.root_dir, self.stats_path)
+            self.assertEqual(source, "statvfs")
+            self.assertGreaterEqual(estimate, 65)
+        scan_for_venvs(self.root_dir, days_unused=0, min_size_mb=0,
+                       progress=ScanProgress(self.root_dir, self.reports.append, stats_path=self.stats_path))
+        with open(self.stats_path, encoding="utf-8") as f:
+            stored = json.load(f)[os.path.abspath(self.root_dir)]
+        # The same unit as the statvfs estimate: every folder and file below the root
+        self.assertEqual(stored["entries"], 65)
+        estimate, source = estimate_total_entries(self.root_dir, self.stats_path)
+        self.assertEqual(source, "history")
+        self.assertAlmostEqual(estimate, 65, delta=5)
+
+    def test_report_math(self):
+        """Test percent, rates, ETA and the status text."""
+        progress = ScanProgress(self.root_dir, self.reports.append, interval=60, stats_path=None, estimate=1000)
+        progress.history_rate = 50.0
+        self.assertAlmostEqual(progress.report(now=progress.started + 1)["eta_s"], 20.0)
+        for _ in range(10):
+            progress.tick(39)
+        report = progress.report(now=progress.started + 4)
+        self.assertEqual((report["dirs"], report["files"]), (10, 390))
+        self.assertAlmostEqual(report["percent"], 40.0)
+        self.assertAlmostEqual(report["files_per_s"], 97.5)
+        self.assertAlmostEqual(report["eta_s"], 6.0)
+        self.assertEqual(format_progress(report), "Scanning... 40% - 10 dirs, 390 files (98 files/s) - ETA 6s")
+        self.assertEqual(self.reports, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Unit tests for scan_result_file utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.scan_result_file import (
+    write_scan_results,
+    load_scan_results,
+    ScanResultFile
+)
+from utils.venv_scanner import scan_for_venvs
+
+
+class TestScanResultFile(unittest.TestCase):
+    """Test cases for memory-mapped scan result files."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.result_path = os.path.join(self.test_dir, "results", "scan.vrs")
+        self.records = [
+            {
+                "venv_path": f"/data/project{index}/venv",
+                "project_path": f"/data/project{index}",
+                "project_name": f"project{index}",
+                "artifact_type": "venv",
+                "age_days": 10.5 * index,
+                "size_mb": 100.25 * index,
+                "size_low_mb": 90.0 * index,
+                "size_high_mb": 110.0 * index,
+                "size_exact": index % 2 == 0,
+                "python_version": "3.11.7",
+                "fingerprint": "",
+                "inode": 1000 + index,
+                "root_dir": "/data",
+                "in_use": index == 1,
+                "meets_criteria": index > 1
+            }
+            for index in range(3)
+        ]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_round_trip(self):
+        """Test that every field survives a write and reload."""
+        success, message = write_scan_results(self.records, self.result_path)
+        self.assertTrue(success, message)
+        self.assertEqual(load_scan_results(self.result_path), self.records)
+
+    def test_columns_are_mapped(self):
+        """Test zero-copy column access and string interning."""
+        write_scan_results(self.records, self.result_path)
+        with ScanResultFile(self.result_path) as result_file:
+            self.assertEqual(len(result_file), 3)
+            self.assertEqual(list(result_file.columns["size_mb"]), [0.0, 100.25, 200.5])
+            self.assertEqual(list(result_file.columns["inode"]), [1000, 1001, 1002])
+            self.assertEqual(result_file[-1]["venv_path"], "/data/project2/venv")
+            codes = result_file.columns["root_dir"]
+            self.assertEqual(codes[0], codes[2])
+            self.assertEqual(result_file.string(codes[0]), "/data")
+
+    def test_invalid_files(self):
+        """Test that other and truncated files are rejected."""
+        bogus_path = os.path.join(self.test_dir, "bogus.vrs")
+        with open(bogus_path, "wb") as f:
+            f.write(b"not a result file at all, definitely not")
+        with self.assertRaises(ValueError):
+            ScanResultFile(bogus_path)
+
+        write_scan_results(self.records, self.result_path)
+        with open(self.result_path, "r+b") as f:
+            f.truncate(os.path.getsize(self.result_path) - 20)
+        with self.assertRaises(ValueError):
+            ScanResultFile(self.result_path)
+
+    def test_scanner_writes_result_file(self):
+        """Test that the scanner saves results with inodes."""
+        venv_path = os.path.join(self.test_dir, "project", "venv")
+        os.makedirs(venv_path)
+        venv_list = scan_for_venvs(self.test_dir, 0, 0, result_path=self.result_path)
+        loaded = load_scan_results(self.result_path)
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0]["venv_path"], venv_path)
+        self.assertEqual(loaded[0]["inode"], os.stat(venv_path).st_ino)
+        self.assertEqual(loaded[0]["inode"], venv_list[0]["inode"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Unit tests for scan_runner utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.scan_runner import ScanRunner
+
+
+class TestScanRunner(unittest.TestCase):
+    """Test cases for choosing how a scan is answered."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.roots = [os.path.join(self.test_dir, "volume_a"), os.path.join(self.test_dir, "volume_b")]
+        self.venv_paths = []
+        for root_dir in self.roots:
+            venv_path = os.path.join(root_dir, "project", "venv")
+            os.makedirs(venv_path)
+            self.venv_paths.append(os.path.realpath(venv_path))
+        self.runner = ScanRunner(os.path.join(self.test_dir, "journals"))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.runner.stop()
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _paths(self, records):
+        """Return the sorted real paths of scan records."""
+        return sorted(os.path.realpath(record["venv_path"]) for record in records)
+
+    def test_plain_and_resumable_scans(self):
+        """Test that plain and resumable scans agree and leave no journal behind."""
+        streamed = []
+        records, estimated = self.runner.run(self.roots[0], 0, 0, on_result=streamed.append)
+        self.assertFalse(estimated)
+        self.assertEqual(self._paths(records), self.venv_paths[:1])
+        self.assertEqual(len(streamed), 1)
+
+        resumed, _ = self.runner.run(self.roots[0], 0, 0, resumable=True)
+        self.assertEqual(self._paths(resumed), self.venv_paths[:1])
+        self.assertEqual(os.listdir(os.path.join(self.test_dir, "journals")), [])
+
+    def test_multiple_roots(self):
+        """Test that several os.pathsep-separated roots are merged."""
+        records, _ = self.runner.run(os.pathsep.join(self.roots), 0, 0, estimate_sizes=True)
+        self.assertEqual(self._paths(records), self.venv_paths)
+
+    def test_watcher_is_reused(self):
+        """Test that watch mode keeps one watcher per settings."""
+        records, estimated = self.runner.run(self.roots[0], 0, 0, estimate_sizes=True, watch=True)
+        self.assertFalse(estimated)
+        watcher = self.runner.watcher
+        self.runner.run(self.roots[0], 0, 0, watch=True)
+        self.assertIs(self.runner.watcher, watcher)
+        self.runner.run(self.roots[1], 0, 0, watch=True)
+        self.assertIsNot(self.runner.watcher, watcher)
+        self.assertEqual(self._paths(records), self.venv_paths[:1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Unit tests for size_estimator utility module.
+"""
+import unittest
+import os
+import random
+import threading
+import tempfile
+import shutil
+from utils.size_estimator import (
+    estimate_folder_size,
+    refine_sizes_in_background
+)
+from utils.venv_scanner import get_folder_size, scan_for_venvs
+
+
+class TestSizeEstimator(unittest.TestCase):
+    """Test cases for size estimator functions."""
+
+    def setUp(self):
+        """Set up a venv with 120 small packages and a large extension module."""
+        self.test_dir = tempfile.mkdtemp()
+        self.venv_dir = os.path.join(self.test_dir, "project", "venv")
+        rng = random.Random(42)
+        for index in range(600):
+            package_dir = os.path.join(self.venv_dir, "site-packages", f"pkg{index % 120}")
+            os.makedirs(package_dir, exist_ok=True)
+            with open(os.path.join(package_dir, f"module{index}.py"), "wb") as f:
+                f.write(b"x" * rng.randint(100, 5000))
+        with open(os.path.join(self.venv_dir, "site-packages", "_core.so"), "wb") as f:
+            f.write(b"x" * 2000000)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_estimate_within_confidence_interval(self):
+        """Test that the exact size lies within the reported interval."""
+        exact_mb = get_folder_size(self.venv_dir)
+        estimate = estimate_folder_size(self.venv_dir, sample_size=40, seed=1, max_listed_dirs=2)
+        self.assertFalse(estimate["exact"])
+        # venv and site-packages, then 40 of the 120 package folders
+        self.assertEqual(estimate["dirs_listed"], 42)
+        self.assertEqual(estimate["file_count"], 601)
+        self.assertEqual(estimate["sampled"], 1 + 40 * 5)
+        self.assertLessEqual(estimate["lower_mb"], exact_mb)
+        self.assertGreaterEqual(estimate["upper_mb"], exact_mb)
+        self.assertLess(abs(estimate["size_mb"] - exact_mb) / exact_mb, 0.1)
+
+    def test_estimate_small_folder_is_exact(self):
+        """Test that folders with few enough subtrees are measured exactly."""
+        estimate = estimate_folder_size(self.venv_dir, sample_size=1000)
+        self.assertTrue(estimate["exact"])
+        self.assertEqual(estimate["dirs_listed"], 122)
+        self.assertAlmostEqual(estimate["size_mb"], get_folder_size(self.venv_dir))
+        self.assertEqual(estimate["lower_mb"], estimate["upper_mb"])
+
+    def test_estimate_invalid_sample_size(self):
+        """Test estimation with a non-positive sample size."""
+        with self.assertRaises(ValueError):
+            estimate_folder_size(self.venv_dir, sample_size=0)
+        with self.assertRaises(ValueError):
+            estimate_folder_size(self.venv_dir, max_listed_dirs=0)
+
+    def test_scan_with_estimates_and_refinement(self):
+        """Test that estimated scan results are refined to exact sizes."""
+        venv_list = scan_for_venvs(self.test_dir, days_unused=0, min_size_mb=0, estimate_sizes=True)
+        self.assertEqual(len(venv_list), 1)
+        self.assertFalse(venv_list[0]["size_exact"])
+
+        refined = {}
+        done = threading.Event()
+
+        def on_refined(index, size_mb):
+            refined[index] = size_mb
+            done.set()
+
+        refine_sizes_in_background(venv_list, on_refined, get_folder_size).join(5)
+        self.assertTrue(done.is_set())
+        self.assertAlmostEqual(refined[0], get_folder_size(self.venv_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for size_history utility module.
+"""
+import unittest
+import os
+import time
+import tempfile
+import shutil
+from utils.size_history import SizeHistory, record_scan_history
+
+DAY = 24 * 60 * 60
+
+
+class TestSizeHistory(unittest.TestCase):
+    """Test cases for the append-only size history."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.test_dir, "history")
+        self.start = 1_699_920_000.0
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _scan(self, day):
+        """Return scan records for a day: one growing, one steady and one shrinking venv."""
+        return [
+            {"venv_path": "/data/growing/venv", "size_mb": 100.0 + 10 * day, "age_days": 0.0},
+            {"venv_path": "/data/steady/venv", "size_mb": 250.0, "age_days": float(day)},
+            {"venv_path": "/data/shrinking/venv", "size_mb": max(400.0 - day, 1.0), "age_days": float(day)},
+        ]
+
+    def _record_days(self, history, days):
+        """Record one scan per day."""
+        for day in range(days):
+            history.record_scan(self._scan(day), self.start + day * DAY)
+
+    def test_round_trip_across_keyframes(self):
+        """Test that delta frames decode to the recorded values after reopening."""
+        history = SizeHistory(self.store_dir, keyframe_interval=4)
+        self._record_days(history, 10)
+
+        reopened = SizeHistory(self.store_dir, keyframe_interval=4)
+        self.assertEqual(len(reopened.frame_times()), 10)
+        snapshot = reopened.snapshot_at(self.start + 6 * DAY)
+        self.assertAlmostEqual(snapshot["/data/growing/venv"][0], 160.0, places=2)
+        self.assertAlmostEqual(snapshot["/data/steady/venv"][1], 6.0)
+        series = reopened.series("/data/shrinking/venv")
+        self.assertEqual([round(size_mb) for _, size_mb, _ in series], [400 - day for day in range(10)])
+        self.assertEqual(reopened.snapshot_at(self.start - DAY), {})
+
+    def test_top_growers(self):
+        """Test ranking venvs by growth over a period."""
+        history = SizeHistory(self.store_dir)
+        self._record_days(history, 60)
+        now = self.start + 59 * DAY
+
+        growers = history.top_growers(days=30, now=now)
+        self.assertEqual([grower["venv_path"] for grower in growers], ["/data/growing/venv"])
+        self.assertAlmostEqual(growers[0]["growth_mb"], 300.0, places=1)
+        self.assertAlmostEqual(growers[0]["growth_mb_per_day"], 10.0, places=2)
+        totals = history.total_series()
+        self.assertEqual(len(totals), 60)
+        self.assertEqual(totals[0][2], 3)
+        self.assertAlmostEqual(totals[0][1], 750.0, places=1)
+
+        # A venv created inside the period grows from zero
+        history.record_scan(self._scan(60) + [{"venv_path": "/data/new/venv", "size_mb": 900.0, "age_days": 0.0}],
+                            now + DAY)
+        growers = history.top_growers(days=30, now=now + DAY)
+        self.assertEqual(growers[0]["venv_path"], "/data/new/venv")
+        self.assertEqual((growers[0]["start_mb"], growers[0]["growth_mb"]), (0.0, 900.0))
+
+    def test_downsample_and_out_of_order(self):
+        """Test thinning old frames and rejecting frames recorded out of order."""
+        history = SizeHistory(self.store_dir)
+        for hour in range(0, 72, 6):
+            history.record_scan(self._scan(hour / 24), self.start + hour * 3600)
+        removed = history.downsample(now=self.start + 60 * DAY)
+        self.assertEqual(removed, 9)
+        self.assertEqual(len(SizeHistory(self.store_dir).frame_times()), 3)
+        self.assertAlmostEqual(history.snapshot_at(self.start + 3 * DAY)["/data/growing/venv"][0], 127.5, places=2)
+
+        with self.assertRaises(ValueError):
+            history.record_scan(self._scan(0), self.start)
+
+    def test_torn_frame_is_dropped(self):
+        """Test that a partially written frame is cut off when the store is opened."""
+        history = SizeHistory(self.store_dir)
+        self._record_days(history, 3)
+        segment = [name for name in os.listdir(self.store_dir) if name.startswith("seg-")][0]
+        with open(os.path.join(self.store_dir, segment), "ab") as f:
+            f.write(b"VRHF\x00\x01")
+
+        # A read-only reader may be racing an appending writer, so it leaves the tail alone
+        size = os.path.getsize(os.path.join(self.store_dir, segment))
+        reader = SizeHistory(self.store_dir, read_only=True)
+        self.assertEqual(len(reader.frame_times()), 3)
+        self.assertEqual(os.path.getsize(os.path.join(self.store_dir, segment)), size)
+        with self.assertRaises(ValueError):
+            reader.record_scan(self._scan(3), self.start + 3 * DAY)
+
+        reopened = SizeHistory(self.store_dir)
+        self.assertEqual(len(reopened.frame_times()), 3)
+        reopened.record_scan(self._scan(3), self.start + 3 * DAY)
+        self.assertEqual(len(SizeHistory(self.store_dir).series("/data/growing/venv")), 4)
+
+    def test_record_scan_history(self):
+        """Test the helper used after a scan."""
+        success, message = record_scan_history(self._scan(0), self.store_dir)
+        self.assertTrue(success, message)
+        self.assertLessEqual(SizeHistory(self.store_dir).frame_times()[0], time.time())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit tests for snapshot_cache utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.snapshot_cache import SnapshotCache, site_packages_token
+from utils.requirements_generator import generate_requirements_from_venv, generate_requirements_for_multiple_venvs
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """Test cases for the requirements snapshot cache."""
+
+    def setUp(self):
+        """Set up venvs whose mock python.exe cannot run pip."""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = SnapshotCache(os.path.join(self.test_dir, "snapshots.db"), max_entries=2)
+        self.venv_infos = []
+        for name in ("alpha", "beta", "gamma"):
+            project_path = os.path.join(self.test_dir, name)
+            venv_path = os.path.join(project_path, "venv")
+            os.makedirs(os.path.join(venv_path, "Lib", "site-packages", "requests-2.31.0.dist-info"))
+            os.makedirs(os.path.join(venv_path, "Scripts"))
+            with open(os.path.join(venv_path, "Scripts", "python.exe"), "w") as f:
+                f.write("mock python")
+            self.venv_infos.append({"venv_path": venv_path, "project_path": project_path})
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.cache.close()
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_token_tracks_installed_packages(self):
+        """Test that the token changes when a distribution is added."""
+        venv_path = self.venv_infos[0]["venv_path"]
+        token = site_packages_token(venv_path)
+        self.assertEqual(site_packages_token(venv_path), token)
+        os.makedirs(os.path.join(venv_path, "Lib", "site-packages", "six-1.16.0.dist-info"))
+        self.assertNotEqual(site_packages_token(venv_path), token)
+        self.assertIsNone(site_packages_token(self.test_dir))
+
+    def test_cached_snapshot_is_written(self):
+        """Test that a cached snapshot is written without running pip, until packages change."""
+        venv_info = self.venv_infos[0]
+        output_path = os.path.join(venv_info["project_path"], "requirements.txt")
+        self.assertTrue(self.cache.put(venv_info["venv_path"], "requests==2.31.0\n"))
+
+        success, message = generate_requirements_from_venv(venv_info["venv_path"], output_path, cache=self.cache)
+        self.assertTrue(success, message)
+        self.assertIn("cached", message)
+        with open(output_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "requests==2.31.0\n")
+
+        os.makedirs(os.path.join(venv_info["venv_path"], "Lib", "site-packages", "six-1.16.0.dist-info"))
+        success, _ = generate_requirements_from_venv(venv_info["venv_path"], output_path, overwrite=True, cache=self.cache)
+        self.assertFalse(success)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_dry_run_snapshots_are_reused(self):
+        """Test that a second pass over the same venvs is answered from the cache."""
+        for venv_info in self.venv_infos[:2]:
+            self.cache.put(venv_info["venv_path"], "pip==24.0\n")
+        for _ in range(2):
+            result = generate_requirements_for_multiple_venvs(self.venv_infos[:2], overwrite=True, cache=self.cache)
+            self.assertEqual(result["successful"], 2)
+        self.assertEqual(self.cache.hits, 4)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Test that the cache keeps at most max_entries venvs, dropping the least recently used."""
+        alpha, beta, gamma = (venv_info["venv_path"] for venv_info in self.venv_infos)
+        self.cache.put(alpha, "a==1\n")
+        self.cache.put(beta, "b==1\n")
+        self.assertIsNotNone(self.cache.get(alpha))
+        self.cache.put(gamma, "c==1\n")
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIsNone(self.cache.get(beta))
+        self.assertEqual(self.cache.get(alpha), "a==1\n")
+        with self.assertRaises(ValueError):
+            SnapshotCache(":memory:", max_entries=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
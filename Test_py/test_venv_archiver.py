@@ -0,0 +1,133 @@
+"""
+Unit tests for venv_archiver utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.venv_archiver import (
+    archive_venv,
+    restore_venv,
+    verify_archive,
+    get_manifest_path,
+    list_archives,
+    archive_multiple_venvs
+)
+from utils.venv_deleter import delete_venv
+
+
+class TestVenvArchiver(unittest.TestCase):
+    """Test cases for venv archiver functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.test_dir, "store")
+        self.venv1 = os.path.join(self.test_dir, "project1", "venv")
+        self.venv2 = os.path.join(self.test_dir, "project2", "venv")
+        self.shared = os.urandom(50000)
+
+        for venv_path in (self.venv1, self.venv2):
+            lib_dir = os.path.join(venv_path, "lib", "site-packages")
+            os.makedirs(lib_dir, exist_ok=True)
+            with open(os.path.join(lib_dir, "shared.so"), "wb") as f:
+                f.write(self.shared)
+            with open(os.path.join(venv_path, "pyvenv.cfg"), "w") as f:
+                f.write(f"home = {venv_path}\n")
+            os.makedirs(os.path.join(venv_path, "empty"), exist_ok=True)
+        os.symlink("lib", os.path.join(self.venv1, "lib64"))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _chunk_files(self):
+        """List chunk file paths in the store."""
+        return [os.path.join(dirpath, name)
+                for dirpath, _, files in os.walk(os.path.join(self.store_dir, "chunks")) for name in files]
+
+    def _count_chunks(self):
+        """Count chunk files in the store."""
+        return sum(len(files) for _, _, files in os.walk(os.path.join(self.store_dir, "chunks")))
+
+    def test_archive_and_restore(self):
+        """Test that a restored venv matches the original."""
+        success, message = archive_venv(self.venv1, self.store_dir)
+        self.assertTrue(success, message)
+        shutil.rmtree(self.venv1)
+
+        success, message = restore_venv(self.store_dir, self.venv1)
+        self.assertTrue(success, message)
+        with open(os.path.join(self.venv1, "lib", "site-packages", "shared.so"), "rb") as f:
+            self.assertEqual(f.read(), self.shared)
+        self.assertTrue(os.path.islink(os.path.join(self.venv1, "lib64")))
+        self.assertTrue(os.path.isdir(os.path.join(self.venv1, "empty")))
+
+    def test_identical_files_stored_once(self):
+        """Test that identical files across venvs share chunks."""
+        result = archive_multiple_venvs([self.venv1, self.venv2], self.store_dir)
+        self.assertEqual(result["successful"], 2)
+        # shared.so once, plus one distinct pyvenv.cfg per venv
+        self.assertEqual(self._count_chunks(), 3)
+        self.assertEqual(len(list_archives(self.store_dir)), 2)
+
+    def test_restore_missing_archive(self):
+        """Test restoring a venv that was never archived."""
+        success, message = restore_venv(self.store_dir, self.venv1)
+        self.assertFalse(success)
+        self.assertIn("No archive found", message)
+
+    def test_restore_into_non_empty_target(self):
+        """Test that restore refuses to overwrite an existing venv."""
+        archive_venv(self.venv1, self.store_dir)
+        success, message = restore_venv(self.store_dir, self.venv1)
+        self.assertFalse(success)
+        self.assertIn("not empty", message)
+
+    def test_archive_venv_empty_path(self):
+        """Test archiving with empty venv path."""
+        with self.assertRaises(ValueError):
+            archive_venv("", self.store_dir)
+
+    def test_delete_venv_with_archive(self):
+        """Test that deleting with an archive store archives first."""
+        success, message = delete_venv(self.venv1, dry_run=False, archive_store=self.store_dir)
+        self.assertTrue(success, message)
+        self.assertFalse(os.path.exists(self.venv1))
+        success, message = restore_venv(self.store_dir, self.venv1)
+        self.assertTrue(success, message)
+
+    def test_corrupt_chunk_blocks_delete_and_restore(self):
+        """Test that a damaged chunk fails verification, deletion and restore."""
+        archive_venv(self.venv1, self.store_dir)
+        self.assertTrue(verify_archive(self.store_dir, self.venv1)[0])
+        for chunk_path in self._chunk_files():
+            with open(chunk_path, "r+b") as f:
+                f.seek(-1, os.SEEK_END)
+                last = f.read(1)
+                f.seek(-1, os.SEEK_END)
+                f.write(bytes([last[0] ^ 0xFF]))
+        self.assertFalse(verify_archive(self.store_dir, self.venv1)[0])
+        success, message = delete_venv(self.venv1, dry_run=False, archive_store=self.store_dir)
+        self.assertFalse(success)
+        self.assertIn("failed verification", message)
+        self.assertTrue(os.path.exists(self.venv1))
+        success, message = restore_venv(self.store_dir, self.venv1, os.path.join(self.test_dir, "restored"))
+        self.assertFalse(success)
+        self.assertIn("Corrupt chunk", message)
+
+    def test_malformed_manifest(self):
+        """Test that a truncated manifest is reported, not raised."""
+        archive_multiple_venvs([self.venv1, self.venv2], self.store_dir)
+        with open(get_manifest_path(self.store_dir, self.venv1), "w") as f:
+            f.write('{"version": 1, "entr')
+        self.assertEqual(len(list_archives(self.store_dir)), 1)
+        success, message = restore_venv(self.store_dir, self.venv1, os.path.join(self.test_dir, "restored"))
+        self.assertFalse(success)
+        self.assertIn("Malformed manifest", message)
+        self.assertFalse(verify_archive(self.store_dir, self.venv1)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Unit tests for venv_deduplicator utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from unittest import mock
+from utils.venv_deduplicator import (
+    PARTIAL_HASH_BYTES,
+    find_duplicate_files,
+    deduplicate_venvs
+)
+
+
+class TestVenvDeduplicator(unittest.TestCase):
+    """Test cases for venv deduplicator functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.venv1 = os.path.join(self.test_dir, "project1", "venv")
+        self.venv2 = os.path.join(self.test_dir, "project2", "venv")
+        self.content = os.urandom(20000)
+
+        self.file1 = self._write(self.venv1, "numpy/core.so", self.content)
+        self.file2 = self._write(self.venv2, "numpy/core.so", self.content)
+        self.unique = self._write(self.venv2, "other.so", os.urandom(20000))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, venv_path, relative_path, content):
+        """Write a file inside a venv and return its path."""
+        file_path = os.path.join(venv_path, relative_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(content)
+        return file_path
+
+    def test_find_duplicate_files(self):
+        """Test that identical files across venvs are grouped."""
+        groups = find_duplicate_files([self.venv1, self.venv2])
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(sorted(groups[0]["paths"]), sorted([self.file1, self.file2]))
+        self.assertEqual(groups[0]["bytes_saved"], len(self.content))
+
+    def test_find_duplicate_files_same_head_and_tail(self):
+        """Test that the full hash separates files with equal head and tail."""
+        edge = os.urandom(PARTIAL_HASH_BYTES)
+        self._write(self.venv1, "a.bin", edge + b"A" * 1000 + edge)
+        self._write(self.venv2, "a.bin", edge + b"B" * 1000 + edge)
+        groups = find_duplicate_files([self.venv1, self.venv2])
+        self.assertEqual(len(groups), 1)
+
+    def test_deduplicate_venvs_dry_run(self):
+        """Test dry run reports savings without linking files."""
+        result = deduplicate_venvs([self.venv1, self.venv2], dry_run=True)
+        self.assertEqual(result["total"], 1)
+        self.assertEqual(result["bytes_saved"], len(self.content))
+        self.assertNotEqual(os.stat(self.file1).st_ino, os.stat(self.file2).st_ino)
+
+    def test_deduplicate_venvs_hardlink(self):
+        """Test actual deduplication hardlinks identical files."""
+        result = deduplicate_venvs([self.venv1, self.venv2], dry_run=False)
+        self.assertEqual(result["successful"], 1)
+        self.assertEqual(result["failed"], 0)
+        self.assertEqual(os.stat(self.file1).st_ino, os.stat(self.file2).st_ino)
+        with open(self.file2, "rb") as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(os.stat(self.unique).st_nlink, 1)
+
+    def test_deduplicate_venvs_already_linked(self):
+        """Test that a second run finds nothing left to deduplicate."""
+        deduplicate_venvs([self.venv1, self.venv2], dry_run=False)
+        result = deduplicate_venvs([self.venv1, self.venv2], dry_run=True)
+        self.assertEqual(result["total"], 0)
+        self.assertEqual(result["bytes_saved"], 0)
+
+    def test_deduplicate_venvs_skips_linked_targets(self):
+        """Test that files already linked to the source are not counted again."""
+        deduplicate_venvs([self.venv1, self.venv2], dry_run=False)
+        venv3 = os.path.join(self.test_dir, "project3", "venv")
+        file3 = self._write(venv3, "numpy/core.so", self.content)
+        result = deduplicate_venvs([self.venv1, self.venv2, venv3], dry_run=True)
+        self.assertEqual((result["total"], result["successful"]), (1, 1))
+        result = deduplicate_venvs([self.venv1, self.venv2, venv3], dry_run=False)
+        self.assertEqual((result["total"], result["successful"], result["failed"]), (1, 1, 0))
+        self.assertEqual(os.stat(file3).st_ino, os.stat(self.file1).st_ino)
+
+    def test_deduplicate_venvs_vanished_source(self):
+        """Test that a source removed after hashing fails its group only."""
+        groups = find_duplicate_files([self.venv1, self.venv2])
+        os.remove(groups[0]["paths"][0])
+        with mock.patch("utils.venv_deduplicator.find_duplicate_files", return_value=groups):
+            result = deduplicate_venvs([self.venv1, self.venv2], dry_run=False)
+        self.assertEqual((result["total"], result["successful"], result["failed"]), (1, 0, 1))
+        self.assertEqual(result["bytes_saved"], 0)
+
+    def test_deduplicate_venvs_rewritten_target(self):
+        """Test that a file rewritten at the same size after hashing is not replaced."""
+        groups = find_duplicate_files([self.venv1, self.venv2])
+        target = groups[0]["paths"][1]
+        changed = os.urandom(len(self.content))
+        with open(target, "r+b") as f:
+            f.write(changed)
+        hashed_mtime_ns = groups[0]["identities"][1][3]
+        os.utime(target, ns=(hashed_mtime_ns + 10 ** 9, hashed_mtime_ns + 10 ** 9))
+        with mock.patch("utils.venv_deduplicator.find_duplicate_files", return_value=groups):
+            result = deduplicate_venvs([self.venv1, self.venv2], dry_run=False)
+        self.assertEqual((result["total"], result["successful"], result["failed"]), (1, 0, 1))
+        self.assertIn("changed since it was hashed", result["failures"][0][1])
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), changed)
+
+    def test_deduplicate_venvs_invalid_mode(self):
+        """Test deduplication with an unsupported link mode."""
+        with self.assertRaises(ValueError):
+            deduplicate_venvs([self.venv1], link_mode="symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
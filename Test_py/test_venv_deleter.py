@@ -8,7 +8,8 @@ import shutil
 from utils.venv_deleter import (
     delete_venv,
     delete_multiple_venvs,
-    calculate_space_freed
+    calculate_space_freed,
+    calculate_space_freed_by_type
 )
 
 
@@ -98,6 +99,17 @@ class TestVenvDeleter(unittest.TestCase):
         total = calculate_space_freed(venv_list)
         self.assertAlmostEqual(total, 351.0, places=1)
     
+    def test_calculate_space_freed_by_type(self):
+        """Test space calculation grouped by artifact type."""
+        venv_list = [
+            {"size_mb": 100.0},
+            {"size_mb": 50.0, "artifact_type": "node_modules"},
+            {"size_mb": 25.0, "artifact_type": "venv"},
+        ]
+        
+        totals = calculate_space_freed_by_type(venv_list)
+        self.assertEqual(totals, {"venv": 125.0, "node_modules": 50.0})
+    
     def test_calculate_space_freed_empty(self):
         """Test space calculation with empty list."""
         total = calculate_space_freed([])
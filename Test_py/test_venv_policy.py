@@ -0,0 +1,68 @@
+"""
+Unit tests for venv_policy utility module.
+"""
+import unittest
+from utils.venv_policy import (
+    ScanColumns,
+    compile_policy,
+    default_policy_text,
+    apply_policy,
+    encode_python_version
+)
+from utils.venv_scanner import filter_venvs_by_policy
+
+
+class TestVenvPolicy(unittest.TestCase):
+    """Test cases for venv policy functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.records = [
+            {"venv_path": "/data/a/venv", "age_days": 100, "size_mb": 600, "python_version": "3.7.9", "in_use": False},
+            {"venv_path": "/data/b/venv", "age_days": 100, "size_mb": 300, "python_version": "3.11.7", "in_use": False},
+            {"venv_path": "/home/c/venv", "age_days": 100, "size_mb": 300, "python_version": "3.10.2", "in_use": True},
+            {"venv_path": "/home/d/venv", "age_days": 10, "size_mb": 900, "python_version": "3.12.0", "in_use": False},
+        ]
+
+    def _paths(self, policy_text):
+        """Return the venv paths selected by a policy."""
+        return [record["venv_path"] for record in compile_policy(policy_text).filter(self.records)]
+
+    def test_default_policy_matches_classic_criteria(self):
+        """Test that the default policy equals the age and size criteria."""
+        self.assertEqual(self._paths(default_policy_text(60, 200)), ["/data/a/venv", "/data/b/venv", "/home/c/venv"])
+
+    def test_per_root_thresholds(self):
+        """Test per-root size thresholds using path globs."""
+        policy = "(venv_path matches '/data/*' and size_mb > 500) or (venv_path matches '/home/*' and size_mb > 200)"
+        self.assertEqual(self._paths(policy), ["/data/a/venv", "/home/c/venv", "/home/d/venv"])
+
+    def test_python_version_and_in_use(self):
+        """Test version comparison and the in_use flag."""
+        self.assertEqual(self._paths("python_version < '3.11' and not in_use"), ["/data/a/venv"])
+        self.assertEqual(self._paths("python_version >= 3.10"), ["/data/b/venv", "/home/c/venv", "/home/d/venv"])
+        self.assertEqual(len(self._paths("age_days > -1 and size_mb != -0.5")), 4)
+
+    def test_not_binds_tighter_than_and(self):
+        """Test operator precedence of not, and, or."""
+        self.assertEqual(self._paths("not in_use and age_days > 50 or size_mb > 800"),
+                         ["/data/a/venv", "/data/b/venv", "/home/d/venv"])
+
+    def test_invalid_policies(self):
+        """Test that malformed policies raise ValueError."""
+        for text in ("", "size_mb >", "bogus > 1", "size_mb matches '1*'", "(age_days > 1", "size_mb > 'big'",
+                     "python_version < -3"):
+            with self.assertRaises(ValueError, msg=text):
+                compile_policy(text)
+
+    def test_apply_policy_and_columns(self):
+        """Test that apply_policy sets meets_criteria for every record."""
+        apply_policy(self.records, "size_mb > 500")
+        self.assertEqual([record["meets_criteria"] for record in self.records], [True, False, False, True])
+        self.assertEqual(len(ScanColumns(self.records)), 4)
+        self.assertEqual(encode_python_version("3.10.1"), 3010)
+        self.assertEqual(filter_venvs_by_policy(self.records, "age_days < 50")[0]["venv_path"], "/home/d/venv")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,8 @@ from utils.venv_scanner import (
     get_folder_size,
     get_venv_age_days,
     scan_for_venvs,
+    scan_for_artifacts,
+    detect_artifact_type,
     filter_venvs_by_criteria
 )
 
@@ -68,6 +70,32 @@ class TestVenvScanner(unittest.TestCase):
         with self.assertRaises(ValueError):
             scan_for_venvs("/nonexistent/directory")
     
+    def test_scan_for_artifacts_single_walk(self):
+        """Test that all artifact types are found and tagged in one scan."""
+        web_project = os.path.join(self.test_dir, "web_project")
+        os.makedirs(os.path.join(web_project, "node_modules", "left-pad"), exist_ok=True)
+        os.makedirs(os.path.join(self.test_project_dir, ".tox"), exist_ok=True)
+        os.makedirs(os.path.join(self.test_project_dir, "build"), exist_ok=True)
+        with open(os.path.join(self.test_project_dir, "pyproject.toml"), "w") as f:
+            f.write("[project]\n")
+        # A cache inside a venv must not be reported separately
+        os.makedirs(os.path.join(self.test_venv_dir, "__pycache__"), exist_ok=True)
+        
+        artifacts = scan_for_artifacts(self.test_dir, days_unused=0, min_size_mb=0)
+        types = sorted(info["artifact_type"] for info in artifacts)
+        self.assertEqual(types, ["build", "node_modules", "tox", "venv"])
+    
+    def test_scan_for_artifacts_unknown_type(self):
+        """Test scanning with an unknown artifact type."""
+        with self.assertRaises(ValueError):
+            scan_for_artifacts(self.test_dir, artifact_types=("bogus",))
+    
+    def test_detect_artifact_type_build_requires_project(self):
+        """Test that build/ is only an artifact next to a project file."""
+        self.assertIsNone(detect_artifact_type("build", ["notes.txt"]))
+        self.assertEqual(detect_artifact_type("build", ["setup.py"]), "build")
+        self.assertIsNone(detect_artifact_type("node_modules", [], ("venv",)))
+    
     def test_filter_venvs_by_criteria(self):
         """Test filtering venvs by criteria."""
         venv_list = [
@@ -0,0 +1,94 @@
+"""
+Unit tests for venv_slimmer utility module.
+"""
+import unittest
+import os
+import tempfile
+import shutil
+from utils.venv_slimmer import (
+    find_slim_targets,
+    slim_venv,
+    slim_multiple_venvs
+)
+from utils.venv_deleter import calculate_space_freed
+
+
+class TestVenvSlimmer(unittest.TestCase):
+    """Test cases for venv slimmer functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.venv_dir = os.path.join(self.test_dir, "project", "venv")
+        self.site_packages = os.path.join(self.venv_dir, "lib", "python3.11", "site-packages")
+
+        self._write("lib/python3.11/site-packages/pkg/__init__.py", 100)
+        self._write("lib/python3.11/site-packages/pkg/__pycache__/__init__.cpython-311.pyc", 200)
+        self._write("lib/python3.11/site-packages/pkg/tests/test_pkg.py", 300)
+        self._write("lib/python3.11/site-packages/tests/__init__.py", 10)
+        self._write("lib/python3.11/site-packages/pkg-1.0.dist-info/METADATA", 50)
+        self._write("lib/python3.11/site-packages/pkg-1.0.dist-info/LICENSE.txt", 400)
+        self._write(".cache/pip/http/blob", 500)
+        self._write("bin/stale.pyc", 20)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, relative_path, size):
+        """Write a file of the given size inside the venv."""
+        file_path = os.path.join(self.venv_dir, *relative_path.split("/"))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(b"x" * size)
+
+    def test_find_slim_targets(self):
+        """Test that every rule finds its targets in one traversal."""
+        targets = find_slim_targets(self.venv_dir)
+        by_rule = {}
+        for rule_name, _, _, size_bytes in targets:
+            by_rule[rule_name] = by_rule.get(rule_name, 0) + size_bytes
+        self.assertEqual(by_rule, {"bytecode": 220, "tests": 300, "dist_info_docs": 400, "pip_cache": 500})
+
+    def test_slim_venv_dry_run(self):
+        """Test dry run reports per-rule bytes without removing anything."""
+        report = slim_venv(self.venv_dir, dry_run=True)
+        self.assertEqual(report["rules"]["tests"]["bytes"], 300)
+        self.assertEqual(report["rules"]["bytecode"]["count"], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.site_packages, "pkg", "tests")))
+        self.assertAlmostEqual(calculate_space_freed([report]), 1420 / (1024 * 1024))
+
+    def test_slim_venv_actual(self):
+        """Test actual slimming keeps runtime files."""
+        report = slim_venv(self.venv_dir, dry_run=False)
+        self.assertEqual(report["failed"], 0)
+        self.assertFalse(os.path.exists(os.path.join(self.site_packages, "pkg", "tests")))
+        self.assertFalse(os.path.exists(os.path.join(self.venv_dir, ".cache")))
+        self.assertTrue(os.path.exists(os.path.join(self.site_packages, "pkg", "__init__.py")))
+        self.assertTrue(os.path.exists(os.path.join(self.site_packages, "tests", "__init__.py")))
+        self.assertTrue(os.path.exists(os.path.join(self.site_packages, "pkg-1.0.dist-info", "METADATA")))
+
+    def test_slim_venv_custom_rules(self):
+        """Test slimming with a custom rule set."""
+        rules = {"bytecode": {"file_patterns": ["*.pyc"]}}
+        report = slim_venv(self.venv_dir, rules=rules, dry_run=True)
+        self.assertEqual(list(report["rules"]), ["bytecode"])
+        self.assertEqual(report["rules"]["bytecode"]["bytes"], 220)
+
+    def test_slim_venv_invalid_path(self):
+        """Test slimming a nonexistent venv."""
+        with self.assertRaises(ValueError):
+            slim_venv(os.path.join(self.test_dir, "missing"))
+
+    def test_slim_multiple_venvs(self):
+        """Test slimming several venvs including a missing one."""
+        result = slim_multiple_venvs([self.venv_dir, os.path.join(self.test_dir, "missing")])
+        self.assertEqual(result["total"], 2)
+        self.assertEqual(result["successful"], 1)
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(len(result["reports"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
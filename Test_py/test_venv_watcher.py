@@ -0,0 +1,106 @@
+"""
+Unit tests for venv_watcher utility module.
+"""
+import unittest
+import os
+import time
+import tempfile
+import shutil
+from unittest import mock
+from utils.venv_watcher import VenvWatcher
+
+
+class TestVenvWatcher(unittest.TestCase):
+    """Test cases for the live venv inventory."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.test_dir = tempfile.mkdtemp()
+        self.old_venv = self._create_venv("project_old", 1000)
+        os.utime(self.old_venv, (time.time() - 100 * 86400,) * 2)
+        self.watcher = VenvWatcher(self.test_dir, days_unused=60, min_size_mb=0, settle_seconds=0)
+        self.watcher.rescan()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.watcher.stop()
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _create_venv(self, project, size_bytes):
+        """Create a project containing a venv with one file."""
+        venv_path = os.path.join(self.test_dir, project, "venv")
+        site_packages = os.path.join(venv_path, "lib", "python3.11", "site-packages")
+        os.makedirs(site_packages, exist_ok=True)
+        with open(os.path.join(site_packages, "module.py"), "wb") as f:
+            f.write(b"x" * size_bytes)
+        return venv_path
+
+    def _drain(self):
+        """Process events until the queue is empty."""
+        while self.watcher.process_events(timeout=0.2):
+            pass
+
+    def _require_inotify(self):
+        """Skip tests that need inotify when it is unavailable."""
+        if not self.watcher.uses_inotify:
+            self.skipTest("inotify is not available")
+
+    def test_initial_inventory(self):
+        """Test that the initial scan finds existing venvs."""
+        inventory = self.watcher.inventory()
+        self.assertEqual([record["venv_path"] for record in inventory], [self.old_venv])
+        self.assertEqual([record["venv_path"] for record in self.watcher.reclaimable()], [self.old_venv])
+        self.assertEqual(self.watcher.reclaimable("age_days < 1"), [])
+
+    def test_active_venvs_are_cached(self):
+        """Test that inventory() reuses the active venv set until it expires."""
+        with mock.patch("utils.venv_watcher.get_active_venv_paths", return_value={self.old_venv}) as lookup:
+            for _ in range(5):
+                self.assertFalse(self.watcher.inventory()[0]["in_use"])
+            self.assertEqual(lookup.call_count, 0)
+            self.watcher.active_refresh_seconds = 0
+            self.assertTrue(self.watcher.inventory()[0]["in_use"])
+            self.assertEqual(lookup.call_count, 1)
+
+    def test_created_and_removed_venvs(self):
+        """Test that venvs appear and disappear without a rescan."""
+        self._require_inotify()
+        new_venv = self._create_venv(os.path.join("group", "project_new"), 1000)
+        self._drain()
+        self.assertIn(new_venv, [record["venv_path"] for record in self.watcher.inventory()])
+
+        shutil.rmtree(os.path.dirname(self.old_venv))
+        self._drain()
+        self.assertEqual([record["venv_path"] for record in self.watcher.inventory()], [new_venv])
+        self.assertEqual(self.watcher.rescans, 1)
+
+    def test_modified_venv_is_remeasured(self):
+        """Test that writes into site-packages update the venv size."""
+        self._require_inotify()
+        size_before = self.watcher.inventory()[0]["size_mb"]
+        site_packages = os.path.join(self.old_venv, "lib", "python3.11", "site-packages")
+        with open(os.path.join(site_packages, "big.so"), "wb") as f:
+            f.write(b"x" * 3 * 1024 * 1024)
+        self._drain()
+        self.assertAlmostEqual(self.watcher.inventory()[0]["size_mb"] - size_before, 3.0, places=2)
+
+    def test_polling_fallback(self):
+        """Test that periodic rescans keep the inventory current without inotify."""
+        watcher = VenvWatcher(self.test_dir, min_size_mb=0, rescan_interval=0.01, use_inotify=False)
+        watcher.rescan()
+        self.assertFalse(watcher.uses_inotify)
+        new_venv = self._create_venv("project_new", 1000)
+        time.sleep(0.02)
+        watcher.process_events()
+        self.assertIn(new_venv, [record["venv_path"] for record in watcher.inventory()])
+        self.assertEqual(watcher.rescans, 2)
+
+    def test_invalid_root(self):
+        """Test watching a missing directory."""
+        with self.assertRaises(ValueError):
+            VenvWatcher(os.path.join(self.test_dir, "missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -52,7 +52,6 @@ a = Analysis(
         'doctest',
         'argparse',
         'asyncio',
-        'concurrent',
         'multiprocessing',
         'pkg_resources',
     ],
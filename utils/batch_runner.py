@@ -0,0 +1,443 @@
+"""
+Utility module for unattended batch cleanups driven by a TOML config.
+
+A batch config lists one or more targets, each with its own roots and
+policy. Targets are scanned in order with the concurrent multi-root
+scanner, and venvs that meet the policy are deleted by a thread pool while
+the scan continues. A lock file keeps overlapping runs (e.g. from cron or
+the Task Scheduler) from working on the same roots, and an optional time
+budget stops the run cleanly: no new folders or deletions are started once
+it runs out, work in progress finishes, and everything done so far is
+saved. There is no resume: the next run scans from the start again, so
+deleted venvs are gone but a budget shorter than the scan never reaches
+the later roots.
+
+A folder found by several targets (overlapping roots, symlinks or bind
+mounts, compared by st_dev and inode) is handled by the first target whose
+policy it meets.
+
+Example config (see venv_remover.example.toml):
+
+    dry_run = true
+    workers = 4
+    time_budget_minutes = 30
+
+    [[targets]]
+    roots = ["D:/projects", "E:/archive"]
+    days_unused = 60
+    min_size_mb = 200
+
+    [[targets]]
+    roots = ["D:/experiments"]
+    policy = "age_days > 14 and python_version < '3.9'"
+"""
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, Set, Hashable
+from utils.multi_root_scanner import iter_multi_root_artifacts
+from utils.venv_policy import compile_policy, default_policy_text
+from utils.venv_scanner import validate_artifact_types
+from utils.venv_deleter import delete_venv
+from utils.io_order import IO_ORDERS
+from utils.requirements_generator import generate_requirements_from_venv
+from utils.result_exporter import create_exporter, RESULT_FIELDS, RESULT_TABLE
+from utils.scan_result_file import write_scan_results
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import fcntl
+except ImportError:  # Windows locks with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+
+_STATE_DIR = os.path.join(os.path.expanduser("~"), ".venv_remover")
+DEFAULT_LOCK_PATH = os.path.join(_STATE_DIR, "batch.lock")
+DEFAULT_RESULTS_PATH = os.path.join(_STATE_DIR, "batch_results.jsonl")
+DEFAULT_SCAN_RESULT_PATH = os.path.join(_STATE_DIR, "batch_scan.vrs")
+
+# Settings with their defaults; a config may only use these keys
+BATCH_DEFAULTS: Dict[str, Any] = {
+    "dry_run": True,
+    "workers": 2,
+    "time_budget_minutes": 0.0,
+    "create_requirements": False,
+    "archive_store": "",
+    "io_order": "listing",
+    "lock_path": DEFAULT_LOCK_PATH,
+    "results_path": DEFAULT_RESULTS_PATH,
+    "scan_result_path": DEFAULT_SCAN_RESULT_PATH,
+}
+TARGET_DEFAULTS: Dict[str, Any] = {
+    "roots": [],
+    "days_unused": 60,
+    "min_size_mb": 200,
+    "policy": "",
+    "artifact_types": ["venv"],
+}
+
+
+def _check_type(name: str, value: Any, expected: Any) -> None:
+    """Raise ValueError if value does not have the type of the default."""
+    expected_type = type(expected)
+    if isinstance(value, bool) != (expected_type is bool):
+        raise ValueError(f"{name} must be of type {expected_type.__name__}")
+    if expected_type is float and isinstance(value, int):
+        return
+    if not isinstance(value, expected_type):
+        raise ValueError(f"{name} must be of type {expected_type.__name__}")
+
+
+def _merge(section: Dict[str, Any], defaults: Dict[str, Any], context: str) -> Dict[str, Any]:
+    """Return defaults updated with section, rejecting unknown keys and wrong types."""
+    unknown = set(section) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown {context} settings: {', '.join(sorted(unknown))}")
+    merged = dict(defaults)
+    for name, value in section.items():
+        _check_type(f"{context}.{name}", value, defaults[name])
+        merged[name] = value
+    return merged
+
+
+def parse_batch_config(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a parsed batch config and fill in defaults.
+
+    Args:
+        data (Dict): Parsed TOML document.
+
+    Returns:
+        Dict: The settings of BATCH_DEFAULTS plus targets, a list of target
+            dicts with the keys of TARGET_DEFAULTS; policy is filled in from
+            days_unused and min_size_mb when not given.
+
+    Raises:
+        ValueError: If a setting is unknown or invalid, no target is given,
+            a target has no roots or a policy is malformed.
+    """
+    data = dict(data)
+    targets = data.pop("targets", [])
+    config = _merge(data, BATCH_DEFAULTS, "batch")
+    if config["workers"] < 1:
+        raise ValueError("workers must be at least 1")
+    if config["time_budget_minutes"] < 0:
+        raise ValueError("time_budget_minutes cannot be negative")
+    if config["io_order"] not in IO_ORDERS:
+        raise ValueError(f"Unknown io_order: {config['io_order']}")
+    for name in ("lock_path", "results_path", "scan_result_path", "archive_store"):
+        config[name] = os.path.expanduser(config[name])
+
+    if not isinstance(targets, list) or not targets:
+        raise ValueError("At least one [[targets]] table is required")
+    config["targets"] = []
+    for index, section in enumerate(targets):
+        if not isinstance(section, dict):
+            raise ValueError("Each target must be a [[targets]] table")
+        target = _merge(section, TARGET_DEFAULTS, f"targets[{index}]")
+        if not target["roots"] or not all(isinstance(root, str) and root for root in target["roots"]):
+            raise ValueError(f"targets[{index}].roots must list at least one directory")
+        validate_artifact_types(tuple(target["artifact_types"]))
+        target["policy"] = target["policy"] or default_policy_text(target["days_unused"], target["min_size_mb"])
+        compile_policy(target["policy"])
+        config["targets"].append(target)
+    return config
+
+
+def load_batch_config(config_path: str) -> Dict[str, Any]:
+    """
+    Read and validate a TOML batch config.
+
+    Args:
+        config_path (str): Path to the TOML file.
+
+    Returns:
+        Dict: Config as returned by parse_batch_config.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not valid TOML or the config is invalid.
+        RuntimeError: On Python < 3.11 without the tomli package.
+    """
+    if tomllib is None:
+        raise RuntimeError("Reading TOML needs Python 3.11+ or the tomli package (pip install tomli)")
+    with open(config_path, "rb") as f:
+        try:
+            data = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Invalid TOML in {config_path}: {e}")
+    return parse_batch_config(data)
+
+
+class RunLock:
+    """
+    Exclusive lock held for the duration of a batch run.
+
+    The lock is an OS file lock (fcntl.flock, msvcrt.locking on Windows),
+    so it is released when the process exits, even after a crash, and a
+    stale lock file never blocks later runs. The holder's PID is written
+    into the file for diagnosis.
+    """
+
+    def __init__(self, lock_path: str = DEFAULT_LOCK_PATH):
+        """
+        Create a lock; nothing is locked until acquire.
+
+        Args:
+            lock_path (str): Lock file, created if missing.
+        """
+        self.lock_path = lock_path
+        self._file = None
+
+    @property
+    def acquired(self) -> bool:
+        """Whether this instance holds the lock."""
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """
+        Try to take the lock without waiting.
+
+        Returns:
+            bool: True if the lock was taken, False if another run holds it.
+
+        Raises:
+            OSError: If the lock file cannot be created.
+        """
+        if self._file is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        lock_file = open(self.lock_path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        """Release the lock if held."""
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "RunLock":
+        """Try to acquire the lock; check acquired afterwards."""
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Release the lock."""
+        self.release()
+
+
+def _folder_id(path: str) -> Hashable:
+    """Return (st_dev, inode) of a folder, or its normalized path if it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return os.path.normcase(os.path.abspath(path))
+    return st.st_dev, st.st_ino
+
+
+def _process_venv(record: Dict[str, Any], config: Dict[str, Any], deadline: Optional[float]) -> List[Tuple[str, str, bool, str]]:
+    """Generate requirements for and delete one venv; returns (operation, venv_path, success, message) results."""
+    venv_path = record["venv_path"]
+    if deadline is not None and time.monotonic() >= deadline:
+        return [("skip", venv_path, False, "Skipped: time budget exhausted")]
+    results = []
+    if config["create_requirements"] and record.get("artifact_type", "venv") == "venv" and not config["dry_run"]:
+        output_path = os.path.join(record["project_path"], "requirements.txt")
+        success, message = generate_requirements_from_venv(venv_path, output_path, overwrite=True)
+        results.append(("requirements", venv_path, success, message))
+        if not success:
+            # Keep the venv when its requirements could not be saved
+            results.append(("delete", venv_path, False, "Not deleted, requirements.txt could not be created"))
+            return results
+    try:
+        success, message = delete_venv(venv_path, config["dry_run"], config["archive_store"] or None,
+                                       config["io_order"])
+    except ValueError as e:
+        success, message = False, str(e)
+    results.append(("dry_run_delete" if config["dry_run"] else "delete", venv_path, success, message))
+    return results
+
+
+def run_batch(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the targets of a batch config.
+
+    Venvs in use by a running process are never deleted. A folder found by
+    several targets is recorded once and handled by the first target whose
+    policy it meets. Results are streamed to results_path as they
+    complete, and the scan records found so far are written to
+    scan_result_path at the end, also when the time budget ran out. The
+    caller is responsible for holding the RunLock.
+
+    Args:
+        config (Dict): Config as returned by load_batch_config.
+
+    Returns:
+        Dict: Summary with scanned (distinct folders found), total (venvs matching
+            a policy), successful, failed, skipped (not started before the
+            budget ran out), budget_exhausted, elapsed_s, errors (targets
+            whose roots could not be scanned) and results, a list of
+            (venv_path, success, message) tuples of the deletions.
+    """
+    started = time.monotonic()
+    budget_s = config["time_budget_minutes"] * 60
+    deadline = started + budget_s if budget_s else None
+    records: List[Dict[str, Any]] = []
+    record_index: Dict[Hashable, int] = {}
+    claimed: Set[Hashable] = set()
+    results: List[Tuple[str, bool, str]] = []
+    counts = {"total": 0, "successful": 0, "failed": 0, "skipped": 0}
+    budget_exhausted = False
+    errors: List[str] = []
+    results_lock = threading.Lock()
+
+    exporter = create_exporter(config["results_path"], RESULT_FIELDS, RESULT_TABLE, append=True)
+    callbacks = {}
+
+    def _record_results(future) -> None:
+        if future.cancelled():
+            return
+        with results_lock:
+            for operation, venv_path, success, message in future.result():
+                if operation not in callbacks:
+                    callbacks[operation] = exporter.result_callback(operation)
+                callbacks[operation](venv_path, success, message)
+                if operation in ("delete", "dry_run_delete"):
+                    results.append((venv_path, success, message))
+                    counts["successful" if success else "failed"] += 1
+
+    executor = ThreadPoolExecutor(max_workers=config["workers"])
+    futures = []
+    try:
+        for target in config["targets"]:
+            scan = iter_multi_root_artifacts(target["roots"], target["days_unused"], target["min_size_mb"],
+                                             tuple(target["artifact_types"]), policy=target["policy"],
+                                             workers_per_device=config["workers"])
+            try:
+                for record in scan:
+                    folder_id = _folder_id(record["venv_path"])
+                    matches = record["meets_criteria"] and not record.get("in_use")
+                    if folder_id not in record_index:
+                        record_index[folder_id] = len(records)
+                        records.append(record)
+                    elif matches and folder_id not in claimed:
+                        # An earlier target found it but its policy did not match
+                        records[record_index[folder_id]] = record
+                    else:
+                        matches = False
+                    if matches:
+                        claimed.add(folder_id)
+                        counts["total"] += 1
+                        future = executor.submit(_process_venv, record, config, deadline)
+                        future.add_done_callback(_record_results)
+                        futures.append(future)
+                    if deadline is not None and time.monotonic() >= deadline:
+                        budget_exhausted = True
+                        break
+            except ValueError as e:
+                # A missing root (e.g. an unplugged drive) only skips its target
+                errors.append(f"{', '.join(target['roots'])}: {e}")
+            finally:
+                # Closing the scan cancels the folders not started yet
+                scan.close()
+            if budget_exhausted:
+                break
+    finally:
+        # Cancel the deletions not started yet (shutdown's cancel_futures needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        exporter.close()
+        write_scan_results(records, config["scan_result_path"])
+
+    # Deletions cancelled or skipped before they started
+    counts["skipped"] = counts["total"] - counts["successful"] - counts["failed"]
+    budget_exhausted = budget_exhausted or counts["skipped"] > 0
+    return dict(counts, scanned=len(records), budget_exhausted=budget_exhausted,
+                elapsed_s=time.monotonic() - started, errors=errors, results=results)
+
+
+def main(argv: Optional[List[str]] = None, default_config: str = "venv_remover.toml") -> int:
+    """
+    Command-line entry point for batch runs.
+
+    Usage:
+        python Venv_Remover.py [--config FILE] [--dry-run | --delete]
+
+    Args:
+        argv (Optional[List[str]]): Arguments, defaults to sys.argv[1:].
+        default_config (str): Config used when --config is not given.
+
+    Returns:
+        int: 0 on success, 1 if a deletion or target failed, 2 for an invalid config,
+            3 if another run holds the lock, 4 if the time budget ran out.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Delete unused venvs as configured in a TOML file.")
+    parser.add_argument("--config", default=default_config, help="TOML batch config")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--dry-run", dest="dry_run", action="store_true", default=None, help="Only preview deletions")
+    mode.add_argument("--delete", dest="dry_run", action="store_false", help="Delete, overriding dry_run = true")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_batch_config(args.config)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if args.dry_run is not None:
+        config["dry_run"] = args.dry_run
+
+    with RunLock(config["lock_path"]) as lock:
+        if not lock.acquired:
+            print(f"Another run holds {config['lock_path']}; exiting", file=sys.stderr)
+            return 3
+        summary = run_batch(config)
+
+    for venv_path, success, message in summary["results"]:
+        print(f"{'OK ' if success else 'ERR'} {message}")
+    for error in summary["errors"]:
+        print(f"Error scanning {error}", file=sys.stderr)
+    print(f"Scanned {summary['scanned']} folders, {summary['total']} matched: {summary['successful']} "
+          f"{'previewed' if config['dry_run'] else 'deleted'}, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped in {summary['elapsed_s']:.0f} s")
+    print(f"Results: {config['results_path']}")
+    if summary["budget_exhausted"]:
+        print(f"Time budget exhausted; {summary['skipped']} matched venvs were not processed. The next run "
+              f"scans from the start again; raise time_budget_minutes if later roots are never reached",
+              file=sys.stderr)
+        return 4
+    return 1 if summary["failed"] or summary["errors"] else 0
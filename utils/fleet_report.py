@@ -0,0 +1,374 @@
+"""
+Utility module for fleet-wide reports of reclaimable space.
+
+Each host writes a compact, gzip-compressed JSON-lines report of its scan
+results: one header line with host metadata followed by one line per
+venv. The aggregator streams any number of reports, from local files or
+over HTTP, one record at a time and keeps memory bounded: per-host totals
+are exact, while the rankings by project and by fingerprint use the
+Space-Saving algorithm with a fixed number of counters, whose error is
+reported next to each estimate. When a host sent several reports, only
+its newest (by generated_at) is counted.
+"""
+import os
+import io
+import gzip
+import json
+import heapq
+import socket
+import platform
+import urllib.request
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+
+REPORT_VERSION = 1
+REPORT_FIELDS = ("venv_path", "project_name", "artifact_type", "age_days", "size_mb",
+                 "python_version", "fingerprint", "in_use", "meets_criteria")
+DEFAULT_TOP_N = 20
+
+
+def write_host_report(venv_list: List[Dict[str, Any]], report_path: str, host: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Write a host report from scan results.
+
+    Args:
+        venv_list (List[Dict]): Results of scan_for_venvs or scan_for_artifacts.
+        report_path (str): Destination file, conventionally <host>.jsonl.gz.
+        host (Optional[str]): Host name, defaults to this machine's name.
+
+    Returns:
+        Tuple[bool, str]: (success_status, message)
+    """
+    header = {
+        "report": REPORT_VERSION,
+        "host": host or socket.gethostname(),
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "root_dirs": sorted({venv_info.get("root_dir", "") for venv_info in venv_list}),
+        "count": len(venv_list)
+    }
+    temp_path = f"{report_path}.tmp{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(header, separators=(",", ":")) + "\n")
+            for venv_info in venv_list:
+                record = {field: venv_info.get(field) for field in REPORT_FIELDS}
+                record["age_days"] = round(record["age_days"] or 0.0, 1)
+                record["size_mb"] = round(record["size_mb"] or 0.0, 2)
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(temp_path, report_path)
+        return True, f"Wrote report for {len(venv_list)} venvs to {report_path}"
+    except OSError as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False, f"Error writing report: {str(e)}"
+
+
+def _open_report(source: str):
+    """Open a report file or URL as a binary stream."""
+    if source.startswith(("http://", "https://")):
+        return urllib.request.urlopen(source, timeout=30)
+    return open(source, "rb")
+
+
+def _read_report(source: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the header and then the records of one host report.
+
+    Args:
+        source (str): Path or http(s) URL of a report.
+
+    Returns:
+        Iterator[Dict]: The header, followed by one dict per record.
+
+    Raises:
+        ValueError: If the source is not a host report.
+        OSError: If the source cannot be read.
+    """
+    with _open_report(source) as raw:
+        with io.TextIOWrapper(gzip.GzipFile(fileobj=raw), encoding="utf-8") as lines:
+            try:
+                header = json.loads(lines.readline())
+            except ValueError:
+                raise ValueError(f"Not a host report: {source}")
+            if not isinstance(header, dict) or header.get("report") != REPORT_VERSION or "host" not in header:
+                raise ValueError(f"Not a host report: {source}")
+            yield header
+            for line in lines:
+                yield json.loads(line)
+
+
+def iter_report(source: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Stream the records of one host report.
+
+    Args:
+        source (str): Path or http(s) URL of a report.
+
+    Returns:
+        Iterator[Tuple[Dict, Dict]]: (header, record) pairs.
+
+    Raises:
+        ValueError: If the source is not a host report.
+        OSError: If the source cannot be read.
+    """
+    lines = _read_report(source)
+    header = next(lines)
+    for record in lines:
+        yield header, record
+
+
+def _newest_per_host(sources: List[str], failed: List[Tuple[str, str]]) -> Tuple[List[str], List[str]]:
+    """
+    Pick the newest report of each host by reading only the headers.
+
+    Args:
+        sources (List[str]): Report paths or http(s) URLs.
+        failed (List[Tuple[str, str]]): Receives (source, message) for
+            reports whose header cannot be read.
+
+    Returns:
+        Tuple[List[str], List[str]]: (sources to aggregate, in their
+            original order; older reports of the same hosts)
+    """
+    newest: Dict[str, Tuple[str, int]] = {}
+    readable = []
+    for index, source in enumerate(sources):
+        lines = _read_report(source)
+        try:
+            header = next(lines)
+        except (OSError, EOFError, ValueError, StopIteration) as e:
+            failed.append((source, str(e)))
+            continue
+        finally:
+            # Only the header is needed; close the file or connection now
+            lines.close()
+        readable.append(index)
+        # ISO timestamps sort chronologically; on a tie the later source wins
+        generated_at = str(header.get("generated_at") or "")
+        current = newest.get(header["host"])
+        if current is None or generated_at >= current[0]:
+            newest[header["host"]] = (generated_at, index)
+    keep = {index for _, index in newest.values()}
+    return ([sources[index] for index in readable if index in keep],
+            [sources[index] for index in readable if index not in keep])
+
+
+def list_report_sources(directory: str) -> List[str]:
+    """
+    List the host reports in a directory.
+
+    Args:
+        directory (str): Folder containing *.jsonl.gz reports.
+
+    Returns:
+        List[str]: Report paths, sorted by name.
+    """
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".jsonl.gz")
+    )
+
+
+class _TopK:
+    """
+    Weighted Space-Saving summary keeping at most `capacity` counters.
+
+    Any key whose true weight exceeds total_weight / capacity is guaranteed
+    to be tracked; each estimate overshoots by at most its recorded error.
+    A min-heap with one entry per counter finds the counter to evict; since
+    weights only grow, entries are refreshed lazily when they reach the top.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Create an empty summary.
+
+        Args:
+            capacity (int): Maximum number of counters.
+        """
+        self.capacity = capacity
+        self.counters: Dict[str, List[float]] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def add(self, key: str, weight: float) -> None:
+        """Add weight to a key, evicting the smallest counter when full."""
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+            counter[1] += 1
+            return
+        error = 0.0
+        if len(self.counters) >= self.capacity:
+            while True:
+                heap_weight, smallest_key = self._heap[0]
+                current = self.counters[smallest_key][0]
+                if current == heap_weight:
+                    break
+                heapq.heapreplace(self._heap, (current, smallest_key))
+            heapq.heappop(self._heap)
+            error = self.counters.pop(smallest_key)[0]
+        self.counters[key] = [error + weight, 1, error]
+        heapq.heappush(self._heap, (error + weight, key))
+
+    def ranked(self, limit: int) -> List[Tuple[str, float, int, float]]:
+        """
+        Return the heaviest keys.
+
+        Returns:
+            List[Tuple[str, float, int, float]]: (key, weight, count, error).
+        """
+        top = heapq.nlargest(limit, self.counters.items(), key=lambda item: item[1][0])
+        return [(key, weight, int(count), error) for key, (weight, count, error) in top]
+
+
+def aggregate_reports(sources: List[str], top_n: int = DEFAULT_TOP_N, reclaimable_only: bool = True,
+                      capacity: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Merge host reports into one ranked, fleet-wide view.
+
+    Reports are streamed one record at a time; memory grows with the number
+    of hosts and `capacity`, not with the number of records. The headers are
+    read first so that only the newest report of each host is counted.
+
+    Args:
+        sources (List[str]): Report paths or http(s) URLs.
+        top_n (int): Length of each ranking.
+        reclaimable_only (bool): If True, rank only venvs meeting their
+            host's criteria and not in use; totals always cover everything.
+        capacity (Optional[int]): Counters kept per ranking, default 50 * top_n.
+
+    Returns:
+        Dict containing:
+            - reports: Number of reports read
+            - superseded: Older reports skipped because their host sent a
+              newer one
+            - records: Number of venv records read
+            - total_mb / reclaimable_mb: Fleet-wide totals
+            - hosts: Hosts ranked by reclaimable MB, each with host, count,
+              total_mb, reclaimable_mb and generated_at; hosts whose
+              report has no records are listed with zero totals
+            - projects: Ranking by project name, each (name, mb, count, error_mb)
+            - fingerprints: Ranking by fingerprint, same shape; a fingerprint
+              seen many times marks an environment duplicated across the fleet
+            - largest: The largest venvs, each (size_mb, host, venv_path)
+            - failed: List of (source, message) for unreadable reports;
+              records read before a report failed are still counted
+
+    Raises:
+        ValueError: If top_n or capacity is not positive.
+    """
+    if top_n < 1:
+        raise ValueError("top_n must be at least 1")
+    capacity = capacity or top_n * 50
+    if capacity < top_n:
+        raise ValueError("capacity must be at least top_n")
+
+    hosts: Dict[str, Dict[str, Any]] = {}
+    projects = _TopK(capacity)
+    fingerprints = _TopK(capacity)
+    largest: List[Tuple[float, str, str]] = []
+    totals = {"reports": 0, "records": 0, "total_mb": 0.0, "reclaimable_mb": 0.0}
+    failed: List[Tuple[str, str]] = []
+    sources, superseded = _newest_per_host(sources, failed)
+
+    for source in sources:
+        try:
+            lines = _read_report(source)
+            header = next(lines)
+            host = hosts.setdefault(header["host"], {
+                "host": header["host"], "count": 0, "total_mb": 0.0, "reclaimable_mb": 0.0
+            })
+            host["generated_at"] = header.get("generated_at")
+            for record in lines:
+                size_mb = float(record.get("size_mb") or 0.0)
+                reclaimable = bool(record.get("meets_criteria")) and not record.get("in_use")
+                host["count"] += 1
+                host["total_mb"] += size_mb
+                totals["records"] += 1
+                totals["total_mb"] += size_mb
+                if reclaimable:
+                    host["reclaimable_mb"] += size_mb
+                    totals["reclaimable_mb"] += size_mb
+                if reclaimable_only and not reclaimable:
+                    continue
+                projects.add(record.get("project_name") or "", size_mb)
+                if record.get("fingerprint"):
+                    fingerprints.add(record["fingerprint"], size_mb)
+                entry = (size_mb, header["host"], record.get("venv_path") or "")
+                if len(largest) < top_n:
+                    heapq.heappush(largest, entry)
+                elif entry > largest[0]:
+                    heapq.heapreplace(largest, entry)
+            totals["reports"] += 1
+        except (OSError, EOFError, ValueError, KeyError, StopIteration) as e:
+            failed.append((source, str(e)))
+
+    return dict(
+        totals,
+        superseded=superseded,
+        hosts=sorted(hosts.values(), key=lambda host: host["reclaimable_mb"], reverse=True),
+        projects=projects.ranked(top_n),
+        fingerprints=fingerprints.ranked(top_n),
+        largest=sorted(largest, reverse=True),
+        failed=failed
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point for writing and aggregating host reports.
+
+    Usage:
+        python -m utils.fleet_report report ROOT OUTPUT [--days-unused N] [--min-size-mb N]
+        python -m utils.fleet_report aggregate SOURCE [SOURCE ...] [--top N]
+
+    A SOURCE may be a report file, a directory of reports or an http(s) URL.
+
+    Args:
+        argv (Optional[List[str]]): Arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    import argparse
+    from utils.venv_scanner import scan_for_venvs
+
+    parser = argparse.ArgumentParser(description="Fleet-wide reclaimable space reports.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Scan this host and write a report")
+    report_parser.add_argument("root")
+    report_parser.add_argument("output")
+    report_parser.add_argument("--days-unused", type=int, default=60)
+    report_parser.add_argument("--min-size-mb", type=int, default=200)
+    aggregate_parser = subparsers.add_parser("aggregate", help="Merge reports into a ranked view")
+    aggregate_parser.add_argument("sources", nargs="+")
+    aggregate_parser.add_argument("--top", type=int, default=DEFAULT_TOP_N)
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        success, message = write_host_report(scan_for_venvs(args.root, args.days_unused, args.min_size_mb), args.output)
+        print(message)
+        return 0 if success else 1
+
+    sources = []
+    for source in args.sources:
+        sources.extend(list_report_sources(source) if os.path.isdir(source) else [source])
+    summary = aggregate_reports(sources, args.top)
+    print(f"{summary['reports']} reports, {summary['records']} venvs, "
+          f"{summary['reclaimable_mb'] / 1024:.1f} of {summary['total_mb'] / 1024:.1f} GB reclaimable")
+    print("\nHosts:")
+    for host in summary["hosts"][:args.top]:
+        print(f"  {host['host']}\t{host['reclaimable_mb']:.1f} MB reclaimable\t{host['count']} venvs")
+    for title, ranking in (("Projects", summary["projects"]), ("Fingerprints", summary["fingerprints"])):
+        print(f"\n{title}:")
+        for key, weight, count, error in ranking:
+            print(f"  {key}\t{weight:.1f} MB (+/- {error:.1f})\t{count} venvs")
+    for source, message in summary["failed"]:
+        print(f"Failed: {source}: {message}")
+    return 0 if not summary["failed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
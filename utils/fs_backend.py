@@ -0,0 +1,511 @@
+"""
+Utility module abstracting filesystem and process access.
+
+venv_scanner, venv_deleter and requirements_generator take an optional fs
+argument. OsBackend (the default, OS_BACKEND) forwards to os, shutil and
+subprocess. MemoryBackend keeps a file tree in memory, so tests can build
+trees with hundreds of thousands of files in seconds, add latency to every
+operation and inject faults such as EACCES, EBUSY or ENOENT (the entry
+vanishing between listing it and using it).
+
+Only the basic walk-based code paths use the backend; features built on
+real files (sampled size estimates, RECORD and inode-ordered sizing,
+archiving, snapshot caching) require the OS backend.
+"""
+import os
+import re
+import abc
+import stat
+import time
+import errno
+import shutil
+import subprocess
+from collections import Counter
+from typing import List, Dict, Any, Tuple, Optional, Iterator, Callable, Set
+from utils.io_order import rmtree_inode_order
+
+
+class FsBackend(abc.ABC):
+    """
+    Interface of a filesystem and process backend.
+
+    Paths are strings built with os.path.join, as with the os module.
+    Subclasses implement every method.
+    """
+
+    @abc.abstractmethod
+    def exists(self, path: str) -> bool:
+        """Return True if path exists."""
+
+    @abc.abstractmethod
+    def isdir(self, path: str) -> bool:
+        """Return True if path is a directory."""
+
+    @abc.abstractmethod
+    def isfile(self, path: str) -> bool:
+        """Return True if path is a regular file."""
+
+    @abc.abstractmethod
+    def listdir(self, path: str) -> List[str]:
+        """Return the entry names of a directory."""
+
+    @abc.abstractmethod
+    def walk(self, top: str, topdown: bool = True) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Walk a tree like os.walk; with topdown=True dirnames can be pruned."""
+
+    @abc.abstractmethod
+    def stat(self, path: str) -> os.stat_result:
+        """Return the stat result of path, following symlinks."""
+
+    @abc.abstractmethod
+    def lstat(self, path: str) -> os.stat_result:
+        """Return the stat result of path without following symlinks."""
+
+    @abc.abstractmethod
+    def getsize(self, path: str) -> int:
+        """Return the size of a file in bytes."""
+
+    @abc.abstractmethod
+    def getmtime(self, path: str) -> float:
+        """Return the modification time of path."""
+
+    @abc.abstractmethod
+    def read_text(self, path: str) -> str:
+        """Return the content of a text file."""
+
+    @abc.abstractmethod
+    def write_text(self, path: str, content: str) -> None:
+        """Create or replace a text file."""
+
+    @abc.abstractmethod
+    def chmod(self, path: str, mode: int) -> None:
+        """Change the permission bits of path."""
+
+    @abc.abstractmethod
+    def unlink(self, path: str) -> None:
+        """Remove a file or symlink."""
+
+    @abc.abstractmethod
+    def rmdir(self, path: str) -> None:
+        """Remove an empty directory."""
+
+    @abc.abstractmethod
+    def rmtree(self, path: str, io_order: str = "listing") -> None:
+        """Remove a directory tree; io_order "inode" unlinks in inode order."""
+
+    @abc.abstractmethod
+    def run(self, args: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Run a process and capture its text output."""
+
+    @abc.abstractmethod
+    def active_paths(self) -> Set[str]:
+        """Return the interpreters and venvs running processes use."""
+
+
+class OsBackend(FsBackend):
+    """Backend using the real filesystem and processes."""
+
+    def exists(self, path: str) -> bool:
+        """Return True if path exists."""
+        return os.path.exists(path)
+
+    def isdir(self, path: str) -> bool:
+        """Return True if path is a directory."""
+        return os.path.isdir(path)
+
+    def isfile(self, path: str) -> bool:
+        """Return True if path is a regular file."""
+        return os.path.isfile(path)
+
+    def listdir(self, path: str) -> List[str]:
+        """Return the entry names of a directory."""
+        return os.listdir(path)
+
+    def walk(self, top: str, topdown: bool = True) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Walk a tree with os.walk."""
+        return os.walk(top, topdown)
+
+    def stat(self, path: str) -> os.stat_result:
+        """Return os.stat(path)."""
+        return os.stat(path)
+
+    def lstat(self, path: str) -> os.stat_result:
+        """Return os.lstat(path)."""
+        return os.lstat(path)
+
+    def getsize(self, path: str) -> int:
+        """Return os.path.getsize(path)."""
+        return os.path.getsize(path)
+
+    def getmtime(self, path: str) -> float:
+        """Return os.path.getmtime(path)."""
+        return os.path.getmtime(path)
+
+    def read_text(self, path: str) -> str:
+        """Read a UTF-8 text file, replacing undecodable bytes."""
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+    def write_text(self, path: str, content: str) -> None:
+        """Write a UTF-8 text file."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def chmod(self, path: str, mode: int) -> None:
+        """Change the permission bits of path."""
+        os.chmod(path, mode)
+
+    def unlink(self, path: str) -> None:
+        """Remove a file or symlink."""
+        os.unlink(path)
+
+    def rmdir(self, path: str) -> None:
+        """Remove an empty directory."""
+        os.rmdir(path)
+
+    def rmtree(self, path: str, io_order: str = "listing") -> None:
+        """Remove a tree with shutil.rmtree or in inode order."""
+        if io_order == "inode":
+            rmtree_inode_order(path)
+        else:
+            shutil.rmtree(path)
+
+    def run(self, args: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Run a process with subprocess.run, capturing text output."""
+        return subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+
+    def active_paths(self) -> Set[str]:
+        """
+        Collect paths that running processes use as interpreters or venvs.
+
+        Reads argv[0], the executable and VIRTUAL_ENV of every readable
+        process from /proc. On platforms without /proc an empty set is
+        returned.
+
+        Returns:
+            Set[str]: Absolute paths of interpreters and activated venvs.
+        """
+        active_paths: Set[str] = set()
+        if not os.path.isdir("/proc"):
+            return active_paths
+
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit():
+                continue
+            proc_dir = os.path.join("/proc", pid)
+            try:
+                with open(os.path.join(proc_dir, "cmdline"), "rb") as f:
+                    argv0 = f.read().split(b"\0", 1)[0].decode("utf-8", "replace")
+                if os.path.isabs(argv0):
+                    active_paths.add(argv0)
+                active_paths.add(os.readlink(os.path.join(proc_dir, "exe")))
+                with open(os.path.join(proc_dir, "environ"), "rb") as f:
+                    for variable in f.read().split(b"\0"):
+                        if variable.startswith(b"VIRTUAL_ENV="):
+                            active_paths.add(variable[len(b"VIRTUAL_ENV="):].decode("utf-8", "replace"))
+            except OSError:
+                continue
+        return active_paths
+
+
+OS_BACKEND = OsBackend()
+
+
+class _Node:
+    """A file or directory of a MemoryBackend."""
+
+    __slots__ = ("children", "size", "mtime", "mode", "ino", "content")
+
+    def __init__(self, is_dir: bool, size: int, mtime: float, mode: int, ino: int, content: Optional[str]):
+        self.children: Optional[Dict[str, "_Node"]] = {} if is_dir else None
+        self.size = size
+        self.mtime = mtime
+        self.mode = mode
+        self.ino = ino
+        self.content = content
+
+
+class MemoryBackend(FsBackend):
+    """
+    In-memory backend for tests.
+
+    Files without write permission (add_file(..., read_only=True)) cannot be
+    unlinked, nor directories without it removed, until chmod restores it,
+    as on Windows. Processes are answered
+    by a handler set with set_process_handler and running interpreters by
+    set_active_paths. op_counts counts every call by operation name.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Create an empty tree.
+
+        Args:
+            latency (float): Seconds added to every operation except the
+                exists/isdir/isfile checks.
+        """
+        self.latency = latency
+        self.op_counts: Counter = Counter()
+        self._next_ino = 1
+        self._root = self._new_node(True, 0, None, stat.S_IFDIR | 0o755, None)
+        self._faults: List[Dict[str, Any]] = []
+        self._process_handler: Optional[Callable[[List[str]], Tuple[int, str, str]]] = None
+        self._active_paths: Set[str] = set()
+
+    def _new_node(self, is_dir: bool, size: int, mtime: Optional[float], mode: int, content: Optional[str]) -> _Node:
+        """Create a node with the next inode number."""
+        self._next_ino += 1
+        return _Node(is_dir, size, time.time() if mtime is None else mtime, mode, self._next_ino, content)
+
+    @staticmethod
+    def _split(path: str) -> List[str]:
+        """Split a path into components, accepting both separators and drive letters."""
+        return [part for part in re.split(r"[\\/]+", path) if part and part != "." and not part.endswith(":")]
+
+    def _lookup(self, path: str) -> Optional[_Node]:
+        """Return the node at path, or None."""
+        node = self._root
+        for part in self._split(path):
+            if node.children is None:
+                return None
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def _parent(self, path: str) -> Tuple[_Node, str]:
+        """Return the existing parent directory node and the entry name of path."""
+        parts = self._split(path)
+        parent = self._lookup("/".join(parts[:-1])) if parts else None
+        if parent is None or parent.children is None or not parts:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return parent, parts[-1]
+
+    def _enter(self, operation: str, path: str) -> None:
+        """Count an operation, apply latency and raise an injected fault."""
+        self.op_counts[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        key = tuple(self._split(path))
+        for fault in self._faults:
+            if fault["operation"] not in (operation, "*") or fault["remaining"] == 0:
+                continue
+            if fault["path"] != key[:len(fault["path"])]:
+                continue
+            if fault["remaining"] is not None:
+                fault["remaining"] -= 1
+            if fault["error"] == errno.ENOENT:
+                # The entry vanished between being listed and being used
+                parent, name = self._parent(path)
+                parent.children.pop(name, None)
+            raise OSError(fault["error"], os.strerror(fault["error"]), path)
+
+    def _require(self, path: str) -> _Node:
+        """Return the node at path or raise FileNotFoundError."""
+        node = self._lookup(path)
+        if node is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return node
+
+    def make_dirs(self, path: str, mtime: Optional[float] = None) -> None:
+        """
+        Create a directory and its missing parents.
+
+        Args:
+            path (str): Directory to create.
+            mtime (Optional[float]): Modification time of created directories.
+        """
+        node = self._root
+        for part in self._split(path):
+            child = node.children.get(part)
+            if child is None:
+                child = node.children[part] = self._new_node(True, 0, mtime, stat.S_IFDIR | 0o755, None)
+            node = child
+
+    def add_file(self, path: str, size: int = 0, content: Optional[str] = None, mtime: Optional[float] = None,
+                 read_only: bool = False) -> None:
+        """
+        Create a file, creating missing parent directories.
+
+        Args:
+            path (str): File to create.
+            size (int): Size in bytes; defaults to the length of content.
+            content (Optional[str]): Text returned by read_text.
+            mtime (Optional[float]): Modification time.
+            read_only (bool): If True, the file has no write permission.
+        """
+        parts = self._split(path)
+        self.make_dirs("/".join(parts[:-1]))
+        parent = self._lookup("/".join(parts[:-1]))
+        size = len(content.encode("utf-8")) if content is not None and not size else size
+        parent.children[parts[-1]] = self._new_node(False, size, mtime, stat.S_IFREG | (0o444 if read_only else 0o644), content)
+
+    def inject_fault(self, path: str, operation: str, error: int, times: Optional[int] = 1) -> None:
+        """
+        Make operations on a path (or anything below it) fail.
+
+        Args:
+            path (str): Path the fault applies to, including its subtree.
+            operation (str): Operation name as counted in op_counts (e.g.
+                "unlink", "lstat", "listdir", "run") or "*" for all.
+            error (int): errno of the raised OSError; errno.ENOENT also
+                removes the entry, simulating a concurrent deletion.
+            times (Optional[int]): Number of failures, None for every call.
+        """
+        self._faults.append({"path": tuple(self._split(path)), "operation": operation, "error": error, "remaining": times})
+
+    def set_process_handler(self, handler: Optional[Callable[[List[str]], Tuple[int, str, str]]]) -> None:
+        """
+        Answer run() calls.
+
+        Args:
+            handler (Optional[Callable]): Called with the argument list and
+                returning (returncode, stdout, stderr); it may raise
+                subprocess.TimeoutExpired. Without a handler run() raises
+                FileNotFoundError.
+        """
+        self._process_handler = handler
+
+    def set_active_paths(self, paths: List[str]) -> None:
+        """
+        Set the paths returned by active_paths(), as if processes ran them.
+
+        Args:
+            paths (List[str]): Interpreter or venv paths; empty by default.
+        """
+        self._active_paths = set(paths)
+
+    def exists(self, path: str) -> bool:
+        """Return True if path exists."""
+        self.op_counts["exists"] += 1
+        return self._lookup(path) is not None
+
+    def isdir(self, path: str) -> bool:
+        """Return True if path is a directory."""
+        self.op_counts["isdir"] += 1
+        node = self._lookup(path)
+        return node is not None and node.children is not None
+
+    def isfile(self, path: str) -> bool:
+        """Return True if path is a file."""
+        self.op_counts["isfile"] += 1
+        node = self._lookup(path)
+        return node is not None and node.children is None
+
+    def listdir(self, path: str) -> List[str]:
+        """Return the entry names of a directory."""
+        self._enter("listdir", path)
+        node = self._require(path)
+        if node.children is None:
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        return list(node.children)
+
+    def walk(self, top: str, topdown: bool = True) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Walk the tree like os.walk; unreadable directories are skipped."""
+        try:
+            names = self.listdir(top)
+        except OSError:
+            return
+        node = self._lookup(top)
+        if node is None:
+            return
+        dirnames = [name for name in names if name in node.children and node.children[name].children is not None]
+        filenames = [name for name in names if name in node.children and node.children[name].children is None]
+        if topdown:
+            yield top, dirnames, filenames
+        for dirname in dirnames:
+            yield from self.walk(os.path.join(top, dirname), topdown)
+        if not topdown:
+            yield top, dirnames, filenames
+
+    def lstat(self, path: str) -> os.stat_result:
+        """Return a stat result with mode, inode, size and times."""
+        self._enter("lstat", path)
+        node = self._require(path)
+        return os.stat_result((node.mode, node.ino, 0, 1, 0, 0, node.size, node.mtime, node.mtime, node.mtime))
+
+    def stat(self, path: str) -> os.stat_result:
+        """Return the same result as lstat; the tree has no symlinks."""
+        return self.lstat(path)
+
+    def getsize(self, path: str) -> int:
+        """Return the size of a file in bytes."""
+        return self.lstat(path).st_size
+
+    def getmtime(self, path: str) -> float:
+        """Return the modification time of path."""
+        return self.lstat(path).st_mtime
+
+    def read_text(self, path: str) -> str:
+        """Return the content of a file."""
+        self._enter("read", path)
+        node = self._require(path)
+        if node.children is not None:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        return node.content or ""
+
+    def write_text(self, path: str, content: str) -> None:
+        """Create or replace a file."""
+        self._enter("write", path)
+        parent, name = self._parent(path)
+        existing = parent.children.get(name)
+        if existing is not None and not existing.mode & stat.S_IWUSR:
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+        parent.children[name] = self._new_node(False, len(content.encode("utf-8")), None, stat.S_IFREG | 0o644, content)
+
+    def chmod(self, path: str, mode: int) -> None:
+        """Change the permission bits of path."""
+        self._enter("chmod", path)
+        node = self._require(path)
+        node.mode = stat.S_IFMT(node.mode) | stat.S_IMODE(mode)
+
+    def unlink(self, path: str) -> None:
+        """Remove a file; read-only files raise PermissionError."""
+        self._enter("unlink", path)
+        parent, name = self._parent(path)
+        node = parent.children.get(name)
+        if node is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        if node.children is not None:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        if not node.mode & stat.S_IWUSR:
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+        del parent.children[name]
+
+    def rmdir(self, path: str) -> None:
+        """Remove an empty directory; read-only directories raise PermissionError."""
+        self._enter("rmdir", path)
+        parent, name = self._parent(path)
+        node = parent.children.get(name)
+        if node is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        if node.children is None:
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        if node.children:
+            raise OSError(errno.ENOTEMPTY, os.strerror(errno.ENOTEMPTY), path)
+        if not node.mode & stat.S_IWUSR:
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+        del parent.children[name]
+
+    def rmtree(self, path: str, io_order: str = "listing") -> None:
+        """Remove a tree, stopping at the first error like shutil.rmtree."""
+        for dirpath, dirnames, filenames in self.walk(path, topdown=False):
+            if io_order == "inode":
+                node = self._require(dirpath)
+                filenames = sorted(filenames, key=lambda name: node.children[name].ino)
+            for filename in filenames:
+                self.unlink(os.path.join(dirpath, filename))
+            self.rmdir(dirpath)
+
+    def run(self, args: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """Answer a process call with the configured handler."""
+        self._enter("run", args[0])
+        if self._process_handler is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), args[0])
+        returncode, stdout, stderr = self._process_handler(list(args))
+        return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+
+    def active_paths(self) -> Set[str]:
+        """Return the paths set with set_active_paths."""
+        self.op_counts["active_paths"] += 1
+        return set(self._active_paths)
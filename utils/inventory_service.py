@@ -0,0 +1,511 @@
+"""
+Utility module serving a shared venv inventory over a Unix domain socket.
+
+One service process owns a warm, live inventory (see utils.venv_watcher)
+and answers the GUI, the command-line tool and scripts, so they no longer
+each rescan the same disks. The protocol is one compact JSON object per
+line in each direction:
+
+    {"op": "list"}                              -> {"ok": true, "result": [...]}
+    {"op": "filter", "policy": "size_mb > 500"} -> {"ok": true, "result": [...]}
+    {"op": "sizes"}                             -> {"ok": true, "result": {...}}
+    {"op": "delete", "paths": [...], "dry_run": true} -> {"ok": true, "result": {"job": 1}}
+    {"op": "snapshot", "paths": [...]}          -> {"ok": true, "result": {"job": 2}}
+    {"op": "job", "id": 1}                      -> {"ok": true, "result": {...}}
+    {"op": "rescan"}                            -> {"ok": true, "result": {"count": 12}}
+    {"op": "info"}                              -> {"ok": true, "result": {"root_dir": ..., ...}}
+
+Errors are reported as {"ok": false, "error": "..."}. Identical concurrent
+queries are coalesced into one evaluation, and delete and snapshot jobs
+run one at a time on a single worker thread; only the last
+MAX_FINISHED_JOBS finished jobs can be looked up. The socket is created
+with mode 0600, so only the owner can connect.
+"""
+import os
+import json
+import queue
+import socket
+import threading
+import socketserver
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from utils.venv_watcher import VenvWatcher
+from utils.venv_scanner import ARTIFACT_TYPES
+from utils.venv_deleter import delete_multiple_venvs, calculate_space_freed, calculate_space_freed_by_type
+from utils.venv_archiver import archive_multiple_venvs
+from utils.requirements_generator import generate_requirements_for_multiple_venvs
+from utils.venv_policy import apply_policy, default_policy_text
+
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".venv_remover", "inventory.sock")
+JOB_OPS = ("delete", "snapshot")
+MAX_FINISHED_JOBS = 100
+
+
+class _InFlight:
+    """A query being evaluated on behalf of every caller that asked for it."""
+
+    def __init__(self):
+        """Create an unfinished evaluation."""
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serve newline-delimited JSON requests on one connection."""
+
+    def handle(self):
+        """Answer requests until the client closes the connection."""
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+                response = {"ok": True, "result": self.server.service.handle_request(request)}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(response, separators=(",", ":")) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Threaded Unix socket server bound to an InventoryService."""
+
+        daemon_threads = True
+else:
+    # Platforms without Unix domain sockets can still import this module.
+    _UnixServer = None
+
+
+class InventoryService:
+    """
+    A local service owning one live venv inventory.
+
+    Use start() to serve in background threads and stop() to shut down.
+    """
+
+    def __init__(self, root_dir: str, socket_path: str = DEFAULT_SOCKET_PATH, days_unused: int = 60,
+                 min_size_mb: int = 200, artifact_types: Optional[Tuple[str, ...]] = ("venv",),
+                 policy: Optional[str] = None, archive_store: Optional[str] = None):
+        """
+        Configure the service.
+
+        Args:
+            root_dir (str): Root directory whose inventory is served.
+            socket_path (str): Path of the Unix domain socket.
+            days_unused (int): Minimum age in days for deletion criteria.
+            min_size_mb (int): Minimum size in MB for deletion criteria.
+            artifact_types (Optional[Tuple[str, ...]]): Artifact types to
+                track, defaults to venvs only; None means all types.
+            policy (Optional[str]): Default policy for filter queries.
+            archive_store (Optional[str]): Chunk store used by snapshot jobs
+                and to archive before deletion; without it snapshot jobs
+                write requirements.txt files instead.
+
+        Raises:
+            ValueError: If root_dir is not a directory or an argument is invalid.
+        """
+        self.watcher = VenvWatcher(root_dir, days_unused, min_size_mb, artifact_types, policy)
+        self.socket_path = socket_path
+        self.archive_store = archive_store
+
+        self._in_flight: Dict[Tuple, _InFlight] = {}
+        self._in_flight_lock = threading.Lock()
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._next_job_id = 1
+        self._job_queue: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._jobs_lock = threading.Lock()
+        self._server = None
+        self._threads: List[threading.Thread] = []
+        self.coalesced = 0
+
+    def _coalesce(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Evaluate a query once for all concurrent callers asking the same thing.
+
+        Args:
+            key (Tuple): Identity of the query.
+            compute (Callable[[], Any]): Evaluates the query.
+
+        Returns:
+            Any: The query result.
+        """
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                in_flight.result = compute()
+            except BaseException as e:
+                in_flight.error = e
+            finally:
+                with self._in_flight_lock:
+                    del self._in_flight[key]
+                in_flight.done.set()
+        else:
+            in_flight.done.wait()
+
+        if in_flight.error is not None:
+            raise in_flight.error
+        return in_flight.result
+
+    def _sizes(self) -> Dict[str, Any]:
+        """Summarise the inventory sizes."""
+        inventory = self.watcher.inventory()
+        reclaimable = [record for record in inventory if record["meets_criteria"]]
+        return {
+            "count": len(inventory),
+            "total_mb": calculate_space_freed(inventory),
+            "reclaimable_count": len(reclaimable),
+            "reclaimable_mb": calculate_space_freed(reclaimable),
+            "by_type": calculate_space_freed_by_type(inventory)
+        }
+
+    def _enqueue(self, kind: str, request: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Validate a delete or snapshot request and queue it as a job.
+
+        Only paths that are part of the inventory are accepted.
+
+        Raises:
+            ValueError: If the request is malformed or names unknown paths.
+        """
+        paths = request.get("paths")
+        if not isinstance(paths, list) or not paths:
+            raise ValueError("paths must be a non-empty list")
+        known = {record["venv_path"]: record for record in self.watcher.inventory()}
+        unknown = [path for path in paths if path not in known]
+        if unknown:
+            raise ValueError(f"Not in the inventory: {', '.join(unknown)}")
+
+        with self._jobs_lock:
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            self._jobs[job_id] = {
+                "id": job_id,
+                "kind": kind,
+                "state": "queued",
+                "records": [known[path] for path in paths],
+                "dry_run": bool(request.get("dry_run", True)),
+                "result": None,
+                "error": None
+            }
+        self._job_queue.put(job_id)
+        return {"job": job_id}
+
+    def _job_status(self, job_id: Any) -> Dict[str, Any]:
+        """Return the public view of one job."""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise ValueError(f"Unknown job: {job_id}")
+            return {key: value for key, value in job.items() if key != "records"}
+
+    def _run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one delete or snapshot job."""
+        paths = [record["venv_path"] for record in job["records"]]
+        if job["kind"] == "delete":
+            return delete_multiple_venvs(paths, job["dry_run"], self.archive_store)
+        if self.archive_store:
+            return archive_multiple_venvs(paths, self.archive_store)
+        return generate_requirements_for_multiple_venvs(job["records"], overwrite=True)
+
+    def _job_worker(self) -> None:
+        """Run queued jobs one at a time."""
+        while True:
+            job_id = self._job_queue.get()
+            if job_id is None:
+                return
+            with self._jobs_lock:
+                job = self._jobs[job_id]
+                job["state"] = "running"
+            try:
+                result = self._run_job(job)
+                state, error = "done", None
+            except Exception as e:
+                result, state, error = None, "failed", str(e)
+            with self._jobs_lock:
+                job.update(state=state, result=result, error=error)
+                self._evict_finished_jobs()
+
+    def _evict_finished_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS; call with _jobs_lock held."""
+        finished = [job_id for job_id, job in self._jobs.items() if job["state"] in ("done", "failed")]
+        for job_id in finished[:-MAX_FINISHED_JOBS]:
+            del self._jobs[job_id]
+
+    def handle_request(self, request: Dict[str, Any]) -> Any:
+        """
+        Answer one protocol request.
+
+        Args:
+            request (Dict): Decoded request with an "op" field.
+
+        Returns:
+            Any: JSON-serialisable result.
+
+        Raises:
+            ValueError: If the request is malformed.
+        """
+        op = request.get("op")
+        if op == "list":
+            return self._coalesce(("list",), self.watcher.inventory)
+        if op == "filter":
+            policy = request.get("policy")
+            return self._coalesce(("filter", policy), lambda: self.watcher.reclaimable(policy))
+        if op == "sizes":
+            return self._coalesce(("sizes",), self._sizes)
+        if op in JOB_OPS:
+            return self._enqueue(op, request)
+        if op == "job":
+            return self._job_status(request.get("id"))
+        if op == "info":
+            return {"root_dir": self.watcher.root_dir, "artifact_types": list(self.watcher.artifact_types),
+                    "policy": self.watcher.policy}
+        if op == "rescan":
+            self._coalesce(("rescan",), self.watcher.rescan)
+            return {"count": len(self.watcher.inventory())}
+        raise ValueError(f"Unknown op: {op}")
+
+    def start(self) -> None:
+        """
+        Build the inventory and start serving in daemon threads.
+
+        Raises:
+            OSError: If the socket is already served by a running service or
+                the platform has no Unix domain sockets.
+        """
+        if _UnixServer is None:
+            raise OSError("Unix domain sockets are not supported on this platform")
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise OSError(f"Inventory service already running on {self.socket_path}")
+            except ConnectionRefusedError:
+                os.remove(self.socket_path)
+            finally:
+                probe.close()
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        self.watcher.start()
+        # Create the socket as 0600 instead of narrowing it after bind, which
+        # would leave it briefly connectable by other local users
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.service = self
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+            threading.Thread(target=self._job_worker, daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop serving, finish the running job and remove the socket."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._job_queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.watcher.stop()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class InventoryClient:
+    """Client for an InventoryService, keeping one connection open."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 30.0):
+        """
+        Connect to a running service.
+
+        Args:
+            socket_path (str): Path of the service's Unix domain socket.
+            timeout (Optional[float]): Socket timeout in seconds.
+
+        Raises:
+            OSError: If no service is listening on socket_path.
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(socket_path)
+        self._reader = self._socket.makefile("rb")
+
+    def request(self, op: str, **arguments) -> Any:
+        """
+        Send one request and wait for its response.
+
+        Args:
+            op (str): Protocol operation.
+            **arguments: Operation arguments.
+
+        Returns:
+            Any: The result field of the response.
+
+        Raises:
+            ValueError: If the service rejected the request.
+        """
+        payload = dict(arguments, op=op)
+        self._socket.sendall((json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8"))
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Inventory service closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Return the whole inventory."""
+        return self.request("list")
+
+    def filter(self, policy: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the records meeting a policy, or the service's default policy."""
+        return self.request("filter", policy=policy)
+
+    def sizes(self) -> Dict[str, Any]:
+        """Return inventory size totals."""
+        return self.request("sizes")
+
+    def delete(self, paths: List[str], dry_run: bool = True) -> int:
+        """Queue a deletion job and return its id."""
+        return self.request("delete", paths=paths, dry_run=dry_run)["job"]
+
+    def snapshot(self, paths: List[str]) -> int:
+        """Queue a snapshot job and return its id."""
+        return self.request("snapshot", paths=paths)["job"]
+
+    def job(self, job_id: int) -> Dict[str, Any]:
+        """Return the state and result of a job."""
+        return self.request("job", id=job_id)
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._reader.close()
+        self._socket.close()
+
+
+def query_inventory(root_dir: str, days_unused: int = 60, min_size_mb: int = 200,
+                    artifact_types: Optional[Tuple[str, ...]] = ("venv",), policy: Optional[str] = None,
+                    socket_path: str = DEFAULT_SOCKET_PATH) -> Optional[List[Dict[str, Any]]]:
+    """
+    Answer a scan from a running inventory service instead of the disk.
+
+    Args:
+        root_dir (str): Directory that would be scanned.
+        days_unused (int): Minimum age in days for deletion criteria.
+        min_size_mb (int): Minimum size in MB for deletion criteria.
+        artifact_types (Optional[Tuple[str, ...]]): Artifact types wanted;
+            None means all types.
+        policy (Optional[str]): Policy text deciding meets_criteria.
+        socket_path (str): Path of the service's Unix domain socket.
+
+    Returns:
+        Optional[List[Dict]]: Records in the scan_for_artifacts format, or
+            None if no service is running or its inventory does not cover
+            root_dir and artifact_types.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        client = InventoryClient(socket_path, timeout=10.0)
+    except OSError:
+        return None
+    try:
+        info = client.request("info")
+        root_dir = os.path.abspath(root_dir)
+        served_root = info["root_dir"]
+        if root_dir != served_root and not root_dir.startswith(served_root + os.sep):
+            return None
+        if artifact_types is not None and not set(artifact_types) <= set(info["artifact_types"]):
+            return None
+        if artifact_types is None and len(info["artifact_types"]) < len(ARTIFACT_TYPES):
+            return None
+        records = [
+            record for record in client.list()
+            if record["venv_path"].startswith(root_dir + os.sep)
+            and (artifact_types is None or record["artifact_type"] in artifact_types)
+        ]
+    except (OSError, ValueError, KeyError):
+        return None
+    finally:
+        client.close()
+    return apply_policy(records, policy or default_policy_text(days_unused, min_size_mb))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point for serving and querying the inventory.
+
+    Usage:
+        python -m utils.inventory_service serve ROOT [--socket PATH] [--archive-store DIR]
+        python -m utils.inventory_service list|sizes [--socket PATH]
+        python -m utils.inventory_service filter POLICY [--socket PATH]
+
+    Args:
+        argv (Optional[List[str]]): Arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    import argparse
+    import signal
+
+    parser = argparse.ArgumentParser(description="Shared venv inventory service.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="Serve the inventory of a root directory")
+    serve_parser.add_argument("root")
+    serve_parser.add_argument("--days-unused", type=int, default=60)
+    serve_parser.add_argument("--min-size-mb", type=int, default=200)
+    serve_parser.add_argument("--archive-store", default=None)
+    subparsers.add_parser("list", help="List the inventory")
+    subparsers.add_parser("sizes", help="Show size totals")
+    filter_parser = subparsers.add_parser("filter", help="List records meeting a policy")
+    filter_parser.add_argument("policy")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        service = InventoryService(args.root, args.socket, args.days_unused, args.min_size_mb,
+                                   archive_store=args.archive_store)
+        service.start()
+        print(f"Serving inventory of {args.root} on {args.socket}")
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        try:
+            stop_event.wait()
+        except KeyboardInterrupt:
+            pass
+        service.stop()
+        return 0
+
+    client = InventoryClient(args.socket)
+    try:
+        if args.command == "sizes":
+            print(json.dumps(client.sizes(), indent=2))
+            return 0
+        records = client.list() if args.command == "list" else client.filter(args.policy)
+        for record in records:
+            print(f"{record['venv_path']}\t{record['size_mb']:.1f} MB\t{record['age_days']:.0f} days")
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
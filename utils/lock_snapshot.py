@@ -0,0 +1,275 @@
+"""
+Utility module for writing reproducible lock snapshots of venvs.
+
+requirements.txt only records names and versions. A lock snapshot, written
+as venv.lock.json next to it, also records the interpreter version from
+pyvenv.cfg and for every distribution its installer, where it came from
+(direct_url.json: index, URL, VCS commit or editable path) and a digest of
+its RECORD. RECORD lists a sha256 for every installed file, so the RECORD
+digest pins the installed content without reading the package files.
+
+The dist-info folders of all venvs are read by one thread pool through
+read-only memory maps. With verify=True every installed file is hashed as
+well, giving a digest of the actual content and the files that no longer
+match RECORD; this reads every byte and is much slower.
+"""
+import os
+import csv
+import io
+import json
+import mmap
+import base64
+import hashlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, Callable
+from utils.venv_scanner import get_site_packages_dirs, get_venv_python_version
+
+
+LOCK_FILENAME = "venv.lock.json"
+LOCK_FORMAT_VERSION = 1
+DEFAULT_MAX_WORKERS = 8
+
+
+def _read_mapped(file_path: str) -> bytes:
+    """
+    Read a file through a read-only memory map.
+
+    Args:
+        file_path (str): File to read.
+
+    Returns:
+        bytes: File content.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:]
+
+
+def _file_digest(file_path: str) -> Optional[str]:
+    """Return the sha256 of a file in RECORD notation, or None if it cannot be read."""
+    try:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                digest = hashlib.sha256()
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest = hashlib.sha256(mapped)
+    except (OSError, ValueError):
+        return None
+    return "sha256=" + base64.urlsafe_b64encode(digest.digest()).rstrip(b"=").decode("ascii")
+
+
+def _parse_metadata(metadata: bytes) -> Dict[str, str]:
+    """Return the Name and Version headers of a METADATA file."""
+    headers = {}
+    for line in metadata.decode("utf-8", errors="replace").splitlines():
+        if not line.strip():
+            break
+        key, _, value = line.partition(":")
+        if key in ("Name", "Version") and key not in headers:
+            headers[key] = value.strip()
+    return headers
+
+
+def read_distribution(dist_info_path: str, verify: bool = False) -> Dict[str, Any]:
+    """
+    Read the lock entry of one installed distribution.
+
+    Args:
+        dist_info_path (str): The *.dist-info folder.
+        verify (bool): If True, hash every file listed in RECORD.
+
+    Returns:
+        Dict: Entry with name, version, installer, requested, direct_url,
+            editable, files, record_digest and, with verify=True,
+            content_digest and modified (paths whose content no longer
+            matches RECORD).
+
+    Raises:
+        OSError: If METADATA or RECORD cannot be read.
+        csv.Error: If RECORD is not valid CSV.
+    """
+    dist_name, _, dist_version = os.path.basename(dist_info_path)[:-len(".dist-info")].partition("-")
+    headers = _parse_metadata(_read_mapped(os.path.join(dist_info_path, "METADATA")))
+    record = _read_mapped(os.path.join(dist_info_path, "RECORD"))
+
+    installer = ""
+    direct_url = None
+    try:
+        installer = _read_mapped(os.path.join(dist_info_path, "INSTALLER")).decode("utf-8").strip()
+    except (OSError, UnicodeDecodeError):
+        pass
+    try:
+        direct_url = json.loads(_read_mapped(os.path.join(dist_info_path, "direct_url.json")))
+    except (OSError, ValueError):
+        pass
+    if not isinstance(direct_url, dict):
+        # Only a JSON object is a valid direct_url.json
+        direct_url = None
+    dir_info = direct_url.get("dir_info") if direct_url else None
+
+    rows = [row for row in csv.reader(io.StringIO(record.decode("utf-8", errors="replace"))) if row and row[0]]
+    entry = {
+        "name": headers.get("Name", dist_name),
+        "version": headers.get("Version", dist_version),
+        "installer": installer,
+        "requested": os.path.exists(os.path.join(dist_info_path, "REQUESTED")),
+        "direct_url": direct_url,
+        "editable": isinstance(dir_info, dict) and dir_info.get("editable") is True,
+        "files": len(rows),
+        "record_digest": "sha256:" + hashlib.sha256(record).hexdigest()
+    }
+    if verify:
+        site_packages = os.path.dirname(dist_info_path)
+        content = hashlib.sha256()
+        modified = []
+        for row in sorted(rows):
+            file_path = os.path.normpath(os.path.join(site_packages, row[0]))
+            actual = _file_digest(file_path)
+            content.update(f"{row[0]}\0{actual}\n".encode("utf-8"))
+            recorded = row[1] if len(row) > 1 else ""
+            if recorded and actual != recorded:
+                modified.append(row[0])
+        entry["content_digest"] = "sha256:" + content.hexdigest()
+        entry["modified"] = modified
+    return entry
+
+
+def _list_distributions(venv_path: str) -> List[str]:
+    """Return the dist-info folders of a venv in name order."""
+    dist_infos = []
+    for site_packages in get_site_packages_dirs(venv_path):
+        try:
+            names = sorted(os.listdir(site_packages))
+        except OSError:
+            continue
+        dist_infos.extend(os.path.join(site_packages, name) for name in names if name.endswith(".dist-info"))
+    return dist_infos
+
+
+def build_lock_snapshots(venv_paths: List[str], verify: bool = False,
+                         max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Build the lock snapshots of several venvs with one thread pool.
+
+    Args:
+        venv_paths (List[str]): Venv folders.
+        verify (bool): If True, hash every installed file.
+        max_workers (int): Threads reading dist-info folders.
+
+    Returns:
+        List[Dict]: One snapshot per venv, in input order, with format,
+            created, venv_path, python_version, distributions (sorted by
+            name) and errors (dist-info folders that could not be read).
+    """
+    dist_infos = {venv_path: _list_distributions(venv_path) for venv_path in venv_paths}
+    tasks = [(venv_path, dist_info) for venv_path in venv_paths for dist_info in dist_infos[venv_path]]
+
+    def _read(task: Tuple[str, str]) -> Tuple[str, str, Optional[Dict[str, Any]], str]:
+        venv_path, dist_info = task
+        try:
+            return venv_path, dist_info, read_distribution(dist_info, verify), ""
+        except (OSError, csv.Error) as e:
+            return venv_path, dist_info, None, str(e)
+
+    snapshots = {
+        venv_path: {
+            "format": LOCK_FORMAT_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "venv_path": venv_path,
+            "python_version": get_venv_python_version(venv_path),
+            "distributions": [],
+            "errors": []
+        }
+        for venv_path in venv_paths
+    }
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for venv_path, dist_info, entry, error in executor.map(_read, tasks):
+            if entry is None:
+                snapshots[venv_path]["errors"].append(f"{os.path.basename(dist_info)}: {error}")
+            else:
+                snapshots[venv_path]["distributions"].append(entry)
+    for snapshot in snapshots.values():
+        snapshot["distributions"].sort(key=lambda entry: entry["name"].lower())
+    return [snapshots[venv_path] for venv_path in venv_paths]
+
+
+def write_lock_snapshot(snapshot: Dict[str, Any], output_path: str, overwrite: bool = False) -> Tuple[bool, str]:
+    """
+    Write a lock snapshot as JSON.
+
+    Args:
+        snapshot (Dict): Snapshot built by build_lock_snapshots.
+        output_path (str): Destination file.
+        overwrite (bool): Whether to overwrite an existing file.
+
+    Returns:
+        Tuple[bool, str]: (success_status, message)
+
+    Raises:
+        ValueError: If output_path is empty.
+    """
+    if not output_path or not output_path.strip():
+        raise ValueError("output_path cannot be empty")
+    if os.path.exists(output_path) and not overwrite:
+        return False, f"Lock snapshot already exists: {output_path}"
+    if not snapshot["distributions"]:
+        return False, f"No installed distributions found in {snapshot['venv_path']}"
+    try:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=1)
+    except OSError as e:
+        return False, f"Error writing lock snapshot: {str(e)}"
+    return True, f"Locked {len(snapshot['distributions'])} distributions (Python {snapshot['python_version'] or 'unknown'})"
+
+
+def lock_multiple_venvs(venv_info_list: List[Dict[str, Any]], overwrite: bool = False, verify: bool = False,
+                        max_workers: int = DEFAULT_MAX_WORKERS,
+                        on_result: Optional[Callable[[str, bool, str], None]] = None) -> Dict[str, Any]:
+    """
+    Write venv.lock.json into the project folder of each venv.
+
+    Args:
+        venv_info_list (List[Dict]): Venv info dictionaries with venv_path
+            and project_path.
+        overwrite (bool): Whether to overwrite existing lock snapshots.
+        verify (bool): If True, hash every installed file.
+        max_workers (int): Threads reading dist-info folders.
+        on_result (Optional[Callable[[str, bool, str], None]]): Called with
+            (venv_path, success, message) after each venv is written.
+
+    Returns:
+        Dict: Results containing total, successful, failed and results, a
+            list of (venv_path, success, message) tuples.
+    """
+    valid = [bool(info.get("venv_path") and info.get("project_path")) for info in venv_info_list]
+    snapshots = iter(build_lock_snapshots(
+        [info["venv_path"] for info, is_valid in zip(venv_info_list, valid) if is_valid], verify, max_workers
+    ))
+
+    results = []
+    for venv_info, is_valid in zip(venv_info_list, valid):
+        venv_path = venv_info.get("venv_path")
+        if is_valid:
+            output_path = os.path.join(venv_info["project_path"], LOCK_FILENAME)
+            success, message = write_lock_snapshot(next(snapshots), output_path, overwrite)
+        else:
+            success, message = False, "Missing venv_path or project_path"
+        results.append((venv_path, success, message))
+        if on_result is not None:
+            on_result(venv_path, success, message)
+
+    successful = sum(1 for _, success, _ in results if success)
+    return {
+        "total": len(venv_info_list),
+        "successful": successful,
+        "failed": len(results) - successful,
+        "results": results
+    }
@@ -0,0 +1,236 @@
+"""
+Utility module for scanning several root directories concurrently.
+
+Roots are resolved and de-duplicated first: symlinked and bind-mounted
+copies of the same directory (same st_dev and inode) and roots nested
+inside other roots are scanned once. The remaining work is split by
+physical device, and each device gets its own thread pool, so independent
+disks are walked at the same time without overloading any single disk.
+Results are streamed as they complete and de-duplicated by
+(st_dev, inode), which also catches artifacts reachable through a bind
+mount inside another root.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from utils.venv_scanner import (
+    detect_artifact_type,
+    validate_artifact_types,
+    iter_artifact_dirs,
+    build_artifact_info,
+    get_active_venv_paths,
+    is_path_in_use
+)
+from utils.venv_policy import compile_policy, default_policy_text, apply_policy
+from utils.scan_result_file import write_scan_results
+
+
+DEFAULT_WORKERS_PER_DEVICE = 2
+
+
+def resolve_roots(root_dirs: List[str]) -> List[str]:
+    """
+    Resolve root directories and drop overlapping ones.
+
+    Args:
+        root_dirs (List[str]): Root directories, possibly overlapping.
+
+    Returns:
+        List[str]: Real paths of the distinct roots, in the order given,
+            without roots nested inside another root and without second
+            paths (symlinks, bind mounts) to an already listed directory.
+
+    Raises:
+        ValueError: If root_dirs is empty or a root is not a directory.
+    """
+    if not root_dirs:
+        raise ValueError("At least one root directory is required")
+
+    candidates = []
+    seen_ids = set()
+    for root_dir in root_dirs:
+        if not os.path.isdir(root_dir):
+            raise ValueError(f"Root path is not a directory: {root_dir}")
+        real_path = os.path.realpath(root_dir)
+        st = os.stat(real_path)
+        if (st.st_dev, st.st_ino) in seen_ids:
+            continue
+        seen_ids.add((st.st_dev, st.st_ino))
+        candidates.append(real_path)
+
+    resolved = []
+    for real_path in candidates:
+        nested = any(
+            other != real_path and (real_path.startswith(other.rstrip(os.sep) + os.sep))
+            for other in candidates
+        )
+        if not nested:
+            resolved.append(real_path)
+    return resolved
+
+
+def _plan_device_tasks(root_dir: str, artifact_types: Tuple[str, ...]) -> List[Tuple[int, str, str, Optional[str]]]:
+    """
+    Split one root into tasks, each tagged with the device it reads from.
+
+    Top-level artifacts become measure tasks and other top-level folders
+    become walk tasks, so a root can use several workers and mount points
+    directly below it are assigned to their own device.
+
+    Args:
+        root_dir (str): Resolved root directory.
+        artifact_types (Tuple[str, ...]): Artifact types to detect.
+
+    Returns:
+        List[Tuple[int, str, str, Optional[str]]]: (device, root_dir, path,
+            artifact_type) tuples; artifact_type is None for walk tasks.
+    """
+    try:
+        with os.scandir(root_dir) as scanned:
+            entries = list(scanned)
+    except OSError as e:
+        print(f"Error scanning {root_dir}: {e}")
+        return []
+
+    filenames = [entry.name for entry in entries if not entry.is_dir()]
+    tasks = []
+    for entry in entries:
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            device = entry.stat(follow_symlinks=False).st_dev
+        except OSError:
+            continue
+        artifact_type = detect_artifact_type(entry.name, filenames, artifact_types)
+        tasks.append((device, root_dir, entry.path, artifact_type))
+    return tasks
+
+
+def _run_task(path: str, artifact_type: Optional[str], artifact_types: Tuple[str, ...],
+              estimate_sizes: bool) -> List[Dict[str, Any]]:
+    """
+    Measure one artifact, or walk one folder and measure its artifacts.
+
+    Returns:
+        List[Dict]: Artifact records built by build_artifact_info.
+    """
+    if artifact_type is not None:
+        found = [(path, artifact_type)]
+    else:
+        found = iter_artifact_dirs(path, artifact_types)
+
+    records = []
+    for artifact_path, found_type in found:
+        try:
+            records.append(build_artifact_info(artifact_path, found_type, estimate_sizes))
+        except Exception as e:
+            # Log error but continue scanning
+            print(f"Error scanning {artifact_path}: {e}")
+    return records
+
+
+def iter_multi_root_artifacts(root_dirs: List[str], days_unused: int = 60, min_size_mb: int = 200,
+                              artifact_types: Optional[Tuple[str, ...]] = None, estimate_sizes: bool = False,
+                              policy: Optional[str] = None,
+                              workers_per_device: int = DEFAULT_WORKERS_PER_DEVICE) -> Iterator[Dict[str, Any]]:
+    """
+    Scan several roots concurrently and stream merged, de-duplicated results.
+
+    Args:
+        root_dirs (List[str]): Root directories to scan.
+        days_unused (int): Minimum age in days for deletion criteria.
+        min_size_mb (int): Minimum size in MB for deletion criteria.
+        artifact_types (Optional[Tuple[str, ...]]): Artifact types to detect,
+            defaults to all ARTIFACT_TYPES.
+        estimate_sizes (bool): If True, report sampled size estimates.
+        policy (Optional[str]): Policy text deciding meets_criteria.
+        workers_per_device (int): Concurrent tasks per physical device.
+
+    Returns:
+        Iterator[Dict]: Artifact records in the scan_for_artifacts format, in
+            completion order; root_dir is the root the artifact was found under.
+
+    Raises:
+        ValueError: If a root is invalid, workers_per_device is not positive,
+            an unknown artifact type is requested or the policy is malformed.
+    """
+    if workers_per_device < 1:
+        raise ValueError("workers_per_device must be at least 1")
+
+    roots = resolve_roots(root_dirs)
+    artifact_types = validate_artifact_types(artifact_types)
+    policy = policy or default_policy_text(days_unused, min_size_mb)
+    compile_policy(policy)
+    active_paths = get_active_venv_paths()
+
+    tasks_by_device: Dict[int, List[Tuple[str, str, Optional[str]]]] = {}
+    for root_dir in roots:
+        for device, task_root, path, artifact_type in _plan_device_tasks(root_dir, artifact_types):
+            tasks_by_device.setdefault(device, []).append((task_root, path, artifact_type))
+
+    executors = [ThreadPoolExecutor(max_workers=workers_per_device) for _ in tasks_by_device]
+    futures = {}
+    try:
+        for executor, tasks in zip(executors, tasks_by_device.values()):
+            for task_root, path, artifact_type in tasks:
+                future = executor.submit(_run_task, path, artifact_type, artifact_types, estimate_sizes)
+                futures[future] = task_root
+
+        seen_ids = set()
+        for future in as_completed(futures):
+            for record in future.result():
+                try:
+                    st = os.stat(record["venv_path"])
+                except OSError:
+                    continue
+                if (st.st_dev, st.st_ino) in seen_ids:
+                    continue
+                seen_ids.add((st.st_dev, st.st_ino))
+                record["root_dir"] = futures[future]
+                record["in_use"] = is_path_in_use(record["venv_path"], active_paths)
+                apply_policy([record], policy)
+                yield record
+    finally:
+        # Cancel the folders not started yet (shutdown's cancel_futures needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+
+def scan_multiple_roots(root_dirs: List[str], days_unused: int = 60, min_size_mb: int = 200,
+                        artifact_types: Optional[Tuple[str, ...]] = None, estimate_sizes: bool = False,
+                        policy: Optional[str] = None, workers_per_device: int = DEFAULT_WORKERS_PER_DEVICE,
+                        result_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Scan several roots concurrently and return the merged results.
+
+    Args:
+        root_dirs (List[str]): Root directories to scan.
+        days_unused (int): Minimum age in days for deletion criteria.
+        min_size_mb (int): Minimum size in MB for deletion criteria.
+        artifact_types (Optional[Tuple[str, ...]]): Artifact types to detect,
+            defaults to all ARTIFACT_TYPES.
+        estimate_sizes (bool): If True, report sampled size estimates.
+        policy (Optional[str]): Policy text deciding meets_criteria.
+        workers_per_device (int): Concurrent tasks per physical device.
+        result_path (Optional[str]): If given, also save the results to this
+            memory-mappable result file.
+
+    Returns:
+        List[Dict]: De-duplicated artifact records sorted by path.
+
+    Raises:
+        ValueError: If a root is invalid, workers_per_device is not positive,
+            an unknown artifact type is requested or the policy is malformed.
+    """
+    artifact_list = sorted(
+        iter_multi_root_artifacts(root_dirs, days_unused, min_size_mb, artifact_types,
+                                  estimate_sizes, policy, workers_per_device),
+        key=lambda record: record["venv_path"]
+    )
+    if result_path:
+        saved, message = write_scan_results(artifact_list, result_path)
+        if not saved:
+            print(message)
+    return artifact_list
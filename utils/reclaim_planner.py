@@ -0,0 +1,204 @@
+"""
+Utility module for planning deletions that free a target amount of space.
+
+Instead of sizing every venv, the planner estimates sizes cheaply, measures
+the likeliest-large candidates first and stops measuring as soon as the
+measured candidates are enough to reach the target. Finding the candidates
+still takes one pruned walk of the whole root: the smallest set can only
+be chosen once every candidate's estimate is known.
+"""
+import os
+import heapq
+from typing import List, Dict, Tuple, Any, Optional
+from utils.venv_scanner import (
+    iter_artifact_dirs,
+    validate_artifact_types,
+    build_artifact_info,
+    get_venv_age_days,
+    get_site_packages_dirs,
+    get_active_venv_paths,
+    is_path_in_use
+)
+from utils.venv_policy import compile_policy, default_policy_text
+from utils.venv_deleter import delete_multiple_venvs
+
+
+# Rough average size of one top-level site-packages entry, used for ranking only.
+ESTIMATED_MB_PER_SITE_PACKAGES_ENTRY = 2.0
+ESTIMATED_MB_PER_SUBDIRECTORY = 1.0
+
+
+def estimate_venv_size_mb(venv_path: str, size_hints: Optional[Dict[str, float]] = None) -> float:
+    """
+    Estimate the size of a venv without walking it.
+
+    Uses, in order of preference: a cached size from size_hints, the link
+    count of site-packages (number of subdirectories + 2 on most Unix
+    filesystems), or the number of site-packages entries.
+
+    Args:
+        venv_path (str): Path to the venv or artifact folder.
+        size_hints (Optional[Dict[str, float]]): Known sizes in MB by path,
+            e.g. from a previous scan.
+
+    Returns:
+        float: Estimated size in MB, only meant for ordering candidates.
+    """
+    if size_hints and venv_path in size_hints:
+        return size_hints[venv_path]
+
+    site_packages_dirs = get_site_packages_dirs(venv_path)
+    if not site_packages_dirs:
+        try:
+            return max(os.stat(venv_path).st_nlink - 2, 0) * ESTIMATED_MB_PER_SUBDIRECTORY
+        except OSError:
+            return 0.0
+
+    entries = 0
+    for site_packages in site_packages_dirs:
+        try:
+            link_count = os.stat(site_packages).st_nlink
+            entries += link_count - 2 if link_count > 2 else len(os.listdir(site_packages))
+        except OSError:
+            continue
+    return entries * ESTIMATED_MB_PER_SITE_PACKAGES_ENTRY
+
+
+def _select_minimal_set(sized: List[Dict[str, Any]], target_mb: float) -> List[Dict[str, Any]]:
+    """
+    Pick the fewest candidates whose sizes reach the target.
+
+    Largest-first selection minimises the number of deletions; candidates
+    that turn out to be unnecessary are then dropped, smallest first.
+
+    Args:
+        sized (List[Dict]): Measured candidates.
+        target_mb (float): Space to free in MB.
+
+    Returns:
+        List[Dict]: Selected candidates, largest first.
+    """
+    selected = []
+    total = 0.0
+    for info in sorted(sized, key=lambda item: item["size_mb"], reverse=True):
+        if total >= target_mb:
+            break
+        selected.append(info)
+        total += info["size_mb"]
+
+    for info in sorted(selected, key=lambda item: item["size_mb"]):
+        if total - info["size_mb"] >= target_mb:
+            selected.remove(info)
+            total -= info["size_mb"]
+    return selected
+
+
+def plan_reclaim(root_dir: str, target_mb: float, days_unused: int = 60, min_size_mb: int = 0,
+                 size_hints: Optional[Dict[str, float]] = None,
+                 artifact_types: Optional[Tuple[str, ...]] = ("venv",)) -> Dict[str, Any]:
+    """
+    Plan the smallest set of deletions that frees at least target_mb.
+
+    Candidates older than days_unused are found without being measured,
+    ordered by estimated size in a heap and measured largest-estimate first.
+    Venvs used by a running process are never candidates, like in a scan.
+    Measuring stops as soon as the measured candidates reach the target.
+
+    The target does not shorten discovery: the whole tree under root_dir
+    is walked (pruned at artifact folders, like a scan) and every candidate
+    gets one stat for its age and a few for its estimate. What the target
+    saves is the recursive size walk of the candidates left in the heap,
+    which is where a full scan spends most of its time.
+
+    Args:
+        root_dir (str): Root directory to scan.
+        target_mb (float): Space to free in MB.
+        days_unused (int): Minimum age in days for candidates.
+        min_size_mb (int): Minimum size in MB for candidates.
+        size_hints (Optional[Dict[str, float]]): Known sizes in MB by path.
+        artifact_types (Optional[Tuple[str, ...]]): Artifact types to
+            consider, defaults to venvs only; None means all types.
+
+    Returns:
+        Dict containing:
+            - target_mb: Requested space to free
+            - planned_mb: Space freed by the selected candidates
+            - target_reached: Whether planned_mb >= target_mb
+            - selected: Venv information dictionaries to delete
+            - candidates: Number of candidates meeting the age policy
+            - in_use: Number of old enough venvs skipped because a
+              running process uses them
+            - sized: Number of candidates that had to be measured
+
+    Raises:
+        ValueError: If root_dir is invalid or target_mb is not positive.
+    """
+    if not os.path.isdir(root_dir):
+        raise ValueError(f"Root path is not a directory: {root_dir}")
+
+    if target_mb <= 0:
+        raise ValueError("target_mb must be positive")
+
+    artifact_types = validate_artifact_types(artifact_types)
+    policy = compile_policy(default_policy_text(days_unused, min_size_mb))
+
+    active_paths = get_active_venv_paths()
+    heap: List[Tuple[float, str, str]] = []
+    in_use = 0
+    for artifact_path, artifact_type in iter_artifact_dirs(root_dir, artifact_types):
+        try:
+            if get_venv_age_days(artifact_path) <= days_unused:
+                continue
+        except OSError:
+            continue
+        if is_path_in_use(artifact_path, active_paths):
+            in_use += 1
+            continue
+        estimate = estimate_venv_size_mb(artifact_path, size_hints)
+        heapq.heappush(heap, (-estimate, artifact_path, artifact_type))
+
+    candidates = len(heap)
+    sized = []
+    sized_total = 0.0
+    measured = 0
+    while heap and sized_total < target_mb:
+        _, artifact_path, artifact_type = heapq.heappop(heap)
+        measured += 1
+        try:
+            info = build_artifact_info(artifact_path, artifact_type)
+        except OSError:
+            continue
+        info["root_dir"] = root_dir
+        info["in_use"] = False
+        info["meets_criteria"] = policy.matches(info)
+        if info["meets_criteria"]:
+            sized.append(info)
+            sized_total += info["size_mb"]
+
+    selected = _select_minimal_set(sized, target_mb)
+    planned_mb = sum(info["size_mb"] for info in selected)
+    return {
+        "target_mb": target_mb,
+        "planned_mb": planned_mb,
+        "target_reached": planned_mb >= target_mb,
+        "selected": selected,
+        "candidates": candidates,
+        "in_use": in_use,
+        "sized": measured
+    }
+
+
+def execute_plan(plan: Dict[str, Any], dry_run: bool = True, archive_store: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Delete the venvs selected by plan_reclaim.
+
+    Args:
+        plan (Dict): Result of plan_reclaim.
+        dry_run (bool): If True, simulate deletion without actually deleting.
+        archive_store (Optional[str]): Chunk store to archive venvs into first.
+
+    Returns:
+        Dict: Result of delete_multiple_venvs.
+    """
+    venv_paths = [info["venv_path"] for info in plan["selected"]]
+    return delete_multiple_venvs(venv_paths, dry_run, archive_store)
@@ -0,0 +1,188 @@
+"""
+Utility module for sizing venvs from installed-package metadata.
+
+Every package installed by pip has a *.dist-info/RECORD file listing its
+files with their sizes. Reading those few hundred small files replaces
+stat'ing the tens of thousands of files inside the packages. The venv is
+still listed, but only files missing from every RECORD are stat'ed: the
+rest of the venv (bin/ or Scripts/, __pycache__ folders next to top-level
+modules, the interpreter and stdlib links, packages installed without
+RECORD) and files created inside a package folder after installation.
+The latter are reported separately as unrecorded_mb.
+
+Files changed after installation keep their RECORD size, so the result can
+still drift from a full walk; pass validate=True to measure the drift.
+"""
+import os
+import csv
+from typing import List, Dict, Any, Set, Optional
+from utils.venv_scanner import get_folder_size, get_site_packages_dirs
+from utils.scan_progress import ScanProgress
+
+
+_MB = 1024 * 1024
+
+
+def _distribution_name(dist_info_name: str) -> str:
+    """Return the distribution name of a "<name>-<version>.dist-info" folder."""
+    return dist_info_name[:-len(".dist-info")].rsplit("-", 1)[0]
+
+
+def _read_record(site_packages: str, dist_info_path: str, covered: Set[str], owned_dirs: Set[str]) -> Dict[str, int]:
+    """
+    Add the files of one RECORD to the covered set.
+
+    Args:
+        site_packages (str): site-packages folder the RECORD paths are relative to.
+        dist_info_path (str): The *.dist-info folder.
+        covered (Set[str]): Normalized paths already counted; updated in place.
+        owned_dirs (Set[str]): Normalized top-level package folders holding
+            files of this RECORD; updated in place.
+
+    Returns:
+        Dict[str, int]: bytes (counted by this RECORD) and stats (files whose
+            size had to be read from disk because RECORD leaves it empty).
+    """
+    counted = {"bytes": 0, "stats": 0}
+    with open(os.path.join(dist_info_path, "RECORD"), newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or not row[0]:
+                continue
+            file_path = os.path.normpath(os.path.join(site_packages, row[0]))
+            key = os.path.normcase(file_path)
+            if key in covered:
+                continue
+            size = row[2] if len(row) > 2 else ""
+            if size.isdigit():
+                file_bytes = int(size)
+            else:
+                # RECORD lists itself (and sometimes bytecode) without a size
+                try:
+                    file_bytes = os.path.getsize(file_path)
+                except OSError:
+                    continue
+                counted["stats"] += 1
+            covered.add(key)
+            counted["bytes"] += file_bytes
+
+            parts = os.path.relpath(file_path, site_packages).split(os.sep)
+            if len(parts) > 1 and parts[0] not in ("..", "__pycache__"):
+                owned_dirs.add(os.path.normcase(os.path.join(site_packages, parts[0])))
+    return counted
+
+
+def measure_venv_by_record(venv_path: str, validate: bool = False,
+                           progress: Optional[ScanProgress] = None) -> Dict[str, Any]:
+    """
+    Measure a venv from its dist-info RECORD files.
+
+    Args:
+        venv_path (str): Path to the venv (any folder works; folders without
+            site-packages are simply walked).
+        validate (bool): If True, also walk the whole venv and report how far
+            the metadata-based size drifts from it.
+        progress (Optional[ScanProgress]): Ticked once per listed folder.
+
+    Returns:
+        Dict: Measurement with keys:
+            - size_mb: Total size in MB
+            - record_mb: Part of the size taken from RECORD files
+            - walked_mb: Part of the size found by walking
+            - unrecorded_mb: Part of walked_mb found inside package folders
+              but missing from their RECORD files
+            - packages: List of {"name", "size_mb"} dicts, largest first
+            - records_read: Number of RECORD files parsed
+            - files_stat: Number of files whose size was read from disk
+            - walk_mb, drift_mb, drift_percent: Only with validate=True;
+              drift_mb is size_mb minus the true walk size
+
+    Raises:
+        OSError: If venv_path cannot be read.
+    """
+    covered: Set[str] = set()
+    owned_dirs: Set[str] = set()
+    package_bytes: Dict[str, int] = {}
+    records_read = files_stat = 0
+
+    for site_packages in get_site_packages_dirs(venv_path):
+        for entry in sorted(os.scandir(site_packages), key=lambda item: item.name):
+            if not entry.name.endswith(".dist-info") or not entry.is_dir():
+                continue
+            try:
+                counted = _read_record(site_packages, entry.path, covered, owned_dirs)
+            except (OSError, UnicodeDecodeError, csv.Error):
+                # Without a readable RECORD the package is found by the walk below
+                continue
+            name = _distribution_name(entry.name)
+            package_bytes[name] = package_bytes.get(name, 0) + counted["bytes"]
+            records_read += 1
+            files_stat += counted["stats"]
+
+    # Package folders are listed too, so files that no RECORD knows about are
+    # counted; listing needs no stat, only the uncovered files are stat'ed.
+    walked_bytes = unrecorded_bytes = 0
+    package_dirs = set(owned_dirs)
+    for dirpath, dirnames, filenames in os.walk(venv_path):
+        if progress is not None:
+            progress.tick(len(filenames))
+        in_package = os.path.normcase(dirpath) in package_dirs
+        if in_package:
+            package_dirs.update(os.path.normcase(os.path.join(dirpath, name)) for name in dirnames)
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            if os.path.normcase(file_path) in covered or not os.path.isfile(file_path):
+                continue
+            try:
+                file_bytes = os.path.getsize(file_path)
+            except OSError:
+                continue
+            walked_bytes += file_bytes
+            if in_package:
+                unrecorded_bytes += file_bytes
+            files_stat += 1
+
+    record_bytes = sum(package_bytes.values())
+    measurement = {
+        "size_mb": (record_bytes + walked_bytes) / _MB,
+        "record_mb": record_bytes / _MB,
+        "walked_mb": walked_bytes / _MB,
+        "unrecorded_mb": unrecorded_bytes / _MB,
+        "packages": [
+            {"name": name, "size_mb": size / _MB}
+            for name, size in sorted(package_bytes.items(), key=lambda item: item[1], reverse=True)
+        ],
+        "records_read": records_read,
+        "files_stat": files_stat
+    }
+    if validate:
+        walk_mb = get_folder_size(venv_path)
+        measurement["walk_mb"] = walk_mb
+        measurement["drift_mb"] = measurement["size_mb"] - walk_mb
+        measurement["drift_percent"] = 100.0 * measurement["drift_mb"] / walk_mb if walk_mb else 0.0
+    return measurement
+
+
+def format_package_breakdown(measurement: Dict[str, Any], limit: int = 15) -> str:
+    """
+    Format a measurement as text for display.
+
+    Args:
+        measurement (Dict): Result of measure_venv_by_record.
+        limit (int): Maximum number of packages listed.
+
+    Returns:
+        str: One line per package plus totals, files missing from RECORD
+            and, if validated, the drift.
+    """
+    lines = [f"{package['name']}: {package['size_mb']:.1f} MB" for package in measurement["packages"][:limit]]
+    hidden: List[Dict[str, Any]] = measurement["packages"][limit:]
+    if hidden:
+        lines.append(f"{len(hidden)} more packages: {sum(package['size_mb'] for package in hidden):.1f} MB")
+    lines.append(f"Outside packages: {measurement['walked_mb'] - measurement['unrecorded_mb']:.1f} MB")
+    if measurement["unrecorded_mb"]:
+        lines.append(f"Added after install (not in RECORD): {measurement['unrecorded_mb']:.1f} MB")
+    lines.append(f"Total: {measurement['size_mb']:.1f} MB from {measurement['records_read']} RECORD files")
+    if "drift_mb" in measurement:
+        lines.append(f"Full walk: {measurement['walk_mb']:.1f} MB (drift {measurement['drift_mb']:+.1f} MB, "
+                     f"{measurement['drift_percent']:+.1f}%)")
+    return "\n".join(lines)
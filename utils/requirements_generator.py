@@ -3,33 +3,44 @@ Utility module for generating requirements.txt from virtual environments.
 """
 import os
 import subprocess
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Callable
+from utils.snapshot_cache import SnapshotCache, site_packages_token
+from utils.fs_backend import FsBackend, OS_BACKEND
 
 
-def get_venv_python_path(venv_path: str) -> Optional[str]:
+def get_venv_python_path(venv_path: str, fs: Optional[FsBackend] = None) -> Optional[str]:
     """
     Get the Python executable path within a venv.
     
     Args:
         venv_path (str): Path to the venv folder.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
     
     Returns:
         Optional[str]: Path to Python executable, or None if not found.
     """
+    fs = fs or OS_BACKEND
     # Check Windows path
     python_exe = os.path.join(venv_path, "Scripts", "python.exe")
-    if os.path.exists(python_exe):
+    if fs.exists(python_exe):
         return python_exe
     
     # Check Unix/Linux path
     python_bin = os.path.join(venv_path, "bin", "python")
-    if os.path.exists(python_bin):
+    if fs.exists(python_bin):
         return python_bin
     
     return None
 
 
-def generate_requirements_from_venv(venv_path: str, output_path: str, overwrite: bool = False) -> Tuple[bool, str]:
+def _count_packages(requirements_content: str) -> int:
+    """Count the requirement lines of pip freeze output."""
+    return len([line for line in requirements_content.split("\n") if line.strip() and not line.startswith("#")])
+
+
+def generate_requirements_from_venv(venv_path: str, output_path: str, overwrite: bool = False,
+                                    cache: Optional[SnapshotCache] = None,
+                                    fs: Optional[FsBackend] = None) -> Tuple[bool, str]:
     """
     Generate requirements.txt from a virtual environment.
     
@@ -37,6 +48,10 @@ def generate_requirements_from_venv(venv_path: str, output_path: str, overwrite:
         venv_path (str): Path to the venv folder.
         output_path (str): Path where requirements.txt should be saved.
         overwrite (bool): Whether to overwrite existing requirements.txt.
+        cache (Optional[SnapshotCache]): If given, reuse the cached pip freeze
+            output while the venv's packages are unchanged, and cache new output.
+        fs (Optional[FsBackend]): Filesystem and process backend, defaults to
+            the real filesystem; the cache requires the real filesystem.
     
     Returns:
         Tuple[bool, str]: (success_status, message)
@@ -44,49 +59,61 @@ def generate_requirements_from_venv(venv_path: str, output_path: str, overwrite:
             - message: Description of the result
     
     Raises:
-        ValueError: If venv_path or output_path is empty.
+        ValueError: If venv_path or output_path is empty, or cache is used
+            with another backend.
     """
+    fs = fs or OS_BACKEND
     if not venv_path or not venv_path.strip():
         raise ValueError("venv_path cannot be empty")
     
     if not output_path or not output_path.strip():
         raise ValueError("output_path cannot be empty")
     
-    if not os.path.exists(venv_path):
+    if cache is not None and fs is not OS_BACKEND:
+        raise ValueError("The snapshot cache requires the real filesystem")
+    
+    if not fs.exists(venv_path):
         return False, f"Venv path does not exist: {venv_path}"
     
-    if not os.path.isdir(venv_path):
+    if not fs.isdir(venv_path):
         return False, f"Venv path is not a directory: {venv_path}"
     
     # Check if requirements.txt already exists
-    if os.path.exists(output_path) and not overwrite:
+    if fs.exists(output_path) and not overwrite:
         return False, f"Requirements file already exists: {output_path}"
     
+    token = None
+    if cache is not None:
+        token = site_packages_token(venv_path)
+        cached_content = cache.get(venv_path, token)
+        if cached_content is not None:
+            try:
+                fs.write_text(output_path, cached_content)
+            except OSError as e:
+                return False, f"Error generating requirements: {str(e)}"
+            return True, f"Successfully created requirements.txt with {_count_packages(cached_content)} packages (cached)"
+    
     # Get Python executable from venv
-    python_path = get_venv_python_path(venv_path)
+    python_path = get_venv_python_path(venv_path, fs)
     if not python_path:
         return False, f"Could not find Python executable in venv: {venv_path}"
     
     try:
         # Run pip freeze to get installed packages
-        result = subprocess.run(
-            [python_path, "-m", "pip", "freeze"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        result = fs.run([python_path, "-m", "pip", "freeze"], timeout=30)
         
         if result.returncode != 0:
             return False, f"pip freeze failed: {result.stderr}"
         
         requirements_content = result.stdout
+        if cache is not None:
+            cache.put(venv_path, requirements_content, token)
         
         # Write to file
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(requirements_content)
+        fs.write_text(output_path, requirements_content)
         
         # Count number of packages
-        package_count = len([line for line in requirements_content.split("\n") if line.strip() and not line.startswith("#")])
+        package_count = _count_packages(requirements_content)
         
         return True, f"Successfully created requirements.txt with {package_count} packages"
     
@@ -96,7 +123,10 @@ def generate_requirements_from_venv(venv_path: str, output_path: str, overwrite:
         return False, f"Error generating requirements: {str(e)}"
 
 
-def generate_requirements_for_multiple_venvs(venv_info_list: list, overwrite: bool = False) -> dict:
+def generate_requirements_for_multiple_venvs(venv_info_list: list, overwrite: bool = False,
+                                             on_result: Optional[Callable[[str, bool, str], None]] = None,
+                                             cache: Optional[SnapshotCache] = None,
+                                             fs: Optional[FsBackend] = None) -> dict:
     """
     Generate requirements.txt for multiple venvs.
     
@@ -105,6 +135,12 @@ def generate_requirements_for_multiple_venvs(venv_info_list: list, overwrite: bo
             - venv_path: Path to venv
             - project_path: Path to project folder
         overwrite (bool): Whether to overwrite existing requirements files.
+        on_result (Optional[Callable[[str, bool, str], None]]): Called with
+            (venv_path, success, message) after each venv is processed.
+        cache (Optional[SnapshotCache]): Snapshot cache shared by all venvs,
+            e.g. so a real run reuses the snapshots of the preceding dry run.
+        fs (Optional[FsBackend]): Filesystem and process backend, defaults to
+            the real filesystem.
     
     Returns:
         dict: Results containing:
@@ -124,11 +160,15 @@ def generate_requirements_for_multiple_venvs(venv_info_list: list, overwrite: bo
         if not venv_path or not project_path:
             results.append((venv_path, False, "Missing venv_path or project_path"))
             failed += 1
+            if on_result is not None:
+                on_result(venv_path, False, "Missing venv_path or project_path")
             continue
         
         output_path = os.path.join(project_path, "requirements.txt")
-        success, message = generate_requirements_from_venv(venv_path, output_path, overwrite)
+        success, message = generate_requirements_from_venv(venv_path, output_path, overwrite, cache, fs)
         results.append((venv_path, success, message))
+        if on_result is not None:
+            on_result(venv_path, success, message)
         
         if success:
             successful += 1
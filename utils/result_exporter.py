@@ -0,0 +1,278 @@
+"""
+Utility module for streaming scan and operation results to files.
+
+Exporters write one row at a time as results are produced, so exporting a
+large scan uses constant memory. CSV and JSON-lines rows go through a
+buffered file; SQLite rows are inserted in batched transactions. Pass an
+exporter's write method as on_result to the scanner, or result_callback()
+to delete_multiple_venvs and generate_requirements_for_multiple_venvs.
+"""
+import os
+import csv
+import json
+import sqlite3
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Iterable, Callable, Optional
+
+
+SCAN_FIELDS = ("venv_path", "project_path", "project_name", "artifact_type", "age_days", "size_mb",
+               "size_exact", "python_version", "fingerprint", "inode", "root_dir", "in_use", "meets_criteria")
+RESULT_FIELDS = ("operation", "venv_path", "success", "message", "recorded_at")
+SCAN_TABLE = "scan_results"
+RESULT_TABLE = "operation_results"
+DEFAULT_BATCH_SIZE = 1000
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".venv_remover", "results.db")
+
+
+class ResultExporter:
+    """
+    Base class for streaming exporters.
+
+    Subclasses implement _write_row and _close. Use as a context manager or
+    call close() to flush the last rows.
+    """
+
+    def __init__(self, path: str, fields: Tuple[str, ...] = SCAN_FIELDS, table: str = SCAN_TABLE):
+        """
+        Configure an exporter.
+
+        Args:
+            path (str): Destination file.
+            fields (Tuple[str, ...]): Columns to export, in order.
+            table (str): Table name, used by SQLite exporters.
+        """
+        self.path = path
+        self.fields = tuple(fields)
+        self.table = table
+        self.rows_written = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        """
+        Export one row; keys outside the exporter's fields are ignored.
+
+        Args:
+            row (Dict): A venv_info record or an operation result row.
+        """
+        self._write_row([row.get(field) for field in self.fields])
+        self.rows_written += 1
+
+    def result_callback(self, operation: str) -> Callable[[str, bool, str], None]:
+        """
+        Build an on_result callback for (venv_path, success, message) results.
+
+        Args:
+            operation (str): Operation name stored with each row, e.g. "delete".
+
+        Returns:
+            Callable[[str, bool, str], None]: Callback exporting each result.
+        """
+        def on_result(venv_path: str, success: bool, message: str) -> None:
+            self.write({
+                "operation": operation,
+                "venv_path": venv_path,
+                "success": success,
+                "message": message,
+                "recorded_at": datetime.now().isoformat(timespec="seconds")
+            })
+        return on_result
+
+    def _write_row(self, values: List[Any]) -> None:
+        """Write one row of values in field order."""
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        """Flush and release the destination."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Flush pending rows and close the destination."""
+        self._close()
+
+    def __enter__(self) -> "ResultExporter":
+        """Enter a with block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the exporter when leaving a with block."""
+        self.close()
+
+
+class CsvExporter(ResultExporter):
+    """Export rows to a CSV file with a header line."""
+
+    def __init__(self, path: str, fields: Tuple[str, ...] = SCAN_FIELDS, table: str = SCAN_TABLE, append: bool = False):
+        """
+        Open a CSV file.
+
+        Args:
+            path (str): Destination file.
+            fields (Tuple[str, ...]): Columns to export, in order.
+            table (str): Unused for CSV.
+            append (bool): If True, append to an existing file.
+        """
+        super().__init__(path, fields, table)
+        write_header = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(self.fields)
+
+    def _write_row(self, values: List[Any]) -> None:
+        """Write one CSV line."""
+        self._writer.writerow(values)
+
+    def _close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class JsonlExporter(ResultExporter):
+    """Export rows as one JSON object per line."""
+
+    def __init__(self, path: str, fields: Tuple[str, ...] = SCAN_FIELDS, table: str = SCAN_TABLE, append: bool = False):
+        """
+        Open a JSON-lines file.
+
+        Args:
+            path (str): Destination file.
+            fields (Tuple[str, ...]): Keys to export.
+            table (str): Unused for JSON lines.
+            append (bool): If True, append to an existing file.
+        """
+        super().__init__(path, fields, table)
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def _write_row(self, values: List[Any]) -> None:
+        """Write one JSON line."""
+        self._file.write(json.dumps(dict(zip(self.fields, values)), separators=(",", ":")) + "\n")
+
+    def _close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class SqliteExporter(ResultExporter):
+    """Export rows into an SQLite table using batched transactions."""
+
+    def __init__(self, path: str, fields: Tuple[str, ...] = SCAN_FIELDS, table: str = SCAN_TABLE,
+                 append: bool = True, batch_size: int = DEFAULT_BATCH_SIZE, overwrite: bool = False):
+        """
+        Open an SQLite database and create the table if needed.
+
+        Args:
+            path (str): Database file.
+            fields (Tuple[str, ...]): Columns to export, in order.
+            table (str): Table receiving the rows.
+            append (bool): If True, add to the rows already in the table;
+                if False, the table must be empty unless overwrite is set.
+            batch_size (int): Rows inserted per transaction.
+            overwrite (bool): With append False, remove the existing rows.
+
+        Raises:
+            ValueError: If batch_size is not positive, a name is invalid or
+                the table already has rows and neither append nor
+                overwrite is set.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if not all(name.isidentifier() for name in (table,) + tuple(fields)):
+            raise ValueError("Table and field names must be identifiers")
+        super().__init__(path, fields, table)
+        self.batch_size = batch_size
+        self.transactions = 0
+        self._pending: List[List[Any]] = []
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(self.fields)})")
+        if not append:
+            existing = self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            if existing and not overwrite:
+                self._connection.close()
+                raise ValueError(f"Table {table} in {path} already has {existing} rows; "
+                                 "append to it or pass overwrite=True to replace them")
+            self._connection.execute(f"DELETE FROM {table}")
+        self._connection.commit()
+        self._insert = f"INSERT INTO {table} ({', '.join(self.fields)}) VALUES ({', '.join('?' * len(self.fields))})"
+
+    def _write_row(self, values: List[Any]) -> None:
+        """Buffer one row and insert a batch when it is full."""
+        self._pending.append(values)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert the buffered rows in one transaction."""
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(self._insert, self._pending)
+        self._pending = []
+        self.transactions += 1
+
+    def _close(self) -> None:
+        """Insert the last batch and close the database."""
+        self.flush()
+        self._connection.close()
+
+
+def create_exporter(path: str, fields: Tuple[str, ...] = SCAN_FIELDS, table: str = SCAN_TABLE,
+                    append: Optional[bool] = None, overwrite: bool = False) -> ResultExporter:
+    """
+    Create an exporter for a file, choosing the format by extension.
+
+    Args:
+        path (str): Destination ending in .csv, .jsonl or .db/.sqlite/.sqlite3.
+        fields (Tuple[str, ...]): Columns to export.
+        table (str): Table name for SQLite.
+        append (Optional[bool]): If True, keep existing content. Defaults to
+            True for SQLite, whose database may hold rows the user wants to
+            keep, and to False (replace the file) for CSV and JSON lines.
+        overwrite (bool): Allow removing the existing rows of an SQLite
+            table when append is False.
+
+    Returns:
+        ResultExporter: The exporter.
+
+    Raises:
+        ValueError: If the extension is not supported, or append is False
+            for a non-empty SQLite table without overwrite.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return CsvExporter(path, fields, table, bool(append))
+    if extension == ".jsonl":
+        return JsonlExporter(path, fields, table, bool(append))
+    if extension in SQLITE_EXTENSIONS:
+        return SqliteExporter(path, fields, table, append is not False, overwrite=overwrite)
+    raise ValueError(f"Unsupported export format: {extension or path}")
+
+
+def export_records(records: Iterable[Dict[str, Any]], path: str) -> Tuple[bool, str]:
+    """
+    Export scan records, consuming them one at a time.
+
+    Args:
+        records (Iterable[Dict]): venv_info records, e.g. a scan result list
+            or a ScanResultFile.
+        path (str): Destination file; the format follows the extension.
+            CSV and JSON-lines files are replaced, while SQLite records are
+            added to the rows already in the table.
+
+    Returns:
+        Tuple[bool, str]: (success_status, message)
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    exporter = None
+    try:
+        exporter = create_exporter(path)
+        for record in records:
+            exporter.write(record)
+    except (OSError, sqlite3.Error) as e:
+        return False, f"Error exporting results: {str(e)}"
+    finally:
+        if exporter is not None:
+            exporter.close()
+    return True, f"Exported {exporter.rows_written} results to {path}"
@@ -0,0 +1,254 @@
+"""
+Utility module for deleting folder trees past per-file failures.
+
+shutil.rmtree stops at the first error and leaves a half-deleted venv. This
+module removes everything it can instead: every failure is classified as
+read_only, busy, vanished, permission or other, read-only entries are made
+writable and busy ones retried after a short delay, and whatever is left
+is measured exactly. Each failed entry is tallied once in a Counter (retry
+attempts are counted separately) and only the first few are kept as
+samples, so a large tree with scattered failures is deleted at the same
+speed as a clean one.
+"""
+import os
+import stat
+import time
+import errno
+from collections import Counter
+from typing import List, Dict, Any, Tuple, Optional, Set
+from utils.fs_backend import FsBackend, OS_BACKEND
+
+
+ERROR_KINDS = ("read_only", "busy", "vanished", "permission", "other")
+RETRIED_KINDS = ("read_only", "busy")
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_DELAY = 0.2
+DEFAULT_SAMPLE_LIMIT = 10
+
+_BUSY_ERRNOS = {errno.EBUSY, errno.ETXTBSY}
+# ERROR_SHARING_VIOLATION and ERROR_LOCK_VIOLATION on Windows
+_BUSY_WINERRORS = {32, 33}
+
+
+def _is_writable(fs: FsBackend, path: str) -> bool:
+    """Return True if path has the owner write bit, or cannot be checked."""
+    try:
+        return bool(fs.lstat(path).st_mode & stat.S_IWUSR)
+    except OSError:
+        return True
+
+
+def classify_error(error: OSError, path: str, fs: Optional[FsBackend] = None) -> str:
+    """
+    Classify a failed unlink or rmdir.
+
+    Args:
+        error (OSError): The raised error.
+        path (str): The entry that could not be removed.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
+
+    Returns:
+        str: One of ERROR_KINDS. Permission errors count as read_only when
+            the entry (Windows) or its folder (POSIX) lacks write permission,
+            which chmod can fix.
+    """
+    fs = fs or OS_BACKEND
+    if error.errno == errno.ENOENT:
+        return "vanished"
+    if error.errno in _BUSY_ERRNOS or getattr(error, "winerror", None) in _BUSY_WINERRORS:
+        return "busy"
+    if error.errno in (errno.EACCES, errno.EPERM):
+        if not _is_writable(fs, path) or not _is_writable(fs, os.path.dirname(path)):
+            return "read_only"
+        return "permission"
+    return "other"
+
+
+def _make_writable(fs: FsBackend, path: str) -> None:
+    """Add the owner write bit to path and its folder, ignoring failures."""
+    for target in (path, os.path.dirname(path)):
+        try:
+            mode = fs.lstat(target).st_mode
+            if not mode & stat.S_IWUSR:
+                fs.chmod(target, stat.S_IMODE(mode) | stat.S_IWUSR)
+        except OSError:
+            pass
+
+
+class _TreeDeletion:
+    """Shared state of one delete_tree call: failed entries and the tallies."""
+
+    def __init__(self, fs: FsBackend, sample_limit: int):
+        """
+        Start with nothing removed or failed.
+
+        Args:
+            fs (FsBackend): Filesystem backend.
+            sample_limit (int): Number of failed entries kept in samples.
+        """
+        self.fs = fs
+        self.sample_limit = sample_limit
+        self.errors: Counter = Counter()
+        self.samples: List[Tuple[str, str]] = []
+        self.failed_paths: Set[str] = set()
+        self.pending_files: List[Tuple[str, str]] = []
+        # Bottom-up, with the kind of the failure or None if only not empty
+        self.pending_dirs: List[Tuple[str, Optional[str]]] = []
+        self.removed_files = 0
+        self.retried = 0
+        self.retry_attempts = 0
+
+    def failed(self, path: str, error: OSError) -> str:
+        """Classify a failure; each entry is counted and sampled only once."""
+        kind = classify_error(error, path, self.fs)
+        if path not in self.failed_paths:
+            self.failed_paths.add(path)
+            self.errors[kind] += 1
+            if len(self.samples) < self.sample_limit:
+                self.samples.append((path, kind))
+        return kind
+
+    def walk(self, folder_path: str) -> None:
+        """Unlink every file and remove every folder that is empty, bottom-up."""
+        fs = self.fs
+        for dirpath, dirnames, filenames in fs.walk(folder_path, topdown=False):
+            for dirname in dirnames:
+                # Symlinked folders are listed but not walked
+                link_path = os.path.join(dirpath, dirname)
+                try:
+                    if stat.S_ISLNK(fs.lstat(link_path).st_mode):
+                        filenames.append(dirname)
+                except OSError:
+                    pass
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                try:
+                    fs.unlink(file_path)
+                    self.removed_files += 1
+                except OSError as e:
+                    kind = self.failed(file_path, e)
+                    if kind != "vanished":
+                        self.pending_files.append((file_path, kind))
+            try:
+                fs.rmdir(dirpath)
+            except OSError as e:
+                # A folder that still holds failed entries is not a failure itself
+                if e.errno in (errno.ENOTEMPTY, errno.EEXIST):
+                    self.pending_dirs.append((dirpath, None))
+                else:
+                    kind = self.failed(dirpath, e)
+                    if kind != "vanished":
+                        self.pending_dirs.append((dirpath, kind))
+
+    def retry_files(self, retries: int, retry_delay: float) -> None:
+        """Retry read_only files after chmod and busy ones after retry_delay."""
+        for _ in range(retries):
+            retry = [(path, kind) for path, kind in self.pending_files if kind in RETRIED_KINDS]
+            if not retry:
+                break
+            if any(kind == "busy" for _, kind in retry):
+                time.sleep(retry_delay)
+            self.pending_files = [(path, kind) for path, kind in self.pending_files if kind not in RETRIED_KINDS]
+            for file_path, kind in retry:
+                if kind == "read_only":
+                    _make_writable(self.fs, file_path)
+                self.retry_attempts += 1
+                try:
+                    self.fs.unlink(file_path)
+                    self.removed_files += 1
+                    self.retried += 1
+                except OSError as e:
+                    kind = self.failed(file_path, e)
+                    if kind != "vanished":
+                        self.pending_files.append((file_path, kind))
+
+    def remove_dirs(self) -> int:
+        """Remove the folders left by the walk, deepest first; return how many remain."""
+        leftover_dirs = 0
+        for dirpath, kind in self.pending_dirs:
+            if kind == "read_only":
+                _make_writable(self.fs, dirpath)
+                self.retry_attempts += 1
+            try:
+                self.fs.rmdir(dirpath)
+                if kind is not None:
+                    self.retried += 1
+            except OSError as e:
+                if e.errno == errno.ENOENT:
+                    continue
+                if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                    self.failed(dirpath, e)
+                leftover_dirs += 1
+        return leftover_dirs
+
+    def leftover_bytes(self) -> int:
+        """Return the exact size of the files that remain."""
+        total = 0
+        for file_path, _ in self.pending_files:
+            try:
+                total += self.fs.lstat(file_path).st_size
+            except OSError:
+                pass
+        return total
+
+
+def delete_tree(folder_path: str, fs: Optional[FsBackend] = None, retries: int = DEFAULT_RETRIES,
+                retry_delay: float = DEFAULT_RETRY_DELAY, sample_limit: int = DEFAULT_SAMPLE_LIMIT) -> Dict[str, Any]:
+    """
+    Delete a folder tree, continuing past entries that cannot be removed.
+
+    Files are unlinked and folders removed bottom-up; symlinks are removed,
+    never followed. Failed files are retried after the pass: read_only
+    ones after chmod, busy ones after retry_delay seconds. Folders left
+    behind are removed last, read_only ones after chmod.
+
+    Args:
+        folder_path (str): Folder to delete.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
+        retries (int): Retry rounds for read_only and busy files.
+        retry_delay (float): Seconds to wait before retrying busy files.
+        sample_limit (int): Number of failed entries kept in samples.
+
+    Returns:
+        Dict: Report with removed_files, leftover_files, leftover_dirs,
+            leftover_bytes (exact size of the files that remain; folders
+            that could not be listed only count in leftover_dirs), errors
+            (a Counter of ERROR_KINDS counting every failed entry once, by
+            its first failure, vanished entries included), retried
+            (entries removed by a retry), retry_attempts and samples, a
+            list of (path, kind) of the first failures.
+
+    Raises:
+        OSError: If folder_path is a symlink or cannot be read.
+    """
+    fs = fs or OS_BACKEND
+    if stat.S_ISLNK(fs.lstat(folder_path).st_mode):
+        raise OSError(f"Cannot delete a symbolic link as a tree: {folder_path}")
+
+    deletion = _TreeDeletion(fs, sample_limit)
+    deletion.walk(folder_path)
+    deletion.retry_files(retries, retry_delay)
+    leftover_dirs = deletion.remove_dirs()
+    return {
+        "removed_files": deletion.removed_files,
+        "leftover_files": len(deletion.pending_files),
+        "leftover_dirs": leftover_dirs,
+        "leftover_bytes": deletion.leftover_bytes(),
+        "errors": deletion.errors,
+        "retried": deletion.retried,
+        "retry_attempts": deletion.retry_attempts,
+        "samples": deletion.samples
+    }
+
+
+def format_error_counts(errors: Counter) -> str:
+    """
+    Format an error Counter in ERROR_KINDS order.
+
+    Args:
+        errors (Counter): Counts per error kind.
+
+    Returns:
+        str: Text such as "read_only 3, busy 1", or "none".
+    """
+    return ", ".join(f"{kind} {errors[kind]}" for kind in ERROR_KINDS if errors.get(kind)) or "none"
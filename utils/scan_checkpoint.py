@@ -0,0 +1,244 @@
+"""
+Utility module for checkpointed, resumable scans of very large volumes.
+
+A ScanSession walks the tree with an explicit frontier of pending
+directories. Completed results and the frontier are periodically appended
+to a JSON-lines journal in batched writes, so an interrupted scan resumes
+from its last checkpoint instead of starting from zero.
+"""
+import os
+import json
+import time
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from utils.venv_scanner import (
+    detect_artifact_type,
+    validate_artifact_types,
+    build_artifact_info,
+    finalize_artifact_list
+)
+from utils.venv_policy import compile_policy, default_policy_text
+
+
+JOURNAL_VERSION = 1
+DEFAULT_CHECKPOINT_INTERVAL = 10.0
+
+
+class ScanSession:
+    """
+    A resumable scan of one root directory.
+
+    Journal lines are compact JSON objects:
+        {"v": 1, "root": ..., "types": [...]}  header
+        {"r": {...}}                            completed result
+        {"f": [...]}                            checkpoint of pending directories
+        {"done": true}                          scan finished
+    Results are only written together with a checkpoint, so everything up
+    to the last checkpoint line is a consistent state.
+    """
+
+    def __init__(self, root_dir: str, journal_path: str, days_unused: int = 60, min_size_mb: int = 200,
+                 artifact_types: Optional[Tuple[str, ...]] = ("venv",), estimate_sizes: bool = False,
+                 policy: Optional[str] = None, checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Configure a scan session.
+
+        Args:
+            root_dir (str): Root directory to scan.
+            journal_path (str): Journal file used for checkpoints.
+            days_unused (int): Minimum age in days for deletion criteria.
+            min_size_mb (int): Minimum size in MB for deletion criteria.
+            artifact_types (Optional[Tuple[str, ...]]): Artifact types to
+                detect, defaults to venvs only; None means all types.
+            estimate_sizes (bool): If True, report sampled size estimates.
+            policy (Optional[str]): Policy text deciding meets_criteria.
+            checkpoint_interval (float): Seconds between checkpoints.
+
+        Raises:
+            ValueError: If root_dir is not a directory or an argument is invalid.
+        """
+        if not os.path.isdir(root_dir):
+            raise ValueError(f"Root path is not a directory: {root_dir}")
+
+        if checkpoint_interval <= 0:
+            raise ValueError("checkpoint_interval must be positive")
+
+        self.root_dir = root_dir
+        self.journal_path = journal_path
+        self.days_unused = days_unused
+        self.min_size_mb = min_size_mb
+        self.artifact_types = validate_artifact_types(artifact_types)
+        self.estimate_sizes = estimate_sizes
+        self.policy = policy or default_policy_text(days_unused, min_size_mb)
+        compile_policy(self.policy)
+        self.checkpoint_interval = checkpoint_interval
+
+        self.results: List[Dict[str, Any]] = []
+        self.frontier: List[str] = []
+        self.completed = False
+        self.checkpoints = 0
+        self.checkpoint_seconds = 0.0
+
+    def _header(self) -> Dict[str, Any]:
+        """Build the journal header for this session."""
+        return {"v": JOURNAL_VERSION, "root": os.path.abspath(self.root_dir), "types": list(self.artifact_types)}
+
+    def _load_journal(self) -> bool:
+        """
+        Restore state from the journal up to its last checkpoint.
+
+        The journal is truncated after the last checkpoint, dropping any
+        partially written batch.
+
+        Returns:
+            bool: True if a usable journal was found.
+
+        Raises:
+            ValueError: If the journal belongs to a different scan.
+        """
+        if not os.path.exists(self.journal_path):
+            return False
+
+        results: List[Dict[str, Any]] = []
+        pending_results: List[Dict[str, Any]] = []
+        frontier: Optional[List[str]] = None
+        completed = False
+        valid_end = 0
+
+        with open(self.journal_path, "rb") as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except ValueError:
+                return False
+            if header != self._header():
+                raise ValueError(f"Journal belongs to a different scan: {self.journal_path}")
+            valid_end = f.tell()
+
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if "r" in entry:
+                    pending_results.append(entry["r"])
+                elif "f" in entry:
+                    results.extend(pending_results)
+                    pending_results = []
+                    frontier = entry["f"]
+                    valid_end = f.tell()
+                elif entry.get("done"):
+                    completed = True
+                    valid_end = f.tell()
+                    break
+
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(valid_end)
+
+        self.results = results
+        self.completed = completed
+        self.frontier = [os.path.join(self.root_dir, relative) for relative in frontier] if frontier is not None else []
+        if frontier is None and not completed:
+            self.frontier = [self.root_dir]
+        return True
+
+    def _write_checkpoint(self, journal, batch: List[Dict[str, Any]]) -> None:
+        """
+        Append buffered results and the current frontier in one write.
+
+        Args:
+            journal (IO): Journal opened for appending.
+            batch (List[Dict]): Results completed since the last checkpoint.
+        """
+        started = time.monotonic()
+        lines = [json.dumps({"r": result}, separators=(",", ":")) for result in batch]
+        relative_frontier = [os.path.relpath(path, self.root_dir) for path in self.frontier]
+        lines.append(json.dumps({"f": relative_frontier}, separators=(",", ":")))
+        journal.write(("\n".join(lines) + "\n").encode("utf-8"))
+        journal.flush()
+        os.fsync(journal.fileno())
+        self.checkpoints += 1
+        self.checkpoint_seconds += time.monotonic() - started
+
+    def _scan_directory(self, dir_path: str) -> List[Dict[str, Any]]:
+        """
+        List one directory, record its artifacts and queue its subdirectories.
+
+        Args:
+            dir_path (str): Directory to process.
+
+        Returns:
+            List[Dict]: Artifacts found directly inside dir_path.
+        """
+        try:
+            with os.scandir(dir_path) as entries:
+                entries = list(entries)
+        except OSError:
+            return []
+
+        filenames = [entry.name for entry in entries if not entry.is_dir()]
+        found = []
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            artifact_type = detect_artifact_type(entry.name, filenames, self.artifact_types)
+            if artifact_type is not None:
+                try:
+                    found.append(build_artifact_info(entry.path, artifact_type, self.estimate_sizes))
+                except Exception as e:
+                    print(f"Error scanning {entry.path}: {e}")
+            elif not entry.is_symlink():
+                self.frontier.append(entry.path)
+        return found
+
+    def run(self, resume: bool = True, should_stop: Optional[Callable[[], bool]] = None) -> List[Dict[str, Any]]:
+        """
+        Run or resume the scan.
+
+        Args:
+            resume (bool): If True, continue from an existing journal;
+                otherwise start over.
+            should_stop (Optional[Callable[[], bool]]): Polled between
+                directories; when it returns True a checkpoint is written
+                and the partial results are returned.
+
+        Returns:
+            List[Dict]: Scan results in the scan_for_artifacts format. Check
+                the completed attribute to know whether the scan finished.
+
+        Raises:
+            ValueError: If the journal belongs to a different scan.
+        """
+        loaded = resume and self._load_journal()
+        if not loaded:
+            os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+            with open(self.journal_path, "wb") as journal:
+                journal.write((json.dumps(self._header(), separators=(",", ":")) + "\n").encode("utf-8"))
+            self.results = []
+            self.frontier = [self.root_dir]
+            self.completed = False
+
+        if self.completed:
+            return finalize_artifact_list(self.results, self.root_dir, self.policy)
+
+        batch: List[Dict[str, Any]] = []
+        with open(self.journal_path, "ab") as journal:
+            next_checkpoint = time.monotonic() + self.checkpoint_interval
+            while self.frontier:
+                if should_stop is not None and should_stop():
+                    self._write_checkpoint(journal, batch)
+                    self.results.extend(batch)
+                    return finalize_artifact_list(self.results, self.root_dir, self.policy)
+
+                batch.extend(self._scan_directory(self.frontier.pop()))
+                if time.monotonic() >= next_checkpoint:
+                    self._write_checkpoint(journal, batch)
+                    self.results.extend(batch)
+                    batch = []
+                    next_checkpoint = time.monotonic() + self.checkpoint_interval
+
+            self._write_checkpoint(journal, batch)
+            self.results.extend(batch)
+            journal.write(b'{"done":true}\n')
+            self.completed = True
+
+        return finalize_artifact_list(self.results, self.root_dir, self.policy)
@@ -0,0 +1,241 @@
+"""
+Utility module for reporting scan progress.
+
+A scan cannot know in advance how much it has to walk, so the total is
+estimated. Progress counts every folder and file the scan reads, both while
+discovering artifacts and while sizing them, so an exact scan reads about
+as many entries as the root holds inodes. The best estimate is the number
+of entries the last scan of the same root read, scaled by how much the
+volume's used inode count (os.statvfs) changed since then. Without history,
+the volume's used inodes are an upper bound, exact when the root is the
+mount point. Windows has no statvfs, so there only history is used.
+Sampled size estimates read only part of each artifact, so their scans
+finish below the statvfs estimate; their history is still exact.
+
+ScanProgress is called once per read folder (or batch of folders) and only
+does a counter update and a clock read there; the callback runs at most
+once per interval. When the scan finishes, the entry count and throughput
+of the root are stored for the next estimate.
+"""
+import os
+import json
+import time
+from typing import Dict, Any, Optional, Callable, Tuple
+
+
+DEFAULT_STATS_PATH = os.path.join(os.path.expanduser("~"), ".venv_remover", "scan_stats.json")
+DEFAULT_INTERVAL = 0.5
+
+
+def used_inodes(path: str) -> Optional[int]:
+    """
+    Return the number of used inodes on the volume holding path.
+
+    Args:
+        path (str): Any path on the volume.
+
+    Returns:
+        Optional[int]: Used inodes, or None if the platform or filesystem
+            does not report them.
+    """
+    if not hasattr(os, "statvfs"):
+        return None
+    try:
+        st = os.statvfs(path)
+    except OSError:
+        return None
+    # Some filesystems (e.g. btrfs, network mounts) report no inode counts
+    return st.f_files - st.f_ffree if st.f_files else None
+
+
+def load_root_stats(stats_path: str = DEFAULT_STATS_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the stored per-root scan statistics.
+
+    Args:
+        stats_path (str): JSON file written by ScanProgress.finish.
+
+    Returns:
+        Dict: Statistics per absolute root path, empty if none are stored.
+    """
+    try:
+        with open(stats_path, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return stats if isinstance(stats, dict) else {}
+
+
+def estimate_total_entries(root_dir: str, stats_path: str = DEFAULT_STATS_PATH) -> Tuple[Optional[int], str]:
+    """
+    Estimate how many entries (folders and files) a scan of root_dir walks.
+
+    Args:
+        root_dir (str): Root folder of the scan.
+        stats_path (str): Stored per-root statistics.
+
+    Returns:
+        Tuple[Optional[int], str]: The estimate and its source: "history",
+            "statvfs" or "unknown" (estimate None).
+    """
+    inodes = used_inodes(root_dir)
+    previous = load_root_stats(stats_path).get(os.path.abspath(root_dir))
+    if previous and previous.get("entries"):
+        entries = previous["entries"]
+        if inodes and previous.get("used_inodes"):
+            entries = int(entries * inodes / previous["used_inodes"])
+        return max(entries, 1), "history"
+    if inodes:
+        return inodes, "statvfs"
+    return None, "unknown"
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as e.g. "1h 02m", "3m 05s" or "12s"."""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def format_progress(report: Dict[str, Any]) -> str:
+    """
+    Format a progress report for a status line.
+
+    Args:
+        report (Dict): Report passed to the ScanProgress callback.
+
+    Returns:
+        str: Text such as "Scanning... 42% - 1,204 dirs, 18,330 files
+            (9,120 files/s) - ETA 1m 05s".
+    """
+    text = "Scanning..."
+    if report["percent"] is not None:
+        text += f" {report['percent']:.0f}% -"
+    text += f" {report['dirs']:,} dirs, {report['files']:,} files ({report['files_per_s']:,.0f} files/s)"
+    if report["eta_s"] is not None and not report["done"]:
+        text += f" - ETA {format_duration(report['eta_s'])}"
+    return text
+
+
+class ScanProgress:
+    """
+    Progress of one scan, reported through a sampled callback.
+
+    Pass an instance as the progress argument of scan_for_artifacts. The
+    callback receives a dict with dirs, files, elapsed_s, dirs_per_s,
+    files_per_s, estimate, estimate_source, percent and eta_s (None without
+    an estimate) and done.
+    """
+
+    def __init__(self, root_dir: str, callback: Callable[[Dict[str, Any]], None],
+                 interval: float = DEFAULT_INTERVAL, stats_path: Optional[str] = DEFAULT_STATS_PATH,
+                 estimate: Optional[int] = None):
+        """
+        Start tracking a scan.
+
+        Args:
+            root_dir (str): Root folder of the scan.
+            callback (Callable[[Dict], None]): Receives progress reports.
+            interval (float): Minimum seconds between reports.
+            stats_path (Optional[str]): Per-root statistics used for the
+                estimate and updated by finish; None disables both.
+            estimate (Optional[int]): Known entry count, skipping the estimate.
+        """
+        self.root_dir = root_dir
+        self.callback = callback
+        self.interval = interval
+        self.stats_path = stats_path
+        previous = load_root_stats(stats_path).get(os.path.abspath(root_dir), {}) if stats_path is not None else {}
+        self.history_rate: Optional[float] = previous.get("entries_per_s")
+        if estimate is not None:
+            self.estimate, self.estimate_source = estimate, "given"
+        elif stats_path is not None:
+            self.estimate, self.estimate_source = estimate_total_entries(root_dir, stats_path)
+        else:
+            self.estimate, self.estimate_source = None, "unknown"
+        self.dirs = 0
+        self.files = 0
+        self.started = time.monotonic()
+        self._next_report = self.started + interval
+
+    def tick(self, file_count: int, dir_count: int = 1) -> None:
+        """
+        Record walked folders; called from the scan's and sizing's inner loops.
+
+        Args:
+            file_count (int): Number of files listed in the folders.
+            dir_count (int): Number of folders read.
+        """
+        self.dirs += dir_count
+        self.files += file_count
+        now = time.monotonic()
+        if now >= self._next_report:
+            self._next_report = now + self.interval
+            self.callback(self.report(now))
+
+    def report(self, now: Optional[float] = None, done: bool = False) -> Dict[str, Any]:
+        """
+        Build a progress report.
+
+        Args:
+            now (Optional[float]): time.monotonic() value, defaults to now.
+            done (bool): Whether the scan has finished.
+
+        Returns:
+            Dict: Report as described in the class docstring.
+        """
+        elapsed = max((time.monotonic() if now is None else now) - self.started, 1e-9)
+        entries = self.dirs + self.files
+        percent = eta = None
+        if done:
+            percent, eta = 100.0, 0.0
+        elif self.estimate:
+            # The estimate can be low; never claim completion before the walk ends
+            percent = min(99.0, 100.0 * entries / self.estimate)
+            # Until the first folders are walked, use the throughput of the last scan
+            rate = entries / elapsed if entries else self.history_rate
+            eta = max(self.estimate - entries, 0) / rate if rate else None
+        return {
+            "dirs": self.dirs,
+            "files": self.files,
+            "elapsed_s": elapsed,
+            "dirs_per_s": self.dirs / elapsed,
+            "files_per_s": self.files / elapsed,
+            "estimate": self.estimate,
+            "estimate_source": self.estimate_source,
+            "percent": percent,
+            "eta_s": eta,
+            "done": done
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Send the final report and store the root's statistics.
+
+        Returns:
+            Dict: The final report.
+        """
+        report = self.report(done=True)
+        if self.stats_path is not None:
+            stats = load_root_stats(self.stats_path)
+            stats[os.path.abspath(self.root_dir)] = {
+                "entries": self.dirs + self.files,
+                "entries_per_s": round((self.dirs + self.files) / report["elapsed_s"], 1),
+                "used_inodes": used_inodes(self.root_dir),
+                "updated": time.time()
+            }
+            temp_path = f"{self.stats_path}.tmp{os.getpid()}"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.stats_path)), exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(stats, f)
+                os.replace(temp_path, self.stats_path)
+            except OSError:
+                # Statistics only improve later estimates
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        self.callback(report)
+        return report
@@ -0,0 +1,244 @@
+"""
+Utility module for compact, memory-mapped scan result files.
+
+Scan results are stored column by column: fixed-width numeric columns for
+sizes, age, flags and inode, and string columns holding indexes into one
+interned string table. A reader maps the file and exposes the columns as
+memoryviews without a parse step, so reopening a large result set is
+instant and several processes can read the same file without copies.
+
+Layout (little-endian, every section aligned to 8 bytes):
+
+    header        magic, version, record count, string count, blob size
+    float64[N]    one column per FLOAT_COLUMNS entry
+    uint64[N]     inode
+    uint32[N]     one column per STRING_COLUMNS entry (string table index)
+    uint8[N]      flags (FLAG_BITS)
+    uint64[M+1]   string offsets into the blob
+    bytes         UTF-8 string blob
+"""
+import os
+import sys
+import mmap
+import struct
+from array import array
+from typing import List, Dict, Any, Tuple, Iterator
+
+
+MAGIC = b"VRSCAN\x00\x01"
+FORMAT_VERSION = 1
+FLOAT_COLUMNS = ("size_mb", "size_low_mb", "size_high_mb", "age_days")
+STRING_COLUMNS = ("venv_path", "project_path", "project_name", "artifact_type",
+                  "python_version", "fingerprint", "root_dir")
+FLAG_BITS = {"meets_criteria": 1, "in_use": 2, "size_exact": 4}
+DEFAULT_RESULT_PATH = os.path.join(os.path.expanduser("~"), ".venv_remover", "last_scan.vrs")
+_HEADER = struct.Struct("<8sIIQQQ")
+
+
+def _padded(length: int) -> int:
+    """Round a section length up to the 8-byte alignment."""
+    return (length + 7) & ~7
+
+
+def _column_bytes(typecode: str, values) -> bytes:
+    """Encode a column as little-endian bytes."""
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    data = column.tobytes()
+    return data + b"\0" * (_padded(len(data)) - len(data))
+
+
+def write_scan_results(records: List[Dict[str, Any]], result_path: str = DEFAULT_RESULT_PATH) -> Tuple[bool, str]:
+    """
+    Write scan results to a columnar result file.
+
+    The file is written next to its destination and moved into place, so
+    readers that already mapped the previous file keep a consistent view.
+
+    Args:
+        records (List[Dict]): Scan results in the scan_for_artifacts format.
+        result_path (str): Destination file.
+
+    Returns:
+        Tuple[bool, str]: (success_status, message)
+    """
+    strings: Dict[str, int] = {}
+    string_columns = [
+        [strings.setdefault(str(record.get(column, "")), len(strings)) for record in records]
+        for column in STRING_COLUMNS
+    ]
+    blob_parts = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for part in blob_parts:
+        offsets.append(offsets[-1] + len(part))
+    flags = [
+        sum(bit for name, bit in FLAG_BITS.items() if record.get(name, False))
+        for record in records
+    ]
+
+    sections = [_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(records), len(strings), offsets[-1])]
+    for column in FLOAT_COLUMNS:
+        sections.append(_column_bytes("d", (float(record.get(column, 0.0)) for record in records)))
+    sections.append(_column_bytes("Q", (int(record.get("inode", 0)) for record in records)))
+    for codes in string_columns:
+        sections.append(_column_bytes("I", codes))
+    sections.append(_column_bytes("B", flags))
+    sections.append(_column_bytes("Q", offsets))
+    sections.append(b"".join(blob_parts))
+
+    temp_path = f"{result_path}.tmp{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(result_path)), exist_ok=True)
+        with open(temp_path, "wb") as f:
+            f.writelines(sections)
+        os.replace(temp_path, result_path)
+        return True, f"Saved {len(records)} results to {result_path}"
+    except OSError as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False, f"Error saving scan results: {str(e)}"
+
+
+class ScanResultFile:
+    """
+    Read-only, memory-mapped view of a scan result file.
+
+    Columns are memoryviews over the mapping; records are decoded only when
+    indexed. Use as a context manager or call close() when done.
+    """
+
+    def __init__(self, result_path: str = DEFAULT_RESULT_PATH):
+        """
+        Map a result file.
+
+        Args:
+            result_path (str): File written by write_scan_results.
+
+        Raises:
+            ValueError: If the file is not a valid result file.
+            OSError: If the file cannot be opened.
+        """
+        self.path = result_path
+        with open(result_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"Not a scan result file: {result_path}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, _, count, string_count, blob_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Not a scan result file: {result_path}")
+        self.length = count
+        self.string_count = string_count
+
+        offset = _HEADER.size
+        self.columns: Dict[str, memoryview] = {}
+        for column in FLOAT_COLUMNS:
+            self.columns[column], offset = self._section(offset, "d", count)
+        self.columns["inode"], offset = self._section(offset, "Q", count)
+        for column in STRING_COLUMNS:
+            self.columns[column], offset = self._section(offset, "I", count)
+        self.columns["flags"], offset = self._section(offset, "B", count)
+        self._string_offsets, offset = self._section(offset, "Q", string_count + 1)
+        self._blob_offset = offset
+        if offset + blob_size > len(self._mmap):
+            self.close()
+            raise ValueError(f"Truncated scan result file: {result_path}")
+
+    def _section(self, offset: int, typecode: str, count: int) -> Tuple[memoryview, int]:
+        """
+        Map one column starting at offset.
+
+        Returns:
+            Tuple[memoryview, int]: The column and the next section offset.
+        """
+        length = struct.calcsize(typecode) * count
+        if offset + length > len(self._mmap):
+            self.close()
+            raise ValueError(f"Truncated scan result file: {self.path}")
+        raw = self._view[offset:offset + length]
+        if sys.byteorder != "little":
+            # Big-endian hosts pay for one copy per column.
+            column = array(typecode, raw.tobytes())
+            column.byteswap()
+            raw = memoryview(column.tobytes())
+        return raw.cast(typecode), offset + _padded(length)
+
+    def string(self, index: int) -> str:
+        """Return one entry of the interned string table."""
+        start = self._blob_offset + self._string_offsets[index]
+        end = self._blob_offset + self._string_offsets[index + 1]
+        return str(self._view[start:end], "utf-8")
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return self.length
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """
+        Decode one record.
+
+        Args:
+            index (int): Record index; negative indexes count from the end.
+
+        Returns:
+            Dict: The record in the scan_for_artifacts format.
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("scan result index out of range")
+        record: Dict[str, Any] = {column: self.columns[column][index] for column in FLOAT_COLUMNS}
+        record["inode"] = self.columns["inode"][index]
+        for column in STRING_COLUMNS:
+            record[column] = self.string(self.columns[column][index])
+        flags = self.columns["flags"][index]
+        for name, bit in FLAG_BITS.items():
+            record[name] = bool(flags & bit)
+        return record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over decoded records."""
+        return (self[index] for index in range(self.length))
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Decode every record into a list."""
+        return list(self)
+
+    def close(self) -> None:
+        """Release the column views and unmap the file."""
+        for column in getattr(self, "columns", {}).values():
+            column.release()
+        if hasattr(self, "_string_offsets"):
+            self._string_offsets.release()
+        self.columns = {}
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "ScanResultFile":
+        """Enter a with block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the file when leaving a with block."""
+        self.close()
+
+
+def load_scan_results(result_path: str = DEFAULT_RESULT_PATH) -> List[Dict[str, Any]]:
+    """
+    Load every record of a result file.
+
+    Args:
+        result_path (str): File written by write_scan_results.
+
+    Returns:
+        List[Dict]: The records in the scan_for_artifacts format.
+
+    Raises:
+        ValueError: If the file is not a valid result file.
+        OSError: If the file cannot be opened.
+    """
+    with ScanResultFile(result_path) as result_file:
+        return result_file.records()
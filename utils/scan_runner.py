@@ -0,0 +1,114 @@
+"""
+Utility module choosing how to answer a scan request.
+
+A scan can be answered by a concurrent multi-root scan, a running
+inventory service, a live watcher, a resumable checkpointed scan or a
+plain scan. ScanRunner keeps the state that outlives one scan (the live
+watcher) so front ends only pass the user's settings.
+"""
+import os
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from utils.venv_scanner import scan_for_artifacts
+from utils.scan_checkpoint import ScanSession
+from utils.venv_watcher import VenvWatcher
+from utils.inventory_service import query_inventory
+from utils.multi_root_scanner import scan_multiple_roots
+from utils.scan_progress import ScanProgress
+
+
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".venv_remover", "journals")
+
+
+class ScanRunner:
+    """Runs scans for a front end, reusing a live watcher between scans."""
+
+    def __init__(self, journal_dir: str = DEFAULT_JOURNAL_DIR):
+        """
+        Create a runner.
+
+        Args:
+            journal_dir (str): Folder for resumable scan journals.
+        """
+        self.journal_dir = journal_dir
+        self.watcher: Optional[VenvWatcher] = None
+        self.watcher_key: Optional[Tuple] = None
+
+    def run(self, root_dir: str, days_unused: int = 60, min_size_mb: int = 200,
+            artifact_types: Optional[Tuple[str, ...]] = ("venv",), estimate_sizes: bool = False,
+            policy: Optional[str] = None, resumable: bool = False, watch: bool = False,
+            on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+            size_mode: str = "walk",
+            progress: Optional[ScanProgress] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Answer a scan request with the cheapest available source.
+
+        Args:
+            root_dir (str): Root directory, or several separated by os.pathsep.
+            days_unused (int): Minimum age in days for deletion criteria.
+            min_size_mb (int): Minimum size in MB for deletion criteria.
+            artifact_types (Optional[Tuple[str, ...]]): Artifact types to
+                detect; None means all types.
+            estimate_sizes (bool): If True, report sampled size estimates.
+            policy (Optional[str]): Policy text deciding meets_criteria.
+            resumable (bool): If True, checkpoint the scan so an interrupted
+                scan of the same root resumes.
+            watch (bool): If True, keep a live watcher and answer from it.
+            on_result (Optional[Callable[[Dict], None]]): Called with each
+                record of a plain scan as soon as it is measured.
+            size_mode (str): "walk", "inode" or "record" sizing for a plain scan,
+                see get_folder_size.
+            progress (Optional[ScanProgress]): Progress of a plain scan.
+
+        Returns:
+            Tuple[List[Dict], bool]: The records and whether their sizes are
+                estimates that still need refining.
+
+        Raises:
+            ValueError: If a root is invalid or an argument is malformed.
+        """
+        root_dirs = [path.strip() for path in root_dir.split(os.pathsep) if path.strip()]
+        if len(root_dirs) > 1:
+            # Several volumes are scanned concurrently, one thread pool per device
+            return scan_multiple_roots(root_dirs, days_unused, min_size_mb, artifact_types, estimate_sizes, policy), estimate_sizes
+        if watch:
+            return self._get_watcher(root_dir, days_unused, min_size_mb, artifact_types, policy).inventory(), False
+
+        shared_list = query_inventory(root_dir, days_unused, min_size_mb, artifact_types, policy)
+        if shared_list is not None:
+            # A running inventory service already covers this root
+            return shared_list, False
+        if resumable:
+            return self._run_resumable(root_dir, days_unused, min_size_mb, artifact_types, estimate_sizes, policy), estimate_sizes
+        return scan_for_artifacts(root_dir, days_unused, min_size_mb, artifact_types, estimate_sizes, policy,
+                                  on_result=on_result, size_mode=size_mode, progress=progress), estimate_sizes
+
+    def _run_resumable(self, root_dir: str, days_unused: int, min_size_mb: int,
+                       artifact_types: Optional[Tuple[str, ...]], estimate_sizes: bool,
+                       policy: Optional[str]) -> List[Dict[str, Any]]:
+        """Run a checkpointed scan, resuming an interrupted one for the same root."""
+        scan_key = hashlib.sha1(f"{os.path.abspath(root_dir)}|{artifact_types}".encode("utf-8")).hexdigest()[:16]
+        journal_path = os.path.join(self.journal_dir, f"{scan_key}.jsonl")
+        session = ScanSession(root_dir, journal_path, days_unused, min_size_mb, artifact_types, estimate_sizes, policy)
+        results = session.run(resume=True)
+        # Only interrupted scans are resumed; the next scan after a completed one starts fresh.
+        os.remove(journal_path)
+        return results
+
+    def _get_watcher(self, root_dir: str, days_unused: int, min_size_mb: int,
+                     artifact_types: Optional[Tuple[str, ...]], policy: Optional[str]) -> VenvWatcher:
+        """Return the live watcher for these settings, starting a new one when they changed."""
+        watcher_key = (os.path.abspath(root_dir), days_unused, min_size_mb, artifact_types, policy)
+        if self.watcher is None or self.watcher_key != watcher_key:
+            self.stop()
+            self.watcher = VenvWatcher(root_dir, days_unused, min_size_mb, artifact_types, policy)
+            self.watcher_key = watcher_key
+            self.watcher.start()
+        return self.watcher
+
+    def stop(self) -> None:
+        """Stop the live watcher, if any."""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.watcher_key = None
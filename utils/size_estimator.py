@@ -0,0 +1,198 @@
+"""
+Utility module for fast, sampled size estimation of venv folders.
+
+The top of the tree (the venv root, lib, site-packages and the first
+package folders) is listed breadth-first up to a budget of directories and
+its files are measured exactly. The subtrees left unlisted are treated as
+clusters: a random sample of them is walked completely and the total is
+extrapolated from the sampled subtree sizes, with a confidence interval.
+Only the listed directories and the sampled subtrees are ever read, so a
+venv with thousands of package folders costs a fixed number of listings.
+Large compiled extensions usually sit in site-packages or one level below,
+inside the exactly measured part, which keeps the interval tight.
+"""
+import os
+import math
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+
+DEFAULT_LISTED_DIRS = 64
+DEFAULT_SAMPLE_SIZE = 32
+# z-score for a 95% confidence interval
+DEFAULT_CONFIDENCE_Z = 1.96
+
+
+def _list_dir(dir_path: str, subdirs: List[str]) -> Tuple[int, int]:
+    """
+    List one folder, measuring its files and collecting its subfolders.
+
+    Args:
+        dir_path (str): Folder to list.
+        subdirs (List[str]): Receives the paths of subfolders (not symlinks).
+
+    Returns:
+        Tuple[int, int]: (bytes, file count) of the files in the folder;
+            (0, 0) if it can't be listed.
+    """
+    total = 0
+    files = 0
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                        files += 1
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return total, files
+
+
+def _walk_subtree(dir_path: str) -> Tuple[int, int, int]:
+    """
+    Measure a whole subtree.
+
+    Args:
+        dir_path (str): Root of the subtree.
+
+    Returns:
+        Tuple[int, int, int]: (bytes, file count, folders listed)
+    """
+    total = 0
+    files = 0
+    listed = 0
+    pending = [dir_path]
+    while pending:
+        dir_bytes, dir_files = _list_dir(pending.pop(), pending)
+        total += dir_bytes
+        files += dir_files
+        listed += 1
+    return total, files, listed
+
+
+def estimate_folder_size(folder_path: str, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                         confidence_z: float = DEFAULT_CONFIDENCE_Z,
+                         seed: Optional[int] = None,
+                         max_listed_dirs: int = DEFAULT_LISTED_DIRS) -> Dict[str, Any]:
+    """
+    Estimate the size of a folder by sampling its subtrees.
+
+    Args:
+        folder_path (str): Path to the folder to measure.
+        sample_size (int): Number of unlisted subtrees to walk completely.
+        confidence_z (float): z-score of the confidence interval.
+        seed (Optional[int]): Random seed, for reproducible estimates.
+        max_listed_dirs (int): Folders listed breadth-first from the top
+            before the remaining subtrees are sampled.
+
+    Returns:
+        Dict containing:
+            - size_mb: Estimated size in MB
+            - lower_mb: Lower bound of the confidence interval in MB
+            - upper_mb: Upper bound of the confidence interval in MB
+            - file_count: Number of files (estimated unless exact)
+            - sampled: Number of files stat'ed
+            - dirs_listed: Number of folders listed
+            - exact: True if every folder was listed
+
+    Raises:
+        ValueError: If sample_size or max_listed_dirs is not positive.
+    """
+    if sample_size <= 0:
+        raise ValueError("sample_size must be positive")
+    if max_listed_dirs <= 0:
+        raise ValueError("max_listed_dirs must be positive")
+
+    exact_bytes = 0
+    exact_files = 0
+    listed = 0
+    pending: deque = deque([folder_path])
+    while pending and listed < max_listed_dirs:
+        subdirs: List[str] = []
+        dir_bytes, dir_files = _list_dir(pending.popleft(), subdirs)
+        pending.extend(subdirs)
+        exact_bytes += dir_bytes
+        exact_files += dir_files
+        listed += 1
+
+    frontier = list(pending)
+    population = len(frontier)
+    exact = population <= sample_size
+    sample = frontier if exact else random.Random(seed).sample(frontier, sample_size)
+    subtrees = []
+    for dir_path in sample:
+        subtree_bytes, subtree_files, subtree_dirs = _walk_subtree(dir_path)
+        subtrees.append((subtree_bytes, subtree_files))
+        listed += subtree_dirs
+    sampled_files = exact_files + sum(files for _, files in subtrees)
+
+    estimate = 0.0
+    estimated_files = 0.0
+    margin = 0.0
+    if subtrees:
+        count = len(subtrees)
+        mean = sum(size for size, _ in subtrees) / count
+        estimate = population * mean
+        estimated_files = population * sum(files for _, files in subtrees) / count
+        if not exact and count >= 2:
+            variance = sum((size - mean) ** 2 for size, _ in subtrees) / (count - 1)
+            finite_population = (population - count) / (population - 1)
+            margin = confidence_z * population * math.sqrt(variance / count * finite_population)
+
+    to_mb = 1024 * 1024
+    return {
+        "size_mb": (exact_bytes + estimate) / to_mb,
+        "lower_mb": (exact_bytes + max(estimate - margin, 0.0)) / to_mb,
+        "upper_mb": (exact_bytes + estimate + margin) / to_mb,
+        "file_count": exact_files + round(estimated_files),
+        "sampled": sampled_files,
+        "dirs_listed": listed,
+        "exact": exact
+    }
+
+
+def refine_sizes_in_background(venv_list: List[Dict[str, Any]], on_refined: Callable[[int, float], None],
+                               size_func: Callable[[str], float], max_workers: int = 2,
+                               stop_event: Optional[threading.Event] = None) -> threading.Thread:
+    """
+    Compute exact sizes for estimated venvs in a background thread.
+
+    Args:
+        venv_list (List[Dict]): Venv information dictionaries; entries whose
+            size_exact is False are refined.
+        on_refined (Callable[[int, float], None]): Called with (index, size_mb)
+            from a worker thread as each exact size arrives.
+        size_func (Callable[[str], float]): Exact sizing function, e.g.
+            get_folder_size.
+        max_workers (int): Number of venvs measured concurrently.
+        stop_event (Optional[threading.Event]): Set to stop refining early.
+
+    Returns:
+        threading.Thread: The started daemon thread.
+    """
+    pending = [index for index, info in enumerate(venv_list) if not info.get("size_exact", True)]
+
+    def _refine(index: int) -> None:
+        if stop_event is not None and stop_event.is_set():
+            return
+        try:
+            size_mb = size_func(venv_list[index]["venv_path"])
+        except OSError:
+            return
+        on_refined(index, size_mb)
+
+    def _run() -> None:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_refine, pending))
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    return thread
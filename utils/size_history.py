@@ -0,0 +1,505 @@
+"""
+Utility module for an append-only history of venv sizes.
+
+Every scan appends one frame of (venv, size, age) samples. Venv paths are
+interned once in paths.txt and frames refer to them by id. Frames are
+grouped in monthly segment files; each segment starts with a keyframe of
+absolute values and every keyframe_interval frames another keyframe is
+written, while the frames in between store zlib-compressed arrays of
+deltas against the previous frame. Frame headers carry the frame's total
+size, so disk growth is read from headers alone, and a query such as
+top_growers() decodes at most two short runs of frames.
+
+downsample() thins old history: frames older than 30 days are reduced to
+one per day and frames older than 180 days to one per week.
+"""
+import os
+import sys
+import zlib
+import time
+import struct
+from array import array
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Tuple
+
+
+DEFAULT_HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".venv_remover", "history")
+DEFAULT_KEYFRAME_INTERVAL = 8
+FRAME_MAGIC = b"VRHF"
+_FRAME_HEADER = struct.Struct("<4sdBIqI")
+_DAY_SECONDS = 24 * 60 * 60
+
+# Decoded frame state: path id -> (size in KB, age in tenths of a day)
+FrameState = Dict[int, Tuple[int, int]]
+
+
+def _to_bytes(values: List[int]) -> bytes:
+    """Encode integers as a little-endian int64 array."""
+    column = array("q", values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_bytes(data: bytes) -> array:
+    """Decode a little-endian int64 array."""
+    column = array("q")
+    column.frombytes(data)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+
+def _encode_frame(state: FrameState, previous: Optional[FrameState]) -> bytes:
+    """
+    Encode a frame as sorted id gaps plus absolute values or deltas.
+
+    Args:
+        state (FrameState): Samples of this frame.
+        previous (Optional[FrameState]): Samples of the previous frame, or
+            None to write a keyframe.
+
+    Returns:
+        bytes: The zlib-compressed payload.
+    """
+    ids = sorted(state)
+    gaps = [current - prior for current, prior in zip(ids, [0] + ids[:-1])]
+    if previous is None:
+        sizes = [state[path_id][0] for path_id in ids]
+        ages = [state[path_id][1] for path_id in ids]
+    else:
+        sizes = [state[path_id][0] - previous.get(path_id, (0, 0))[0] for path_id in ids]
+        ages = [state[path_id][1] - previous.get(path_id, (0, 0))[1] for path_id in ids]
+    return zlib.compress(_to_bytes(gaps) + _to_bytes(sizes) + _to_bytes(ages), 6)
+
+
+def _decode_frame(payload: bytes, count: int, previous: Optional[FrameState]) -> FrameState:
+    """
+    Decode a frame payload.
+
+    Args:
+        payload (bytes): Payload written by _encode_frame.
+        count (int): Number of samples in the frame.
+        previous (Optional[FrameState]): State of the previous frame, or None
+            for a keyframe.
+
+    Returns:
+        FrameState: Absolute samples of the frame.
+    """
+    values = _from_bytes(zlib.decompress(payload))
+    ids = list(accumulate(values[:count]))
+    sizes = values[count:2 * count]
+    ages = values[2 * count:3 * count]
+    if previous is None:
+        return dict(zip(ids, zip(sizes, ages)))
+    state = {}
+    for path_id, size_delta, age_delta in zip(ids, sizes, ages):
+        prior_size, prior_age = previous.get(path_id, (0, 0))
+        state[path_id] = (prior_size + size_delta, prior_age + age_delta)
+    return state
+
+
+class SizeHistory:
+    """
+    Append-only size history stored in a directory.
+
+    Frames are indexed by reading their headers only; payloads are read and
+    decoded on demand. Open with read_only=True to query a history another
+    process may be appending to: a frame being written is then skipped
+    rather than cut off.
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_HISTORY_DIR, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+                 read_only: bool = False):
+        """
+        Open or create a history store.
+
+        Args:
+            store_dir (str): Folder holding paths.txt and the segment files.
+            keyframe_interval (int): Frames between keyframes.
+            read_only (bool): Only query the store; nothing is created,
+                truncated or written.
+
+        Raises:
+            ValueError: If keyframe_interval is not positive.
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.store_dir = store_dir
+        self.keyframe_interval = keyframe_interval
+        self.read_only = read_only
+        if not read_only:
+            os.makedirs(store_dir, exist_ok=True)
+
+        self._paths_file = os.path.join(store_dir, "paths.txt")
+        self.paths: List[str] = []
+        if os.path.exists(self._paths_file):
+            with open(self._paths_file, encoding="utf-8") as f:
+                self.paths = f.read().splitlines()
+        self._path_ids = {path: path_id for path_id, path in enumerate(self.paths)}
+        self._frames = self._index_frames()
+        self._last_state: Optional[FrameState] = None
+
+    def _segment_files(self) -> List[str]:
+        """Return the segment files in time order."""
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(
+            os.path.join(self.store_dir, name) for name in os.listdir(self.store_dir)
+            if name.startswith("seg-") and name.endswith(".bin")
+        )
+
+    def _index_frames(self) -> List[Dict[str, Any]]:
+        """
+        Read every frame header. A torn frame at the end of a segment, left
+        by an interrupted write, is cut off unless the store is read-only,
+        where it may be a frame another process is still appending.
+
+        Returns:
+            List[Dict]: Frames in time order with timestamp, keyframe, count,
+                total_kb, segment, offset and length.
+        """
+        frames = []
+        for segment in self._segment_files():
+            valid_end = 0
+            with open(segment, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                while valid_end + _FRAME_HEADER.size <= size:
+                    f.seek(valid_end)
+                    magic, timestamp, keyframe, count, total_kb, length = _FRAME_HEADER.unpack(f.read(_FRAME_HEADER.size))
+                    payload_offset = valid_end + _FRAME_HEADER.size
+                    if magic != FRAME_MAGIC or payload_offset + length > size:
+                        break
+                    frames.append({
+                        "timestamp": timestamp, "keyframe": bool(keyframe), "count": count,
+                        "total_kb": total_kb, "segment": segment, "offset": payload_offset, "length": length
+                    })
+                    valid_end = payload_offset + length
+            if valid_end < size and not self.read_only:
+                with open(segment, "r+b") as f:
+                    f.truncate(valid_end)
+        return frames
+
+    def _check_writable(self) -> None:
+        """Raise ValueError if the store was opened read-only."""
+        if self.read_only:
+            raise ValueError(f"Size history {self.store_dir} was opened read-only")
+
+    def _path_id(self, path: str, new_paths: List[str]) -> int:
+        """Intern a path, collecting paths not yet in paths.txt."""
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            path_id = self._path_ids[path] = len(self.paths)
+            self.paths.append(path)
+            new_paths.append(path)
+        return path_id
+
+    def _state_at(self, frame_index: int) -> FrameState:
+        """
+        Decode the frame at an index by replaying from its keyframe.
+
+        Args:
+            frame_index (int): Index into the frame list.
+
+        Returns:
+            FrameState: Absolute samples of the frame.
+        """
+        start = frame_index
+        while not self._frames[start]["keyframe"]:
+            start -= 1
+        state: Optional[FrameState] = None
+        for frame in self._frames[start:frame_index + 1]:
+            with open(frame["segment"], "rb") as f:
+                f.seek(frame["offset"])
+                payload = f.read(frame["length"])
+            state = _decode_frame(payload, frame["count"], None if frame["keyframe"] else state)
+        return state
+
+    def record_scan(self, venv_list: List[Dict[str, Any]], timestamp: Optional[float] = None) -> int:
+        """
+        Append the sizes and ages of one scan.
+
+        Args:
+            venv_list (List[Dict]): Scan results with venv_path, size_mb and age_days.
+            timestamp (Optional[float]): Scan time, defaults to now; must not
+                be older than the last recorded frame.
+
+        Returns:
+            int: Number of samples recorded.
+
+        Raises:
+            ValueError: If timestamp is older than the last frame or the
+                store is read-only.
+        """
+        self._check_writable()
+        timestamp = time.time() if timestamp is None else timestamp
+        if self._frames and timestamp < self._frames[-1]["timestamp"]:
+            raise ValueError("Frames must be recorded in time order")
+
+        new_paths: List[str] = []
+        state: FrameState = {}
+        for venv_info in venv_list:
+            path_id = self._path_id(venv_info["venv_path"], new_paths)
+            state[path_id] = (int(round(venv_info.get("size_mb", 0.0) * 1024)),
+                              int(round(venv_info.get("age_days", 0.0) * 10)))
+        if new_paths:
+            with open(self._paths_file, "a", encoding="utf-8") as f:
+                f.write("".join(f"{path}\n" for path in new_paths))
+
+        segment = os.path.join(self.store_dir, datetime.fromtimestamp(timestamp, timezone.utc).strftime("seg-%Y%m.bin"))
+        since_keyframe = 0
+        for frame in reversed(self._frames):
+            if frame["segment"] != segment:
+                since_keyframe = self.keyframe_interval
+            since_keyframe += 1
+            if frame["keyframe"] or since_keyframe >= self.keyframe_interval:
+                break
+        # Segments start with a keyframe so each one decodes on its own
+        keyframe = not self._frames or since_keyframe >= self.keyframe_interval
+        if not keyframe and self._last_state is None:
+            self._last_state = self._state_at(len(self._frames) - 1)
+        payload = _encode_frame(state, None if keyframe else self._last_state)
+        total_kb = sum(size_kb for size_kb, _ in state.values())
+
+        with open(segment, "ab") as f:
+            offset = f.tell() + _FRAME_HEADER.size
+            f.write(_FRAME_HEADER.pack(FRAME_MAGIC, timestamp, keyframe, len(state), total_kb, len(payload)) + payload)
+        self._frames.append({
+            "timestamp": timestamp, "keyframe": keyframe, "count": len(state),
+            "total_kb": total_kb, "segment": segment, "offset": offset, "length": len(payload)
+        })
+        self._last_state = state
+        return len(state)
+
+    def frame_times(self) -> List[float]:
+        """Return the timestamps of all recorded frames."""
+        return [frame["timestamp"] for frame in self._frames]
+
+    def total_series(self) -> List[Tuple[float, float, int]]:
+        """
+        Return the total size of every scan, read from frame headers only.
+
+        Returns:
+            List[Tuple[float, float, int]]: (timestamp, total_mb, venv_count).
+        """
+        return [(frame["timestamp"], frame["total_kb"] / 1024, frame["count"]) for frame in self._frames]
+
+    def snapshot_at(self, timestamp: float) -> Dict[str, Tuple[float, float]]:
+        """
+        Return the samples of the last scan at or before a time.
+
+        Args:
+            timestamp (float): Point in time.
+
+        Returns:
+            Dict[str, Tuple[float, float]]: venv_path -> (size_mb, age_days);
+                empty if nothing was recorded by then.
+        """
+        index = self._frame_index_at(timestamp)
+        if index is None:
+            return {}
+        return {self.paths[path_id]: (size_kb / 1024, age / 10) for path_id, (size_kb, age) in self._state_at(index).items()}
+
+    def _frame_index_at(self, timestamp: float) -> Optional[int]:
+        """Return the index of the last frame at or before a time."""
+        index = None
+        for frame_index, frame in enumerate(self._frames):
+            if frame["timestamp"] > timestamp:
+                break
+            index = frame_index
+        return index
+
+    def series(self, venv_path: str) -> List[Tuple[float, float, float]]:
+        """
+        Return the full history of one venv.
+
+        Args:
+            venv_path (str): Path of the venv.
+
+        Returns:
+            List[Tuple[float, float, float]]: (timestamp, size_mb, age_days)
+                for every scan that saw the venv.
+        """
+        path_id = self._path_ids.get(venv_path)
+        if path_id is None:
+            return []
+        points = []
+        state: Optional[FrameState] = None
+        for frame in self._frames:
+            with open(frame["segment"], "rb") as f:
+                f.seek(frame["offset"])
+                payload = f.read(frame["length"])
+            state = _decode_frame(payload, frame["count"], None if frame["keyframe"] else state)
+            if path_id in state:
+                size_kb, age = state[path_id]
+                points.append((frame["timestamp"], size_kb / 1024, age / 10))
+        return points
+
+    def top_growers(self, days: float = 30, limit: int = 20, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Rank venvs by size growth over a period.
+
+        Compares the latest scan with the first scan inside the period. A
+        venv that first appears inside the period grows from zero.
+
+        Args:
+            days (float): Length of the period in days.
+            limit (int): Maximum number of venvs returned.
+            now (Optional[float]): End of the period, defaults to now.
+
+        Returns:
+            List[Dict]: Each with venv_path, start_mb, end_mb, growth_mb and
+                growth_mb_per_day, largest growth first.
+        """
+        now = time.time() if now is None else now
+        end_index = self._frame_index_at(now)
+        if end_index is None:
+            return []
+        start_index = end_index
+        while start_index > 0 and self._frames[start_index - 1]["timestamp"] >= now - days * _DAY_SECONDS:
+            start_index -= 1
+        start_state = self._state_at(start_index)
+        end_state = self._state_at(end_index)
+        elapsed_days = max((self._frames[end_index]["timestamp"] - self._frames[start_index]["timestamp"]) / _DAY_SECONDS, 1e-9)
+
+        growers = []
+        for path_id, (end_kb, _) in end_state.items():
+            start_kb = start_state.get(path_id, (0, 0))[0]
+            growth_mb = (end_kb - start_kb) / 1024
+            if growth_mb > 0:
+                growers.append({
+                    "venv_path": self.paths[path_id],
+                    "start_mb": start_kb / 1024,
+                    "end_mb": end_kb / 1024,
+                    "growth_mb": growth_mb,
+                    "growth_mb_per_day": growth_mb / elapsed_days
+                })
+        growers.sort(key=lambda grower: grower["growth_mb"], reverse=True)
+        return growers[:limit]
+
+    def downsample(self, now: Optional[float] = None, daily_after_days: float = 30,
+                   weekly_after_days: float = 180) -> int:
+        """
+        Thin old frames: one per day after daily_after_days and one per week
+        after weekly_after_days. The last frame of each day or week is kept.
+
+        Args:
+            now (Optional[float]): Reference time, defaults to now.
+            daily_after_days (float): Age after which one frame per day is kept.
+            weekly_after_days (float): Age after which one frame per week is kept.
+
+        Returns:
+            int: Number of frames removed.
+
+        Raises:
+            ValueError: If the store is read-only.
+        """
+        self._check_writable()
+        now = time.time() if now is None else now
+        keep_bucket: Dict[Any, int] = {}
+        for index, frame in enumerate(self._frames):
+            age_days = (now - frame["timestamp"]) / _DAY_SECONDS
+            if age_days > weekly_after_days:
+                bucket: Any = ("week", int(frame["timestamp"] // (7 * _DAY_SECONDS)))
+            elif age_days > daily_after_days:
+                bucket = ("day", int(frame["timestamp"] // _DAY_SECONDS))
+            else:
+                bucket = ("frame", index)
+            keep_bucket[bucket] = index
+        kept = set(keep_bucket.values())
+        removed = len(self._frames) - len(kept)
+        if not removed:
+            return 0
+
+        for segment in {frame["segment"] for frame in self._frames}:
+            indexes = [index for index, frame in enumerate(self._frames) if frame["segment"] == segment]
+            if all(index in kept for index in indexes):
+                continue
+            self._rewrite_segment(segment, [index for index in indexes if index in kept])
+        self._frames = self._index_frames()
+        self._last_state = None
+        return removed
+
+    def _rewrite_segment(self, segment: str, kept_indexes: List[int]) -> None:
+        """Rewrite a segment with only some of its frames, re-encoding deltas."""
+        temp_path = f"{segment}.tmp{os.getpid()}"
+        with open(temp_path, "wb") as f:
+            previous: Optional[FrameState] = None
+            for position, index in enumerate(kept_indexes):
+                frame = self._frames[index]
+                state = self._state_at(index)
+                keyframe = position % self.keyframe_interval == 0
+                payload = _encode_frame(state, None if keyframe else previous)
+                f.write(_FRAME_HEADER.pack(FRAME_MAGIC, frame["timestamp"], keyframe, len(state),
+                                           frame["total_kb"], len(payload)) + payload)
+                previous = state
+        if kept_indexes:
+            os.replace(temp_path, segment)
+        else:
+            os.remove(temp_path)
+            os.remove(segment)
+
+
+def record_scan_history(venv_list: List[Dict[str, Any]], store_dir: str = DEFAULT_HISTORY_DIR) -> Tuple[bool, str]:
+    """
+    Append a scan to the history and thin out old frames.
+
+    Args:
+        venv_list (List[Dict]): Scan results with exact sizes.
+        store_dir (str): History folder.
+
+    Returns:
+        Tuple[bool, str]: (success_status, message)
+    """
+    try:
+        history = SizeHistory(store_dir)
+        recorded = history.record_scan(venv_list)
+        history.downsample()
+    except (OSError, ValueError, zlib.error) as e:
+        return False, f"Error recording size history: {str(e)}"
+    return True, f"Recorded {recorded} sizes in {store_dir}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point for querying the size history.
+
+    Usage:
+        python -m utils.size_history top-growers [--days N] [--limit N] [--store DIR]
+        python -m utils.size_history totals [--store DIR]
+        python -m utils.size_history downsample [--store DIR]
+
+    Args:
+        argv (Optional[List[str]]): Arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the venv size history.")
+    parser.add_argument("--store", default=DEFAULT_HISTORY_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    growers_parser = subparsers.add_parser("top-growers", help="Venvs that grew the most")
+    growers_parser.add_argument("--days", type=float, default=30)
+    growers_parser.add_argument("--limit", type=int, default=20)
+    subparsers.add_parser("totals", help="Total size of every scan")
+    subparsers.add_parser("downsample", help="Thin out old history")
+    args = parser.parse_args(argv)
+
+    # Queries must not truncate a frame the GUI may be appending
+    history = SizeHistory(args.store, read_only=args.command != "downsample")
+    if args.command == "top-growers":
+        for grower in history.top_growers(args.days, args.limit):
+            print(f"{grower['venv_path']}\t+{grower['growth_mb']:.1f} MB\t{grower['growth_mb_per_day']:.2f} MB/day")
+    elif args.command == "totals":
+        for timestamp, total_mb, count in history.total_series():
+            print(f"{datetime.fromtimestamp(timestamp).isoformat(timespec='minutes')}\t{total_mb:.1f} MB\t{count} venvs")
+    else:
+        print(f"Removed {history.downsample()} frames")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+"""
+Utility module caching requirements snapshots by site-packages state.
+
+pip freeze starts an interpreter per venv, so repeated snapshots of the same
+venvs (a dry run followed by the real run, or several deletion passes) are
+slow. The cache stores each venv's pip freeze output together with a cheap
+state token: the mtimes of its site-packages folders plus a hash of their
+*.dist-info / *.egg-info listing. Installing, upgrading or removing a
+package changes the token, so a stale snapshot is never returned.
+
+Entries live in one SQLite database and the least recently used ones are
+evicted once max_entries is exceeded.
+"""
+import os
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+from utils.venv_scanner import get_site_packages_dirs
+
+
+DEFAULT_SNAPSHOT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".venv_remover", "snapshots.db")
+DEFAULT_MAX_ENTRIES = 5000
+METADATA_SUFFIXES = (".dist-info", ".egg-info")
+# last_used is an access counter rather than a clock, so ties cannot occur
+_NEXT_USE = "(SELECT COALESCE(MAX(last_used), 0) + 1 FROM snapshots)"
+
+
+def site_packages_token(venv_path: str) -> Optional[str]:
+    """
+    Compute the state token of a venv's installed packages.
+
+    Args:
+        venv_path (str): Path to the venv folder.
+
+    Returns:
+        Optional[str]: Hex token, or None if the venv has no site-packages.
+    """
+    site_packages_dirs = get_site_packages_dirs(venv_path)
+    if not site_packages_dirs:
+        return None
+    digest = hashlib.sha1()
+    for site_packages in site_packages_dirs:
+        try:
+            mtime_ns = os.stat(site_packages).st_mtime_ns
+            names = sorted(name for name in os.listdir(site_packages) if name.endswith(METADATA_SUFFIXES))
+        except OSError:
+            return None
+        digest.update(f"{site_packages}\0{mtime_ns}\0".encode("utf-8"))
+        digest.update("\0".join(names).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """
+    LRU cache of pip freeze output keyed by venv path and state token.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_SNAPSHOT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Open or create a snapshot cache.
+
+        Args:
+            db_path (str): SQLite database file, or ":memory:".
+            max_entries (int): Number of venvs kept before the least recently
+                used entries are evicted.
+
+        Raises:
+            ValueError: If max_entries is not positive.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots "
+                "(venv_path TEXT PRIMARY KEY, token TEXT, content TEXT, last_used INTEGER)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS snapshots_last_used ON snapshots (last_used)")
+
+    def get(self, venv_path: str, token: Optional[str] = None) -> Optional[str]:
+        """
+        Return the cached snapshot of a venv if its packages did not change.
+
+        Args:
+            venv_path (str): Path to the venv folder.
+            token (Optional[str]): Precomputed site_packages_token.
+
+        Returns:
+            Optional[str]: The pip freeze output, or None on a miss.
+        """
+        token = token or site_packages_token(venv_path)
+        key = os.path.abspath(venv_path)
+        with self._lock:
+            row = None
+            if token is not None:
+                row = self._connection.execute(
+                    "SELECT content FROM snapshots WHERE venv_path = ? AND token = ?", (key, token)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._connection:
+                self._connection.execute(f"UPDATE snapshots SET last_used = {_NEXT_USE} WHERE venv_path = ?", (key,))
+            self.hits += 1
+            return row[0]
+
+    def put(self, venv_path: str, content: str, token: Optional[str] = None) -> bool:
+        """
+        Store the snapshot of a venv, evicting old entries if the cache is full.
+
+        Args:
+            venv_path (str): Path to the venv folder.
+            content (str): The pip freeze output.
+            token (Optional[str]): Token computed before the snapshot was
+                taken; computing it first means a change made while pip
+                freeze runs invalidates the entry instead of hiding it.
+
+        Returns:
+            bool: False if the venv has no site-packages and was not cached.
+        """
+        token = token or site_packages_token(venv_path)
+        if token is None:
+            return False
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO snapshots (venv_path, token, content, last_used) VALUES (?, ?, ?, {_NEXT_USE})",
+                (os.path.abspath(venv_path), token, content)
+            )
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM snapshots WHERE venv_path IN "
+                    "(SELECT venv_path FROM snapshots ORDER BY last_used LIMIT ?)", (excess,)
+                )
+                self.evictions += excess
+        return True
+
+    def __len__(self) -> int:
+        """Return the number of cached venvs."""
+        return self._connection.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
@@ -0,0 +1,585 @@
+"""
+Utility module for archiving virtual environments into a compressed,
+content-addressed chunk store and restoring them.
+
+Files are split into fixed-size chunks named by their SHA-256 digest, so
+identical files across venvs (and across repeated archives of the same venv)
+are stored only once. Chunks are compressed with zstd when the optional
+`zstandard` package is installed, otherwise with lzma from the standard library.
+
+Chunks, manifests and their folders are fsynced before an archive is
+reported as written, and verify_archive reads every chunk back and checks
+its SHA-256, so a venv is only deleted once its archive is known to be
+complete. Restores check each chunk's digest as well.
+"""
+import os
+import json
+import stat
+import time
+import lzma
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Any, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+CHUNK_SIZE = 4 * 1024 * 1024
+MANIFEST_VERSION = 1
+LZMA_PRESET = 3
+ZSTD_LEVEL = 3
+_DECOMPRESS_ERRORS = (lzma.LZMAError, ValueError) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def get_default_codec() -> str:
+    """
+    Get the compression codec used for new chunks.
+
+    Returns:
+        str: "zst" if zstandard is available, otherwise "xz".
+    """
+    return "zst" if zstandard is not None else "xz"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    """
+    Compress a chunk with the given codec.
+
+    Args:
+        data (bytes): Raw chunk data.
+        codec (str): "zst" or "xz".
+
+    Returns:
+        bytes: Compressed data.
+    """
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return lzma.compress(data, preset=LZMA_PRESET)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    """
+    Decompress a chunk written with the given codec.
+
+    Args:
+        data (bytes): Compressed chunk data.
+        codec (str): "zst" or "xz".
+
+    Returns:
+        bytes: Raw chunk data.
+
+    Raises:
+        RuntimeError: If the chunk needs zstandard and it is not installed.
+    """
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("Archive was written with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return lzma.decompress(data)
+
+
+def get_archive_id(venv_path: str) -> str:
+    """
+    Get the stable archive identifier for a venv path.
+
+    Args:
+        venv_path (str): Path to the venv folder.
+
+    Returns:
+        str: Identifier made of the project name and a hash of the full path.
+    """
+    abs_path = os.path.abspath(venv_path)
+    project_name = os.path.basename(os.path.dirname(abs_path)) or "venv"
+    path_hash = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:16]
+    return f"{project_name}-{path_hash}"
+
+
+def get_manifest_path(store_dir: str, venv_path: str) -> str:
+    """
+    Get the manifest file path for a venv in a chunk store.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+        venv_path (str): Path to the venv folder.
+
+    Returns:
+        str: Path of the manifest JSON file.
+    """
+    return os.path.join(store_dir, "manifests", f"{get_archive_id(venv_path)}.json")
+
+
+def _chunk_path(store_dir: str, chunk_id: str, codec: str) -> str:
+    """
+    Get the on-disk path of a chunk.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+        chunk_id (str): Hex SHA-256 of the raw chunk.
+        codec (str): Compression codec suffix.
+
+    Returns:
+        str: Path of the chunk file.
+    """
+    return os.path.join(store_dir, "chunks", chunk_id[:2], f"{chunk_id}.{codec}")
+
+
+def _fsync_dir(dir_path: str) -> None:
+    """
+    Flush a folder's entries (new and renamed files) to disk.
+
+    Args:
+        dir_path (str): Folder to flush. Windows cannot open folders, so
+            nothing is done there.
+    """
+    if os.name == "nt":
+        return
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_durable(path: str, data: bytes) -> None:
+    """
+    Write a file through a temp file, fsync it and rename it into place.
+
+    Args:
+        path (str): Final path of the file.
+        data (bytes): File content.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as out:
+            out.write(data)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _fsync_dir(os.path.dirname(path))
+
+
+def _read_chunk(store_dir: str, chunk_id: str, codec: str) -> bytes:
+    """
+    Read and decompress a chunk, checking its SHA-256.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+        chunk_id (str): Hex SHA-256 of the raw chunk.
+        codec (str): Compression codec of the chunk.
+
+    Returns:
+        bytes: Raw chunk data.
+
+    Raises:
+        OSError: If the chunk is missing or unreadable.
+        ValueError: If the chunk is corrupt.
+    """
+    with open(_chunk_path(store_dir, chunk_id, codec), "rb") as f:
+        compressed = f.read()
+    try:
+        data = _decompress(compressed, codec)
+    except _DECOMPRESS_ERRORS as e:
+        raise ValueError(f"Corrupt chunk {chunk_id}: {e}")
+    if hashlib.sha256(data).hexdigest() != chunk_id:
+        raise ValueError(f"Corrupt chunk {chunk_id}: digest mismatch")
+    return data
+
+
+def _load_manifest(manifest_path: str) -> Dict[str, Any]:
+    """
+    Read and sanity-check a manifest.
+
+    Args:
+        manifest_path (str): Path of the manifest JSON file.
+
+    Returns:
+        Dict: The manifest.
+
+    Raises:
+        OSError: If the manifest cannot be read.
+        ValueError: If the manifest is malformed.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        try:
+            manifest = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"Malformed manifest {manifest_path}: {e}")
+    if (not isinstance(manifest, dict) or not isinstance(manifest.get("entries"), list)
+            or manifest.get("codec") not in ("zst", "xz")
+            or not all(isinstance(entry, dict) and "path" in entry and "type" in entry
+                       for entry in manifest["entries"])
+            or not all(isinstance(entry.get("chunks"), list)
+                       for entry in manifest["entries"] if entry["type"] == "file")):
+        raise ValueError(f"Malformed manifest {manifest_path}")
+    return manifest
+
+
+def _store_file(store_dir: str, file_path: str, codec: str) -> Tuple[List[str], int]:
+    """
+    Stream a file into the chunk store.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+        file_path (str): File to archive.
+        codec (str): Compression codec for new chunks.
+
+    Returns:
+        Tuple[List[str], int]: (chunk ids, compressed bytes newly written)
+    """
+    chunk_ids = []
+    bytes_written = 0
+    with open(file_path, "rb") as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            chunk_id = hashlib.sha256(data).hexdigest()
+            chunk_ids.append(chunk_id)
+            target = _chunk_path(store_dir, chunk_id, codec)
+            if os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            compressed = _compress(data, codec)
+            _write_durable(target, compressed)
+            bytes_written += len(compressed)
+    return chunk_ids, bytes_written
+
+
+def _collect_entries(venv_path: str) -> List[Dict[str, Any]]:
+    """
+    Collect manifest entries for every directory, file and symlink in a venv.
+
+    Args:
+        venv_path (str): Path to the venv folder.
+
+    Returns:
+        List[Dict]: Entries with relative path, type, mode, mtime and size.
+    """
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(venv_path):
+        for name in dirnames + filenames:
+            full_path = os.path.join(dirpath, name)
+            st = os.lstat(full_path)
+            entry = {
+                "path": os.path.relpath(full_path, venv_path).replace(os.sep, "/"),
+                "mode": stat.S_IMODE(st.st_mode),
+                "mtime": st.st_mtime
+            }
+            if stat.S_ISLNK(st.st_mode):
+                entry["type"] = "symlink"
+                entry["target"] = os.readlink(full_path)
+            elif stat.S_ISDIR(st.st_mode):
+                entry["type"] = "dir"
+            elif stat.S_ISREG(st.st_mode):
+                entry["type"] = "file"
+                entry["size"] = st.st_size
+            else:
+                continue
+            entries.append(entry)
+    return entries
+
+
+def archive_venv(venv_path: str, store_dir: str, max_workers: Optional[int] = None) -> Tuple[bool, str]:
+    """
+    Archive a virtual environment into a content-addressed chunk store.
+
+    Args:
+        venv_path (str): Path to the venv folder to archive.
+        store_dir (str): Root folder of the chunk store (created if missing).
+        max_workers (Optional[int]): Thread pool size for chunking files.
+
+    Returns:
+        Tuple[bool, str]: (success_status, message)
+
+    Raises:
+        ValueError: If venv_path or store_dir is empty.
+    """
+    if not venv_path or not venv_path.strip():
+        raise ValueError("venv_path cannot be empty")
+
+    if not store_dir or not store_dir.strip():
+        raise ValueError("store_dir cannot be empty")
+
+    if not os.path.isdir(venv_path):
+        return False, f"Venv path is not a directory: {venv_path}"
+
+    codec = get_default_codec()
+    try:
+        entries = _collect_entries(venv_path)
+        file_entries = [entry for entry in entries if entry["type"] == "file"]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            stored = executor.map(
+                lambda entry: _store_file(store_dir, os.path.join(venv_path, entry["path"]), codec),
+                file_entries
+            )
+            bytes_stored = 0
+            for entry, (chunk_ids, written) in zip(file_entries, stored):
+                entry["chunks"] = chunk_ids
+                bytes_stored += written
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "venv_path": os.path.abspath(venv_path),
+            "created": time.time(),
+            "codec": codec,
+            "entries": entries
+        }
+        manifest_path = get_manifest_path(store_dir, venv_path)
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        # Chunk folders created by this archive must be on disk before the
+        # manifest that refers to them
+        chunks_dir = os.path.join(store_dir, "chunks")
+        if os.path.isdir(chunks_dir):
+            _fsync_dir(chunks_dir)
+        _write_durable(manifest_path, json.dumps(manifest, separators=(",", ":")).encode("utf-8"))
+        _fsync_dir(store_dir)
+
+        bytes_in = sum(entry["size"] for entry in file_entries)
+        return True, (
+            f"Archived {venv_path} ({len(file_entries)} files, "
+            f"{bytes_in / (1024 * 1024):.1f} MB, {bytes_stored / (1024 * 1024):.1f} MB new in store)"
+        )
+    except Exception as e:
+        return False, f"Error archiving {venv_path}: {str(e)}"
+
+
+def verify_archive(store_dir: str, venv_path: str) -> Tuple[bool, str]:
+    """
+    Check that a venv's archive is complete by reading every chunk back.
+
+    The manifest must parse, every chunk it refers to must decompress to
+    data matching its SHA-256, and each file's chunks must add up to the
+    file's recorded size.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+        venv_path (str): Path of the archived venv.
+
+    Returns:
+        Tuple[bool, str]: (archive_ok, message)
+    """
+    manifest_path = get_manifest_path(store_dir, venv_path)
+    try:
+        manifest = _load_manifest(manifest_path)
+        codec = manifest["codec"]
+        chunk_sizes: Dict[str, int] = {}
+        file_count = 0
+        for entry in manifest["entries"]:
+            if entry["type"] != "file":
+                continue
+            file_count += 1
+            for chunk_id in entry["chunks"]:
+                if chunk_id not in chunk_sizes:
+                    chunk_sizes[chunk_id] = len(_read_chunk(store_dir, chunk_id, codec))
+            if sum(chunk_sizes[chunk_id] for chunk_id in entry["chunks"]) != entry.get("size"):
+                return False, f"Archive of {venv_path} is incomplete: size mismatch for {entry['path']}"
+    except (OSError, ValueError, RuntimeError) as e:
+        return False, f"Archive of {venv_path} failed verification: {str(e)}"
+    return True, f"Verified archive of {venv_path} ({file_count} files, {len(chunk_sizes)} chunks)"
+
+
+def _restore_file(store_dir: str, entry: Dict[str, Any], target_path: str, codec: str) -> None:
+    """
+    Rebuild one file from its chunks.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+        entry (Dict): Manifest entry of the file.
+        target_path (str): Root folder being restored.
+        codec (str): Compression codec of the chunks.
+    """
+    file_path = os.path.join(target_path, *entry["path"].split("/"))
+    with open(file_path, "wb") as out:
+        for chunk_id in entry["chunks"]:
+            out.write(_read_chunk(store_dir, chunk_id, codec))
+    os.chmod(file_path, entry["mode"])
+    os.utime(file_path, (entry["mtime"], entry["mtime"]))
+
+
+def restore_venv(store_dir: str, venv_path: str, target_path: Optional[str] = None,
+                 max_workers: Optional[int] = None) -> Tuple[bool, str]:
+    """
+    Restore an archived virtual environment from the chunk store.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+        venv_path (str): Original path of the archived venv.
+        target_path (Optional[str]): Where to restore; defaults to venv_path.
+        max_workers (Optional[int]): Thread pool size for rebuilding files.
+
+    Returns:
+        Tuple[bool, str]: (success_status, message)
+
+    Raises:
+        ValueError: If store_dir or venv_path is empty.
+    """
+    if not store_dir or not store_dir.strip():
+        raise ValueError("store_dir cannot be empty")
+
+    if not venv_path or not venv_path.strip():
+        raise ValueError("venv_path cannot be empty")
+
+    target_path = target_path or venv_path
+    manifest_path = get_manifest_path(store_dir, venv_path)
+    if not os.path.exists(manifest_path):
+        return False, f"No archive found for: {venv_path}"
+
+    try:
+        if os.path.exists(target_path) and os.listdir(target_path):
+            return False, f"Restore target is not empty: {target_path}"
+
+        manifest = _load_manifest(manifest_path)
+        codec = manifest["codec"]
+        entries = manifest["entries"]
+
+        os.makedirs(target_path, exist_ok=True)
+        dir_entries = [entry for entry in entries if entry["type"] == "dir"]
+        for entry in dir_entries:
+            os.makedirs(os.path.join(target_path, *entry["path"].split("/")), exist_ok=True)
+
+        file_entries = [entry for entry in entries if entry["type"] == "file"]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda entry: _restore_file(store_dir, entry, target_path, codec), file_entries))
+
+        for entry in entries:
+            if entry["type"] == "symlink":
+                os.symlink(entry["target"], os.path.join(target_path, *entry["path"].split("/")))
+
+        # Directory mtimes change while their children are written, so set them last.
+        for entry in reversed(dir_entries):
+            dir_path = os.path.join(target_path, *entry["path"].split("/"))
+            os.chmod(dir_path, entry["mode"])
+            os.utime(dir_path, (entry["mtime"], entry["mtime"]))
+
+        return True, f"Restored {len(file_entries)} files to {target_path}"
+    except Exception as e:
+        return False, f"Error restoring {venv_path}: {str(e)}"
+
+
+def list_archives(store_dir: str) -> List[Dict[str, Any]]:
+    """
+    List the venvs archived in a chunk store.
+
+    Args:
+        store_dir (str): Root folder of the chunk store.
+
+    Returns:
+        List[Dict]: Dictionaries with venv_path, created, codec and size_mb;
+            malformed manifests are skipped.
+    """
+    manifests_dir = os.path.join(store_dir, "manifests")
+    if not os.path.isdir(manifests_dir):
+        return []
+
+    archives = []
+    for name in sorted(os.listdir(manifests_dir)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            manifest = _load_manifest(os.path.join(manifests_dir, name))
+        except (OSError, ValueError):
+            # Skip manifests that are unreadable or were cut off mid-write
+            continue
+        archives.append({
+            "venv_path": manifest.get("venv_path", ""),
+            "created": manifest.get("created", 0),
+            "codec": manifest["codec"],
+            "size_mb": sum(entry.get("size", 0) for entry in manifest["entries"]) / (1024 * 1024)
+        })
+    return archives
+
+
+def archive_multiple_venvs(venv_paths: List[str], store_dir: str, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Archive multiple virtual environments into the same chunk store.
+
+    Args:
+        venv_paths (List[str]): List of venv folder paths to archive.
+        store_dir (str): Root folder of the chunk store.
+        max_workers (Optional[int]): Thread pool size used per venv.
+
+    Returns:
+        Dict containing:
+            - total: Total number of venvs attempted
+            - successful: Number of successful archives
+            - failed: Number of failed archives
+            - results: List of tuples (venv_path, success, message)
+    """
+    results = []
+    successful = 0
+    failed = 0
+
+    for venv_path in venv_paths:
+        success, message = archive_venv(venv_path, store_dir, max_workers)
+        results.append((venv_path, success, message))
+
+        if success:
+            successful += 1
+        else:
+            failed += 1
+
+    return {
+        "total": len(venv_paths),
+        "successful": successful,
+        "failed": failed,
+        "results": results
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point for archiving, restoring and listing venvs.
+
+    Usage:
+        python -m utils.venv_archiver archive STORE VENV [VENV ...]
+        python -m utils.venv_archiver restore STORE VENV [--target PATH]
+        python -m utils.venv_archiver list STORE
+
+    Args:
+        argv (Optional[List[str]]): Arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive and restore virtual environments.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    archive_parser = subparsers.add_parser("archive", help="Archive venvs into a chunk store")
+    archive_parser.add_argument("store")
+    archive_parser.add_argument("venvs", nargs="+")
+    restore_parser = subparsers.add_parser("restore", help="Restore an archived venv")
+    restore_parser.add_argument("store")
+    restore_parser.add_argument("venv")
+    restore_parser.add_argument("--target", default=None)
+    list_parser = subparsers.add_parser("list", help="List archived venvs")
+    list_parser.add_argument("store")
+    args = parser.parse_args(argv)
+
+    if args.command == "archive":
+        result = archive_multiple_venvs(args.venvs, args.store)
+        for _, _, message in result["results"]:
+            print(message)
+        return 0 if result["failed"] == 0 else 1
+
+    if args.command == "restore":
+        success, message = restore_venv(args.store, args.venv, args.target)
+        print(message)
+        return 0 if success else 1
+
+    for archive in list_archives(args.store):
+        print(f"{archive['venv_path']}\t{archive['size_mb']:.1f} MB\t{archive['codec']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
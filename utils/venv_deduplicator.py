@@ -0,0 +1,341 @@
+"""
+Utility module for deduplicating identical files across virtual environments.
+
+Instead of deleting a venv, byte-identical files (typically large wheels such
+as numpy, torch or scipy installed into many projects) are replaced with
+hardlinks or reflinks to a single copy, so every environment keeps working.
+"""
+import os
+import stat
+import mmap
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Any, Optional, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl and no FICLONE ioctl
+    fcntl = None
+
+
+PARTIAL_HASH_BYTES = 64 * 1024
+MIN_DEDUP_FILE_BYTES = 4 * 1024
+LINK_MODES = ("hardlink", "reflink", "auto")
+# ioctl request number for FICLONE (linux/fs.h), used for reflink copies.
+FICLONE = 0x40049409
+
+
+def _iter_candidate_files(venv_paths: List[str], min_file_bytes: int) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Yield regular files under the given venvs that are large enough to dedup.
+
+    Args:
+        venv_paths (List[str]): Venv folders to walk.
+        min_file_bytes (int): Files smaller than this are ignored.
+
+    Returns:
+        Iterator[Tuple[str, os.stat_result]]: (file_path, lstat result) pairs.
+    """
+    for venv_path in venv_paths:
+        for dirpath, dirnames, filenames in os.walk(venv_path):
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                try:
+                    st = os.lstat(file_path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode) and st.st_size >= min_file_bytes:
+                    yield file_path, st
+
+
+def _file_identity(st: os.stat_result) -> Tuple[int, int, int, int]:
+    """Return the (st_dev, st_ino, st_size, st_mtime_ns) a file must keep until it is linked."""
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _partial_hash(file_path: str, size: int) -> Optional[bytes]:
+    """
+    Hash the head and tail of a file as a cheap pre-filter.
+
+    Args:
+        file_path (str): File to hash.
+        size (int): Known size of the file in bytes.
+
+    Returns:
+        Optional[bytes]: Digest, or None if the file could not be read.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+            if size > 2 * PARTIAL_HASH_BYTES:
+                f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+                digest.update(f.read(PARTIAL_HASH_BYTES))
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _full_hash(file_path: str) -> Optional[bytes]:
+    """
+    Hash the full content of a file through a read-only memory map.
+
+    Args:
+        file_path (str): File to hash.
+
+    Returns:
+        Optional[bytes]: Digest, or None if the file could not be read.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).digest()
+    except (OSError, ValueError):
+        return None
+
+
+def _group_by_hash(groups: List[List[Tuple[str, os.stat_result]]], hash_func, executor: ThreadPoolExecutor) -> List[List[Tuple[str, os.stat_result]]]:
+    """
+    Split candidate groups further by a content hash computed in parallel.
+
+    Only one representative path per inode is hashed, since hardlinked paths
+    necessarily share content.
+
+    Args:
+        groups (List[List]): Groups of (file_path, stat) candidates.
+        hash_func (Callable): Function of (file_path, stat) returning a digest.
+        executor (ThreadPoolExecutor): Pool used for hashing.
+
+    Returns:
+        List[List]: Refined groups that still span more than one inode.
+    """
+    representatives = {}
+    for group in groups:
+        for file_path, st in group:
+            representatives.setdefault((st.st_dev, st.st_ino), (file_path, st))
+
+    keys = list(representatives)
+    digests = executor.map(lambda key: hash_func(*representatives[key]), keys)
+    inode_digest = dict(zip(keys, digests))
+
+    refined = []
+    for group in groups:
+        buckets: Dict[bytes, List[Tuple[str, os.stat_result]]] = {}
+        for file_path, st in group:
+            digest = inode_digest[(st.st_dev, st.st_ino)]
+            if digest is not None:
+                buckets.setdefault(digest, []).append((file_path, st))
+        for bucket in buckets.values():
+            if len({st.st_ino for _, st in bucket}) > 1:
+                refined.append(bucket)
+    return refined
+
+
+def find_duplicate_files(venv_paths: List[str], min_file_bytes: int = MIN_DEDUP_FILE_BYTES, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Find groups of byte-identical files across one or more venvs.
+
+    Candidates are grouped by (device, size, permission bits), narrowed by a
+    partial head/tail hash and confirmed with a full mmap-based hash.
+
+    Args:
+        venv_paths (List[str]): Venv folders to search.
+        min_file_bytes (int): Files smaller than this are ignored.
+        max_workers (Optional[int]): Thread pool size for hashing.
+
+    Returns:
+        List[Dict]: One dictionary per duplicate group containing:
+            - size: Size of each file in bytes
+            - paths: All paths in the group, first one is the link source,
+              followed by the paths already linked to it
+            - linked: Number of paths after the first that already share
+              its inode
+            - identities: Per path, (st_dev, st_ino, st_size, st_mtime_ns)
+              from the stat taken before hashing
+            - bytes_saved: Bytes reclaimable by linking the group
+    """
+    by_key: Dict[Tuple[int, int, int], List[Tuple[str, os.stat_result]]] = {}
+    for file_path, st in _iter_candidate_files(venv_paths, min_file_bytes):
+        key = (st.st_dev, st.st_size, stat.S_IMODE(st.st_mode))
+        by_key.setdefault(key, []).append((file_path, st))
+
+    groups = [group for group in by_key.values() if len({st.st_ino for _, st in group}) > 1]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        groups = _group_by_hash(groups, lambda path, st: _partial_hash(path, st.st_size), executor)
+        groups = _group_by_hash(groups, lambda path, st: _full_hash(path), executor)
+
+    duplicates = []
+    for group in groups:
+        size = group[0][1].st_size
+        seen_links: Dict[int, int] = {}
+        nlinks: Dict[int, int] = {}
+        for _, st in group:
+            seen_links[st.st_ino] = seen_links.get(st.st_ino, 0) + 1
+            nlinks[st.st_ino] = st.st_nlink
+        master_ino = group[0][1].st_ino
+        # Paths already linked to the source come right after it
+        group.sort(key=lambda item: item[1].st_ino != master_ino)
+        # An inode only frees its data once every link to it is replaced.
+        freed = sum(
+            size for ino, count in seen_links.items()
+            if ino != master_ino and count >= nlinks[ino]
+        )
+        duplicates.append({
+            "size": size,
+            "paths": [file_path for file_path, _ in group],
+            "linked": seen_links[master_ino] - 1,
+            "identities": [_file_identity(st) for _, st in group],
+            "bytes_saved": freed
+        })
+    return duplicates
+
+
+def _reflink(source_path: str, target_path: str) -> None:
+    """
+    Create target_path as a copy-on-write clone of source_path.
+
+    Args:
+        source_path (str): Existing file to clone.
+        target_path (str): New file to create.
+
+    Raises:
+        OSError: If the platform or filesystem does not support reflinks.
+    """
+    if fcntl is None:
+        raise OSError("Reflinks are not supported on this platform")
+    with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    os.chmod(target_path, stat.S_IMODE(os.stat(source_path).st_mode))
+
+
+def _link_file(source_path: str, target_path: str, link_mode: str) -> str:
+    """
+    Atomically replace target_path with a link to source_path.
+
+    The link is created under a temporary name in the target directory and
+    renamed over the target, so the target path never disappears.
+
+    Args:
+        source_path (str): File to link to.
+        target_path (str): Duplicate file to replace.
+        link_mode (str): One of LINK_MODES.
+
+    Returns:
+        str: The link mode actually used ("hardlink" or "reflink").
+
+    Raises:
+        OSError: If the link or rename fails.
+    """
+    temp_path = f"{target_path}.dedup-{os.getpid()}.tmp"
+    try:
+        if link_mode == "hardlink":
+            os.link(source_path, temp_path)
+            used = "hardlink"
+        else:
+            try:
+                _reflink(source_path, temp_path)
+                used = "reflink"
+            except OSError:
+                if link_mode == "reflink":
+                    raise
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                os.link(source_path, temp_path)
+                used = "hardlink"
+        os.replace(temp_path, target_path)
+        return used
+    except OSError:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def deduplicate_venvs(venv_paths: List[str], dry_run: bool = True, link_mode: str = "hardlink",
+                      min_file_bytes: int = MIN_DEDUP_FILE_BYTES, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Replace duplicate files across venvs with hardlinks or reflinks.
+
+    Args:
+        venv_paths (List[str]): Venv folders to deduplicate.
+        dry_run (bool): If True, only report what would be saved.
+        link_mode (str): "hardlink", "reflink" or "auto" (reflink, falling
+            back to hardlink).
+        min_file_bytes (int): Files smaller than this are ignored.
+        max_workers (Optional[int]): Thread pool size for hashing.
+
+    Returns:
+        Dict containing:
+            - total: Number of duplicate files found, not counting files
+              that are already links to their group's source
+            - successful: Number of files linked (or that would be linked)
+            - failed: Number of files that could not be linked
+            - groups: Number of duplicate groups
+            - bytes_saved: Bytes reclaimed (or reclaimable in dry run)
+            - mb_saved: Same value in megabytes
+            - failures: List of tuples (file_path, message)
+
+    Raises:
+        ValueError: If link_mode is not supported.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unsupported link mode: {link_mode}")
+
+    groups = find_duplicate_files(venv_paths, min_file_bytes, max_workers)
+    total = 0
+    successful = 0
+    failures = []
+    bytes_saved = 0
+
+    for group in groups:
+        source_path = group["paths"][0]
+        targets = group["paths"][1:]
+        if dry_run:
+            pending = len(targets) - group["linked"]
+            total += pending
+            successful += pending
+            bytes_saved += group["bytes_saved"]
+            continue
+
+        try:
+            if _file_identity(os.lstat(source_path)) != group["identities"][0]:
+                raise OSError("File changed since it was hashed")
+        except OSError as e:
+            # The source vanished or changed since hashing; fail the whole group
+            pending = targets[group["linked"]:]
+            total += len(pending)
+            failures.extend((target_path, f"Error reading link source {source_path}: {str(e)}")
+                            for target_path in pending)
+            continue
+
+        source_inode = group["identities"][0][:2]
+        group_ok = True
+        for target_path, hashed_identity in zip(targets, group["identities"][1:]):
+            total += 1
+            try:
+                target_identity = _file_identity(os.lstat(target_path))
+                if target_identity[:2] == source_inode:
+                    # Already a link to the source, nothing to do
+                    total -= 1
+                    continue
+                if target_identity != hashed_identity:
+                    # Rewritten in place (even at the same size) since hashing
+                    raise OSError("File changed since it was hashed")
+                _link_file(source_path, target_path, link_mode)
+                successful += 1
+            except OSError as e:
+                group_ok = False
+                failures.append((target_path, f"Error linking {target_path}: {str(e)}"))
+
+        if group_ok:
+            bytes_saved += group["bytes_saved"]
+
+    return {
+        "total": total,
+        "successful": successful,
+        "failed": len(failures),
+        "groups": len(groups),
+        "bytes_saved": bytes_saved,
+        "mb_saved": bytes_saved / (1024 * 1024),
+        "failures": failures
+    }
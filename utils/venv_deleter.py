@@ -2,17 +2,34 @@
 Utility module for deleting virtual environment folders.
 """
 import os
-import shutil
-from typing import List, Dict, Tuple, Any
+from collections import Counter
+from typing import List, Dict, Tuple, Any, Optional, Callable
+from utils.venv_archiver import archive_venv, verify_archive
+from utils.io_order import IO_ORDERS
+from utils.fs_backend import FsBackend, OS_BACKEND
+from utils.robust_deleter import delete_tree, format_error_counts
 
 
-def delete_venv(venv_path: str, dry_run: bool = True) -> Tuple[bool, str]:
+def delete_venv(venv_path: str, dry_run: bool = True, archive_store: Optional[str] = None,
+                io_order: str = "listing", fs: Optional[FsBackend] = None) -> Tuple[bool, str]:
     """
     Delete a virtual environment folder.
     
+    The fast path removes the whole tree at once. If that fails, the rest
+    is removed entry by entry with utils.robust_deleter.delete_tree, which
+    keeps going past failures, retries read-only and busy entries and
+    reports what is left.
+    
     Args:
         venv_path (str): Full path to the venv folder to delete.
         dry_run (bool): If True, simulate deletion without actually deleting.
+        archive_store (Optional[str]): If given, archive the venv into this
+            chunk store first and only delete it when the archive was
+            written and verified.
+        io_order (str): "listing" deletes with shutil.rmtree; "inode" unlinks
+            files in inode order, which seeks less on rotational disks.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real
+            filesystem; archiving requires the real filesystem.
     
     Returns:
         Tuple[bool, str]: (success_status, message)
@@ -20,36 +37,85 @@ def delete_venv(venv_path: str, dry_run: bool = True) -> Tuple[bool, str]:
             - message: Description of the result
     
     Raises:
-        ValueError: If venv_path is empty or invalid.
+        ValueError: If venv_path is empty or invalid, io_order is unknown or
+            archive_store is used with another backend.
     """
+    success, message, _ = _delete_venv(venv_path, dry_run, archive_store, io_order, fs)
+    return success, message
+
+
+def _delete_venv(venv_path: str, dry_run: bool, archive_store: Optional[str], io_order: str,
+                 fs: Optional[FsBackend]) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """Delete a venv like delete_venv, also returning the delete_tree report if the fast path failed."""
+    fs = fs or OS_BACKEND
     if not venv_path or not venv_path.strip():
         raise ValueError("venv_path cannot be empty")
     
-    if not os.path.exists(venv_path):
-        return False, f"Path does not exist: {venv_path}"
+    if io_order not in IO_ORDERS:
+        raise ValueError(f"Unknown io_order: {io_order}")
+    
+    if archive_store and fs is not OS_BACKEND:
+        raise ValueError("Archiving requires the real filesystem")
     
-    if not os.path.isdir(venv_path):
-        return False, f"Path is not a directory: {venv_path}"
+    if not fs.exists(venv_path):
+        return False, f"Path does not exist: {venv_path}", None
+    
+    if not fs.isdir(venv_path):
+        return False, f"Path is not a directory: {venv_path}", None
     
     if dry_run:
-        return True, f"[DRY RUN] Would delete: {venv_path}"
+        if archive_store:
+            return True, f"[DRY RUN] Would archive to {archive_store} and delete: {venv_path}", None
+        return True, f"[DRY RUN] Would delete: {venv_path}", None
+    
+    if archive_store:
+        archived, archive_message = archive_venv(venv_path, archive_store)
+        if not archived:
+            return False, f"Not deleted, archiving failed: {archive_message}", None
+        verified, verify_message = verify_archive(archive_store, venv_path)
+        if not verified:
+            return False, f"Not deleted, {verify_message}", None
+    
+    try:
+        fs.rmtree(venv_path, io_order)
+        return True, f"Successfully deleted: {venv_path}", None
+    except OSError:
+        # Remove the rest entry by entry
+        pass
     
     try:
-        shutil.rmtree(venv_path)
-        return True, f"Successfully deleted: {venv_path}"
-    except PermissionError as e:
-        return False, f"Permission denied: {venv_path} - {str(e)}"
-    except Exception as e:
-        return False, f"Error deleting {venv_path}: {str(e)}"
+        report = delete_tree(venv_path, fs)
+    except OSError as e:
+        if not fs.exists(venv_path):
+            return True, f"Successfully deleted: {venv_path}", None
+        return False, f"Error deleting {venv_path}: {str(e)}", None
+    
+    errors = format_error_counts(report["errors"])
+    if report["leftover_files"] or report["leftover_dirs"]:
+        return False, (f"Partially deleted {venv_path}: {report['leftover_files']} files "
+                       f"({report['leftover_bytes'] / (1024 * 1024):.2f} MB) and {report['leftover_dirs']} "
+                       f"folders left; errors: {errors}"), report
+    return True, f"Successfully deleted: {venv_path} ({report['retried']} retried; errors: {errors})", report
 
 
-def delete_multiple_venvs(venv_paths: List[str], dry_run: bool = True) -> Dict[str, Any]:
+def delete_multiple_venvs(venv_paths: List[str], dry_run: bool = True, archive_store: Optional[str] = None,
+                          on_result: Optional[Callable[[str, bool, str], None]] = None,
+                          io_order: str = "listing", fs: Optional[FsBackend] = None) -> Dict[str, Any]:
     """
     Delete multiple virtual environment folders.
     
+    Any artifact folder found by scan_for_artifacts (node_modules, .tox,
+    build/, ...) can be passed here as well.
+    
     Args:
-        venv_paths (List[str]): List of venv folder paths to delete.
+        venv_paths (List[str]): List of venv or artifact folder paths to delete.
         dry_run (bool): If True, simulate deletion without actually deleting.
+        archive_store (Optional[str]): If given, archive each venv into this
+            chunk store and verify the archive before deleting it.
+        on_result (Optional[Callable[[str, bool, str], None]]): Called with
+            (venv_path, success, message) after each venv is processed.
+        io_order (str): "listing" or "inode", see delete_venv.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
     
     Returns:
         Dict containing:
@@ -57,14 +123,24 @@ def delete_multiple_venvs(venv_paths: List[str], dry_run: bool = True) -> Dict[s
             - successful: Number of successful deletions
             - failed: Number of failed deletions
             - results: List of tuples (venv_path, success, message)
+            - errors: Counter of per-entry error kinds over all venvs
+            - leftover_bytes: Bytes left behind, per partially deleted venv
     """
     results = []
     successful = 0
     failed = 0
+    errors: Counter = Counter()
+    leftover_bytes: Dict[str, int] = {}
     
     for venv_path in venv_paths:
-        success, message = delete_venv(venv_path, dry_run)
+        success, message, report = _delete_venv(venv_path, dry_run, archive_store, io_order, fs)
+        if report is not None:
+            errors.update(report["errors"])
+            if not success:
+                leftover_bytes[venv_path] = report["leftover_bytes"]
         results.append((venv_path, success, message))
+        if on_result is not None:
+            on_result(venv_path, success, message)
         
         if success:
             successful += 1
@@ -75,10 +151,35 @@ def delete_multiple_venvs(venv_paths: List[str], dry_run: bool = True) -> Dict[s
         "total": len(venv_paths),
         "successful": successful,
         "failed": failed,
-        "results": results
+        "results": results,
+        "errors": errors,
+        "leftover_bytes": leftover_bytes
     }
 
 
+def format_deletion_failures(deletion_result: Dict[str, Any], limit: int = 10) -> str:
+    """
+    Summarize the failures of delete_multiple_venvs for display.
+    
+    Args:
+        deletion_result (Dict): Result of delete_multiple_venvs.
+        limit (int): Maximum number of failure messages listed.
+    
+    Returns:
+        str: Error counts, bytes left behind and the first failure messages.
+    """
+    failures = [message for _, success, message in deletion_result["results"] if not success]
+    lines = [
+        f"Errors: {format_error_counts(deletion_result.get('errors', Counter()))}",
+        f"Left behind: {sum(deletion_result.get('leftover_bytes', {}).values()) / (1024 * 1024):.2f} MB",
+        "Failed deletions:"
+    ]
+    lines.extend(failures[:limit])
+    if len(failures) > limit:
+        lines.append(f"... and {len(failures) - limit} more")
+    return "\n".join(lines)
+
+
 def calculate_space_freed(venv_list: List[Dict]) -> float:
     """
     Calculate total space that would be freed by deleting venvs.
@@ -93,3 +194,21 @@ def calculate_space_freed(venv_list: List[Dict]) -> float:
     for venv_info in venv_list:
         total_mb += venv_info.get("size_mb", 0.0)
     return total_mb
+
+
+def calculate_space_freed_by_type(venv_list: List[Dict]) -> Dict[str, float]:
+    """
+    Calculate space that would be freed, grouped by artifact type.
+    
+    Args:
+        venv_list (List[Dict]): List of venv or artifact information
+            dictionaries; entries without artifact_type count as "venv".
+    
+    Returns:
+        Dict[str, float]: Total size in MB per artifact type.
+    """
+    totals: Dict[str, float] = {}
+    for venv_info in venv_list:
+        artifact_type = venv_info.get("artifact_type", "venv")
+        totals[artifact_type] = totals.get(artifact_type, 0.0) + venv_info.get("size_mb", 0.0)
+    return totals
@@ -0,0 +1,398 @@
+"""
+Utility module for deletion policies over scan results.
+
+A small policy language is compiled into predicates that run over columnar
+scan results, so a policy can be re-evaluated over a million records in
+milliseconds. NumPy is used when installed; otherwise the standard library
+`array` module and list comprehensions are used.
+
+Example policy:
+
+    (venv_path matches '/data/*' and size_mb > 500
+     or venv_path matches '/home/*' and size_mb > 200)
+    and age_days > 60 and python_version < '3.8' and not in_use
+
+Supported operators are >, >=, <, <=, ==, != and matches (glob), combined
+with and, or, not and parentheses. Numbers may be negative (e.g.
+age_days > -1); Python versions may not.
+"""
+import re
+import math
+import fnmatch
+import operator
+from array import array
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NUMERIC_FIELDS = ("age_days", "size_mb")
+VERSION_FIELDS = ("python_version",)
+BOOL_FIELDS = ("in_use",)
+STRING_FIELDS = ("venv_path", "project_path", "project_name", "artifact_type", "root_dir", "fingerprint")
+COMPARISON_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<number>-?\d+(?:\.\d+)*)"
+    r"|(?P<string>'[^']*'|\"[^\"]*\")"
+    r"|(?P<op>>=|<=|==|!=|>|<|\(|\))"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_]*))"
+)
+
+Mask = Union[List[bool], Any]
+
+
+def encode_python_version(version: str) -> float:
+    """
+    Encode a Python version string as a comparable number.
+
+    Args:
+        version (str): Version such as "3.11.7"; only major.minor is used.
+
+    Returns:
+        float: major * 1000 + minor, or NaN if the version is unknown.
+    """
+    parts = str(version).split(".")
+    try:
+        return int(parts[0]) * 1000 + (int(parts[1]) if len(parts) > 1 else 0)
+    except ValueError:
+        return math.nan
+
+
+class ScanColumns:
+    """
+    Columnar view of scan results.
+
+    Numeric fields are stored as float arrays, boolean fields as bool arrays
+    and string fields as integer codes into a table of distinct values, so
+    string predicates are evaluated once per distinct value.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        """
+        Build columns from venv information dictionaries.
+
+        Args:
+            records (List[Dict]): Scan results; missing fields are treated as
+                unknown (NaN, False or empty string).
+        """
+        self.length = len(records)
+        self.numeric: Dict[str, Any] = {}
+        self.strings: Dict[str, Any] = {}
+
+        for field in NUMERIC_FIELDS:
+            self.numeric[field] = self._float_column(float(record.get(field, math.nan)) for record in records)
+        for field in VERSION_FIELDS:
+            self.numeric[field] = self._float_column(encode_python_version(record.get(field, "")) for record in records)
+        for field in BOOL_FIELDS:
+            values = [bool(record.get(field, False)) for record in records]
+            self.numeric[field] = np.array(values, dtype=bool) if np is not None else values
+        for field in STRING_FIELDS:
+            table: Dict[str, int] = {}
+            codes = [table.setdefault(str(record.get(field, "")), len(table)) for record in records]
+            column_codes = np.array(codes, dtype=np.int64) if np is not None else codes
+            self.strings[field] = (list(table), column_codes)
+
+    def _float_column(self, values) -> Any:
+        """
+        Build a float column from an iterable.
+
+        Args:
+            values (Iterable[float]): Column values.
+
+        Returns:
+            Any: NumPy array, or array('d') without NumPy.
+        """
+        if np is not None:
+            return np.fromiter(values, dtype=np.float64, count=self.length)
+        return array("d", values)
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return self.length
+
+
+def _combine(left: Mask, right: Mask, op: Callable) -> Mask:
+    """Combine two masks element-wise."""
+    if np is not None:
+        return op(left, right)
+    return [op(a, b) for a, b in zip(left, right)]
+
+
+def _invert(mask: Mask) -> Mask:
+    """Invert a mask element-wise."""
+    if np is not None:
+        return ~mask
+    return [not value for value in mask]
+
+
+def _compare_numeric(column: Any, op: Callable, value: float) -> Mask:
+    """Compare a numeric column against a constant."""
+    if np is not None:
+        return op(column, value)
+    return [op(item, value) for item in column]
+
+
+def _compare_strings(column: Any, predicate: Callable[[str], bool]) -> Mask:
+    """Evaluate a string predicate once per distinct value and gather."""
+    table, codes = column
+    lookup = [predicate(value) for value in table]
+    if np is not None:
+        return np.array(lookup, dtype=bool)[codes] if lookup else np.zeros(0, dtype=bool)
+    return [lookup[code] for code in codes]
+
+
+class _Parser:
+    """Recursive-descent parser turning policy text into a predicate."""
+
+    def __init__(self, text: str):
+        """
+        Tokenize policy text.
+
+        Args:
+            text (str): Policy source.
+
+        Raises:
+            ValueError: If the text contains an invalid token.
+        """
+        self.tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = _TOKEN_PATTERN.match(text, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Invalid policy syntax near: {text[position:position + 20]!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+            position = match.end()
+            while position < len(text) and text[position].isspace():
+                position += 1
+        self.index = 0
+
+    def _peek(self):
+        """Return the current token or (None, None) at the end."""
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+
+    def _next(self):
+        """Consume and return the current token."""
+        token = self._peek()
+        if token[0] is None:
+            raise ValueError("Unexpected end of policy")
+        self.index += 1
+        return token
+
+    def parse(self) -> Callable[[ScanColumns], Mask]:
+        """
+        Parse the whole policy.
+
+        Returns:
+            Callable[[ScanColumns], Mask]: Predicate over columns.
+
+        Raises:
+            ValueError: If the policy is empty or malformed.
+        """
+        if not self.tokens:
+            raise ValueError("Policy cannot be empty")
+        predicate = self._parse_or()
+        if self.index != len(self.tokens):
+            raise ValueError(f"Unexpected token in policy: {self._peek()[1]!r}")
+        return predicate
+
+    def _parse_or(self):
+        """Parse a sequence of and-expressions joined by or."""
+        left = self._parse_and()
+        while self._peek() == ("word", "or"):
+            self._next()
+            left = self._binary(left, self._parse_and(), operator.or_)
+        return left
+
+    def _parse_and(self):
+        """Parse a sequence of not-expressions joined by and."""
+        left = self._parse_not()
+        while self._peek() == ("word", "and"):
+            self._next()
+            left = self._binary(left, self._parse_not(), operator.and_)
+        return left
+
+    def _parse_not(self):
+        """Parse an optionally negated atom."""
+        if self._peek() == ("word", "not"):
+            self._next()
+            operand = self._parse_not()
+            return lambda columns: _invert(operand(columns))
+        return self._parse_atom()
+
+    @staticmethod
+    def _binary(left, right, op):
+        """Build a predicate combining two predicates element-wise."""
+        return lambda columns: _combine(left(columns), right(columns), op)
+
+    def _parse_atom(self):
+        """Parse a parenthesised expression, a boolean field or a comparison."""
+        kind, value = self._next()
+        if (kind, value) == ("op", "("):
+            inner = self._parse_or()
+            if self._next() != ("op", ")"):
+                raise ValueError("Missing closing parenthesis in policy")
+            return inner
+        if kind != "word":
+            raise ValueError(f"Expected a field name, got {value!r}")
+        if value in BOOL_FIELDS:
+            return lambda columns: columns.numeric[value].copy() if np is not None else list(columns.numeric[value])
+        return self._parse_comparison(value)
+
+    def _parse_comparison(self, field: str):
+        """Parse a comparison of a field against a literal value."""
+        op_kind, op_text = self._next()
+        if op_kind == "word" and op_text == "matches":
+            op_text = "matches"
+        elif op_kind != "op" or op_text not in COMPARISON_OPERATORS:
+            raise ValueError(f"Expected a comparison after {field!r}")
+        literal_kind, literal = self._next()
+        if literal_kind == "string":
+            literal = literal[1:-1]
+        elif literal_kind != "number":
+            raise ValueError(f"Expected a value after {field} {op_text}")
+
+        if field in STRING_FIELDS:
+            if op_text == "matches":
+                return lambda columns: _compare_strings(columns.strings[field], lambda item: fnmatch.fnmatchcase(item, literal))
+            if op_text not in ("==", "!="):
+                raise ValueError(f"Operator {op_text} is not supported for {field}")
+            compare = COMPARISON_OPERATORS[op_text]
+            return lambda columns: _compare_strings(columns.strings[field], lambda item: compare(item, literal))
+
+        if op_text == "matches":
+            raise ValueError(f"Operator matches is not supported for {field}")
+        if field in VERSION_FIELDS:
+            if literal.startswith("-"):
+                raise ValueError(f"Expected a version for {field}, got {literal!r}")
+            number = encode_python_version(literal)
+        elif field in NUMERIC_FIELDS:
+            try:
+                number = float(literal)
+            except ValueError:
+                raise ValueError(f"Expected a number for {field}, got {literal!r}")
+        else:
+            raise ValueError(f"Unknown policy field: {field}")
+        compare = COMPARISON_OPERATORS[op_text]
+        return lambda columns: _compare_numeric(columns.numeric[field], compare, number)
+
+
+class Policy:
+    """
+    A compiled deletion policy.
+
+    Use compile_policy() to build one; compiled policies are cached by text.
+    """
+
+    def __init__(self, text: str):
+        """
+        Compile policy text.
+
+        Args:
+            text (str): Policy source.
+
+        Raises:
+            ValueError: If the policy is malformed.
+        """
+        self.text = text
+        self._predicate = _Parser(text).parse()
+
+    def evaluate(self, columns: ScanColumns) -> Mask:
+        """
+        Evaluate the policy over columnar scan results.
+
+        Args:
+            columns (ScanColumns): Columnar scan results.
+
+        Returns:
+            Mask: Boolean NumPy array, or list of bools without NumPy.
+        """
+        return self._predicate(columns)
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """
+        Evaluate the policy for a single record.
+
+        Args:
+            record (Dict): Venv information dictionary.
+
+        Returns:
+            bool: True if the record meets the policy.
+        """
+        return bool(self.evaluate(ScanColumns([record]))[0])
+
+    def filter(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep only the records that meet the policy.
+
+        Args:
+            records (List[Dict]): Venv information dictionaries.
+
+        Returns:
+            List[Dict]: Records meeting the policy, in their original order.
+        """
+        mask = self.evaluate(ScanColumns(records))
+        return [record for record, keep in zip(records, mask) if keep]
+
+
+@lru_cache(maxsize=128)
+def compile_policy(text: str) -> Policy:
+    """
+    Compile policy text, reusing previously compiled policies.
+
+    Args:
+        text (str): Policy source.
+
+    Returns:
+        Policy: The compiled policy.
+
+    Raises:
+        ValueError: If the policy is malformed.
+    """
+    return Policy(text)
+
+
+def default_policy_text(days_unused: int, min_size_mb: int) -> str:
+    """
+    Build the policy equivalent to the classic age and size criteria.
+
+    Args:
+        days_unused (int): Minimum age in days.
+        min_size_mb (int): Minimum size in MB.
+
+    Returns:
+        str: Policy text.
+    """
+    return f"age_days > {days_unused} and size_mb > {min_size_mb}"
+
+
+def apply_policy(records: List[Dict[str, Any]], policy_text: str) -> List[Dict[str, Any]]:
+    """
+    Set meets_criteria on every record according to a policy.
+
+    Args:
+        records (List[Dict]): Venv information dictionaries, updated in place.
+        policy_text (str): Policy source.
+
+    Returns:
+        List[Dict]: The same records.
+
+    Raises:
+        ValueError: If the policy is malformed.
+    """
+    mask = compile_policy(policy_text).evaluate(ScanColumns(records))
+    for record, meets in zip(records, mask):
+        record["meets_criteria"] = bool(meets)
+    return records
@@ -3,41 +3,76 @@ Utility module for scanning and detecting virtual environment folders.
 """
 import os
 import time
-from typing import List, Dict, Optional
+import hashlib
+from typing import List, Dict, Tuple, Any, Optional, Iterator, Set, Callable
+from utils.size_estimator import estimate_folder_size
+from utils.venv_policy import compile_policy, default_policy_text, apply_policy
+from utils.scan_result_file import write_scan_results
+from utils.io_order import get_folder_size_inode_order
+from utils.fs_backend import FsBackend, OS_BACKEND
+from utils.scan_progress import ScanProgress
 
 
-def get_folder_size(folder_path: str) -> float:
+SIZE_MODES = ("walk", "record", "inode")
+
+
+def get_folder_size(folder_path: str, mode: str = "walk", fs: Optional[FsBackend] = None,
+                    progress: Optional[ScanProgress] = None) -> float:
     """
     Calculate the total size of a folder in megabytes.
     
     Args:
         folder_path (str): Path to the folder to measure.
+        mode (str): "walk" stats every file; "inode" stats every file in
+            inode order, which seeks less on rotational disks (see
+            utils.io_order); "record" takes the sizes of installed packages
+            from their dist-info RECORD files and only walks the rest (see
+            utils.record_sizer).
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real
+            filesystem; other backends only support mode "walk".
+        progress (Optional[ScanProgress]): Ticked for every folder read.
     
     Returns:
         float: Size of the folder in MB.
     
     Raises:
         OSError: If there's an error accessing the folder.
+        ValueError: If mode is not one of SIZE_MODES or not supported by fs.
     """
+    fs = fs or OS_BACKEND
+    if mode not in SIZE_MODES:
+        raise ValueError(f"Unknown size mode: {mode}")
+    if mode != "walk" and fs is not OS_BACKEND:
+        raise ValueError(f"Size mode {mode} requires the real filesystem")
+    if mode == "record":
+        # Imported here because record_sizer builds on this module
+        from utils.record_sizer import measure_venv_by_record
+        return measure_venv_by_record(folder_path, progress=progress)["size_mb"]
+    if mode == "inode":
+        return get_folder_size_inode_order(folder_path, progress=progress)
+    
     total_bytes = 0
-    for dirpath, dirnames, filenames in os.walk(folder_path):
+    for dirpath, dirnames, filenames in fs.walk(folder_path):
+        if progress is not None:
+            progress.tick(len(filenames))
         for filename in filenames:
             file_path = os.path.join(dirpath, filename)
-            if os.path.isfile(file_path):
+            if fs.isfile(file_path):
                 try:
-                    total_bytes += os.path.getsize(file_path)
+                    total_bytes += fs.getsize(file_path)
                 except (OSError, IOError):
                     # Skip files that can't be accessed
                     continue
     return total_bytes / (1024 * 1024)
 
 
-def get_venv_age_days(venv_path: str) -> float:
+def get_venv_age_days(venv_path: str, fs: Optional[FsBackend] = None) -> float:
     """
     Calculate the age of a venv folder in days since last modification.
     
     Args:
         venv_path (str): Path to the venv folder.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
     
     Returns:
         float: Age in days since last modification.
@@ -45,69 +80,418 @@ def get_venv_age_days(venv_path: str) -> float:
     Raises:
         OSError: If there's an error accessing the folder.
     """
-    last_modified = os.path.getmtime(venv_path)
+    last_modified = (fs or OS_BACKEND).getmtime(venv_path)
     age_seconds = time.time() - last_modified
     return age_seconds / (60 * 60 * 24)
 
 
-def scan_for_venvs(root_dir: str, days_unused: int = 60, min_size_mb: int = 200) -> List[Dict[str, any]]:
+# Directory names that always identify an artifact, mapped to the artifact type.
+ARTIFACT_DIR_NAMES = {
+    "venv": "venv",
+    "node_modules": "node_modules",
+    ".tox": "tox",
+    ".nox": "nox",
+    ".pytest_cache": "pytest_cache",
+    ".mypy_cache": "mypy_cache",
+    "__pycache__": "pycache",
+}
+# build/ and dist/ are only artifacts when they sit next to a Python project file.
+BUILD_DIR_NAMES = {"build": "build", "dist": "dist"}
+PROJECT_MARKER_FILES = ("setup.py", "pyproject.toml", "setup.cfg")
+ARTIFACT_TYPES = tuple(ARTIFACT_DIR_NAMES.values()) + tuple(BUILD_DIR_NAMES.values())
+
+
+def detect_artifact_type(dirname: str, sibling_filenames: List[str], artifact_types: Tuple[str, ...] = ARTIFACT_TYPES) -> Optional[str]:
     """
-    Scan a directory tree for virtual environment folders matching criteria.
+    Detect whether a directory is a reclaimable artifact.
+    
+    Args:
+        dirname (str): Name of the directory.
+        sibling_filenames (List[str]): Names of files in the parent directory.
+        artifact_types (Tuple[str, ...]): Artifact types to detect.
+    
+    Returns:
+        Optional[str]: The artifact type, or None if it is not an artifact.
+    """
+    artifact_type = ARTIFACT_DIR_NAMES.get(dirname)
+    if artifact_type is None and dirname in BUILD_DIR_NAMES:
+        if any(marker in sibling_filenames for marker in PROJECT_MARKER_FILES):
+            artifact_type = BUILD_DIR_NAMES[dirname]
+    if artifact_type in artifact_types:
+        return artifact_type
+    return None
+
+
+def validate_artifact_types(artifact_types: Optional[Tuple[str, ...]]) -> Tuple[str, ...]:
+    """
+    Validate a requested set of artifact types.
+    
+    Args:
+        artifact_types (Optional[Tuple[str, ...]]): Requested types, or None
+            for all ARTIFACT_TYPES.
+    
+    Returns:
+        Tuple[str, ...]: The artifact types to detect.
+    
+    Raises:
+        ValueError: If an unknown artifact type is requested.
+    """
+    artifact_types = ARTIFACT_TYPES if artifact_types is None else tuple(artifact_types)
+    unknown_types = set(artifact_types) - set(ARTIFACT_TYPES)
+    if unknown_types:
+        raise ValueError(f"Unknown artifact types: {', '.join(sorted(unknown_types))}")
+    return artifact_types
+
+
+def iter_artifact_dirs(root_dir: str, artifact_types: Tuple[str, ...] = ARTIFACT_TYPES,
+                       fs: Optional[FsBackend] = None,
+                       progress: Optional[ScanProgress] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Walk a directory tree and yield artifact folders without measuring them.
+    
+    Detected artifacts are not descended into.
+    
+    Args:
+        root_dir (str): Root directory to walk.
+        artifact_types (Tuple[str, ...]): Artifact types to detect.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
+        progress (Optional[ScanProgress]): Ticked once per walked folder.
+    
+    Returns:
+        Iterator[Tuple[str, str]]: (artifact_path, artifact_type) pairs.
+    """
+    for dirpath, dirnames, filenames in (fs or OS_BACKEND).walk(root_dir):
+        if progress is not None:
+            progress.tick(len(filenames))
+        kept_dirnames = []
+        for dirname in dirnames:
+            artifact_type = detect_artifact_type(dirname, filenames, artifact_types)
+            if artifact_type is None:
+                kept_dirnames.append(dirname)
+            else:
+                yield os.path.join(dirpath, dirname), artifact_type
+        dirnames[:] = kept_dirnames
+
+
+def get_site_packages_dirs(venv_path: str, fs: Optional[FsBackend] = None) -> List[str]:
+    """
+    Find the site-packages folders of a virtual environment.
+    
+    Args:
+        venv_path (str): Path to the venv folder.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
+    
+    Returns:
+        List[str]: Existing site-packages folders (Windows and Unix layouts).
+    """
+    fs = fs or OS_BACKEND
+    site_packages_dirs = []
+    windows_dir = os.path.join(venv_path, "Lib", "site-packages")
+    if fs.isdir(windows_dir):
+        site_packages_dirs.append(windows_dir)
+    
+    lib_dir = os.path.join(venv_path, "lib")
+    if fs.isdir(lib_dir) and os.path.normcase(lib_dir) != os.path.normcase(os.path.join(venv_path, "Lib")):
+        for name in sorted(fs.listdir(lib_dir)):
+            candidate = os.path.join(lib_dir, name, "site-packages")
+            if name.startswith("python") and fs.isdir(candidate):
+                site_packages_dirs.append(candidate)
+    return site_packages_dirs
+
+
+def get_venv_python_version(venv_path: str, fs: Optional[FsBackend] = None) -> str:
+    """
+    Read the interpreter version of a venv from its pyvenv.cfg.
+    
+    Args:
+        venv_path (str): Path to the venv folder.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
+    
+    Returns:
+        str: Version such as "3.11.7", or "" if it can't be determined.
+    """
+    try:
+        config = (fs or OS_BACKEND).read_text(os.path.join(venv_path, "pyvenv.cfg"))
+    except OSError:
+        return ""
+    for line in config.splitlines():
+        key, _, value = line.partition("=")
+        # venv writes "version", virtualenv writes "version_info"
+        if key.strip() in ("version", "version_info"):
+            return ".".join(value.strip().split(".")[:3])
+    return ""
+
+
+def get_venv_fingerprint(venv_path: str, fs: Optional[FsBackend] = None) -> str:
+    """
+    Fingerprint the set of installed distributions of a venv.
+    
+    Venvs with the same packages at the same versions share a fingerprint.
+    
+    Args:
+        venv_path (str): Path to the venv folder.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
+    
+    Returns:
+        str: Short hex digest of the sorted dist-info names, or "" if the
+            venv has no site-packages.
+    """
+    fs = fs or OS_BACKEND
+    dist_infos = []
+    for site_packages in get_site_packages_dirs(venv_path, fs):
+        try:
+            dist_infos.extend(name for name in fs.listdir(site_packages) if name.endswith(".dist-info"))
+        except OSError:
+            continue
+    if not dist_infos:
+        return ""
+    return hashlib.sha1("\n".join(sorted(dist_infos)).encode("utf-8")).hexdigest()[:16]
+
+
+def get_active_venv_paths(fs: Optional[FsBackend] = None) -> Set[str]:
+    """
+    Collect paths that running processes use as interpreters or venvs.
+    
+    The real filesystem reads argv[0], the executable and VIRTUAL_ENV of
+    every readable process from /proc; on platforms without /proc an empty
+    set is returned.
+    
+    Args:
+        fs (Optional[FsBackend]): Backend to ask, defaults to the real system.
+    
+    Returns:
+        Set[str]: Absolute paths of interpreters and activated venvs.
+    """
+    return (fs or OS_BACKEND).active_paths()
+
+
+def is_path_in_use(venv_path: str, active_paths: Set[str]) -> bool:
+    """
+    Check whether any active path lies inside a venv.
+    
+    Args:
+        venv_path (str): Path to the venv folder.
+        active_paths (Set[str]): Result of get_active_venv_paths.
+    
+    Returns:
+        bool: True if a running process uses the venv.
+    """
+    prefix = os.path.abspath(venv_path)
+    return any(path == prefix or path.startswith(prefix + os.sep) for path in active_paths)
+
+
+def build_artifact_info(artifact_path: str, artifact_type: str, estimate_size: bool = False,
+                        size_mode: str = "walk", fs: Optional[FsBackend] = None,
+                        progress: Optional[ScanProgress] = None) -> Dict[str, Any]:
+    """
+    Measure an artifact folder and build its information dictionary.
+    
+    The record has no root_dir, in_use or meets_criteria yet; those are set
+    once per record by finalize_artifact_list (or apply_policy).
+    
+    Args:
+        artifact_path (str): Path to the artifact folder.
+        artifact_type (str): Type of the artifact (one of ARTIFACT_TYPES).
+        estimate_size (bool): If True, use a sampled size estimate with a
+            confidence interval instead of the exact size.
+        size_mode (str): Mode passed to get_folder_size for exact sizes.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real
+            filesystem; other backends don't support estimate_size.
+        progress (Optional[ScanProgress]): Ticked while measuring an exact
+            size; sampled estimates are not counted.
+    
+    Returns:
+        Dict: Artifact information as described in scan_for_artifacts,
+            without root_dir, in_use and meets_criteria.
+    
+    Raises:
+        OSError: If there's an error accessing the folder.
+    """
+    fs = fs or OS_BACKEND
+    project_path = os.path.dirname(artifact_path)
+    age_days = get_venv_age_days(artifact_path, fs)
+    is_venv = artifact_type == "venv"
+    if estimate_size:
+        estimate = estimate_folder_size(artifact_path)
+        size_mb = estimate["size_mb"]
+        size_low_mb, size_high_mb = estimate["lower_mb"], estimate["upper_mb"]
+        size_exact = estimate["exact"]
+    else:
+        size_mb = get_folder_size(artifact_path, size_mode, fs, progress)
+        size_low_mb = size_high_mb = size_mb
+        size_exact = True
+    artifact_info = {
+        "venv_path": artifact_path,
+        "project_path": project_path,
+        "project_name": os.path.basename(project_path),
+        "artifact_type": artifact_type,
+        "age_days": age_days,
+        "size_mb": size_mb,
+        "size_low_mb": size_low_mb,
+        "size_high_mb": size_high_mb,
+        "size_exact": size_exact,
+        "python_version": get_venv_python_version(artifact_path, fs) if is_venv else "",
+        "fingerprint": get_venv_fingerprint(artifact_path, fs) if is_venv else "",
+        "inode": fs.stat(artifact_path).st_ino
+    }
+    return artifact_info
+
+
+def scan_for_artifacts(root_dir: str, days_unused: int = 60, min_size_mb: int = 200,
+                       artifact_types: Optional[Tuple[str, ...]] = None,
+                       estimate_sizes: bool = False, policy: Optional[str] = None,
+                       result_path: Optional[str] = None,
+                       on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       size_mode: str = "walk", fs: Optional[FsBackend] = None,
+                       progress: Optional[ScanProgress] = None) -> List[Dict[str, Any]]:
+    """
+    Scan a directory tree once for all reclaimable artifact folders.
+    
+    All detectors run during a single traversal. Detected artifacts are not
+    descended into, so their contents are only visited while sizing them.
     
     Args:
         root_dir (str): Root directory to start scanning from.
-        days_unused (int): Minimum age in days for venvs to be included.
-        min_size_mb (int): Minimum size in MB for venvs to be included.
+        days_unused (int): Minimum age in days for artifacts to be included.
+        min_size_mb (int): Minimum size in MB for artifacts to be included.
+        artifact_types (Optional[Tuple[str, ...]]): Artifact types to detect,
+            defaults to all ARTIFACT_TYPES.
+        estimate_sizes (bool): If True, report sampled size estimates that
+            can be refined later with refine_sizes_in_background.
+        policy (Optional[str]): Policy text (see utils.venv_policy) deciding
+            meets_criteria; defaults to the days_unused/min_size_mb criteria.
+        result_path (Optional[str]): If given, also save the results to this
+            memory-mappable result file (see utils.scan_result_file).
+        on_result (Optional[Callable[[Dict], None]]): Called with each
+            completed record as soon as it is measured, e.g. an exporter's
+            write method (see utils.result_exporter).
+        size_mode (str): "walk", "inode" or "record", see get_folder_size.
+        fs (Optional[FsBackend]): Filesystem backend (see utils.fs_backend),
+            defaults to the real filesystem; other backends only support
+            exact sizes with size_mode "walk".
+        progress (Optional[ScanProgress]): Progress of the walk and of the
+            sizing walks (see utils.scan_progress); finished when the scan
+            completes.
     
     Returns:
-        List[Dict]: List of dictionaries containing venv information:
-            - venv_path: Full path to the venv folder
+        List[Dict]: List of dictionaries containing artifact information:
+            - venv_path: Full path to the artifact folder
             - project_path: Path to the parent project folder
             - project_name: Name of the project folder
+            - artifact_type: Type of the artifact (e.g. "venv", "node_modules")
             - age_days: Age in days since last modification
             - size_mb: Size in megabytes
+            - size_low_mb / size_high_mb: Confidence interval of the size
+            - size_exact: False while size_mb is only an estimate
+            - python_version: Interpreter version from pyvenv.cfg (venvs only)
+            - fingerprint: Hash of the installed distributions (venvs only)
+            - inode: Inode number of the artifact folder
+            - root_dir: The scanned root directory
+            - in_use: Whether a running process uses the artifact
             - meets_criteria: Boolean indicating if it meets deletion criteria
     
     Raises:
-        ValueError: If root_dir doesn't exist or is not a directory.
+        ValueError: If root_dir doesn't exist, is not a directory, an
+            unknown artifact type is requested, the policy is malformed or
+            size_mode is unknown or not supported by fs.
     """
-    if not os.path.exists(root_dir):
+    fs = fs or OS_BACKEND
+    if not fs.exists(root_dir):
         raise ValueError(f"Root directory does not exist: {root_dir}")
     
-    if not os.path.isdir(root_dir):
+    if not fs.isdir(root_dir):
         raise ValueError(f"Root path is not a directory: {root_dir}")
     
-    venv_list = []
-    
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # Check if 'venv' folder exists in current directory
-        if "venv" in dirnames:
-            venv_path = os.path.join(dirpath, "venv")
-            project_path = dirpath
-            project_name = os.path.basename(dirpath)
-            
-            try:
-                age_days = get_venv_age_days(venv_path)
-                size_mb = get_folder_size(venv_path)
-                meets_criteria = (age_days > days_unused) and (size_mb > min_size_mb)
-                
-                venv_info = {
-                    "venv_path": venv_path,
-                    "project_path": project_path,
-                    "project_name": project_name,
-                    "age_days": age_days,
-                    "size_mb": size_mb,
-                    "meets_criteria": meets_criteria
-                }
-                
-                venv_list.append(venv_info)
-                
-            except Exception as e:
-                # Log error but continue scanning
-                print(f"Error scanning {venv_path}: {e}")
-                continue
-    
-    return venv_list
+    artifact_types = validate_artifact_types(artifact_types)
+    if size_mode not in SIZE_MODES:
+        raise ValueError(f"Unknown size mode: {size_mode}")
+    if fs is not OS_BACKEND and (estimate_sizes or size_mode != "walk"):
+        raise ValueError("Size estimates and size modes other than walk require the real filesystem")
+    policy = policy or default_policy_text(days_unused, min_size_mb)
+    compile_policy(policy)
+    
+    artifact_list = []
+    active_paths = get_active_venv_paths(fs)
+    
+    for artifact_path, artifact_type in iter_artifact_dirs(root_dir, artifact_types, fs, progress):
+        try:
+            artifact_info = build_artifact_info(artifact_path, artifact_type, estimate_sizes, size_mode, fs, progress)
+        except Exception as e:
+            # Log error but continue scanning
+            print(f"Error scanning {artifact_path}: {e}")
+            continue
+        finalize_artifact_list([artifact_info], root_dir, policy, active_paths)
+        artifact_list.append(artifact_info)
+        if on_result is not None:
+            on_result(artifact_info)
+    
+    if progress is not None:
+        progress.finish()
+    if result_path:
+        saved, message = write_scan_results(artifact_list, result_path)
+        if not saved:
+            print(message)
+    return artifact_list
+
+
+def finalize_artifact_list(artifact_list: List[Dict[str, Any]], root_dir: str, policy: str,
+                           active_paths: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Add scan-wide fields to artifact records and evaluate the policy.
+    
+    Args:
+        artifact_list (List[Dict]): Records built by build_artifact_info,
+            updated in place.
+        root_dir (str): The scanned root directory.
+        policy (str): Policy text deciding meets_criteria.
+        active_paths (Optional[Set[str]]): Result of get_active_venv_paths,
+            looked up when not given.
+    
+    Returns:
+        List[Dict]: The same records with root_dir, in_use and
+            meets_criteria set.
+    """
+    if active_paths is None:
+        active_paths = get_active_venv_paths()
+    for artifact_info in artifact_list:
+        artifact_info["root_dir"] = root_dir
+        artifact_info["in_use"] = is_path_in_use(artifact_info["venv_path"], active_paths)
+    
+    return apply_policy(artifact_list, policy)
+
+
+def scan_for_venvs(root_dir: str, days_unused: int = 60, min_size_mb: int = 200,
+                   estimate_sizes: bool = False, policy: Optional[str] = None,
+                   result_path: Optional[str] = None,
+                   on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   size_mode: str = "walk", fs: Optional[FsBackend] = None,
+                   progress: Optional[ScanProgress] = None) -> List[Dict[str, Any]]:
+    """
+    Scan a directory tree for virtual environment folders matching criteria.
+    
+    Args:
+        root_dir (str): Root directory to start scanning from.
+        days_unused (int): Minimum age in days for venvs to be included.
+        min_size_mb (int): Minimum size in MB for venvs to be included.
+        estimate_sizes (bool): If True, report sampled size estimates.
+        policy (Optional[str]): Policy text deciding meets_criteria.
+        result_path (Optional[str]): If given, also save the results to this
+            memory-mappable result file.
+        on_result (Optional[Callable[[Dict], None]]): Called with each
+            completed record as soon as it is measured.
+        size_mode (str): "walk", "inode" or "record", see get_folder_size.
+        fs (Optional[FsBackend]): Filesystem backend, defaults to the real filesystem.
+        progress (Optional[ScanProgress]): Progress of the walk.
+    
+    Returns:
+        List[Dict]: List of dictionaries containing venv information, as
+            described in scan_for_artifacts, with artifact_type "venv".
+    
+    Raises:
+        ValueError: If root_dir doesn't exist or is not a directory.
+    """
+    return scan_for_artifacts(root_dir, days_unused, min_size_mb, ("venv",), estimate_sizes, policy, result_path, on_result,
+                              size_mode, fs, progress)
 
 
 def filter_venvs_by_criteria(venv_list: List[Dict], days_unused: int, min_size_mb: int) -> List[Dict]:
@@ -122,8 +506,21 @@ def filter_venvs_by_criteria(venv_list: List[Dict], days_unused: int, min_size_m
     Returns:
         List[Dict]: Filtered list containing only venvs meeting the criteria.
     """
-    filtered_list = []
-    for venv_info in venv_list:
-        if venv_info["age_days"] > days_unused and venv_info["size_mb"] > min_size_mb:
-            filtered_list.append(venv_info)
-    return filtered_list
+    return filter_venvs_by_policy(venv_list, default_policy_text(days_unused, min_size_mb))
+
+
+def filter_venvs_by_policy(venv_list: List[Dict], policy: str) -> List[Dict]:
+    """
+    Filter a list of venvs with a policy (see utils.venv_policy).
+    
+    Args:
+        venv_list (List[Dict]): List of venv information dictionaries.
+        policy (str): Policy text, e.g. "age_days > 60 and not in_use".
+    
+    Returns:
+        List[Dict]: Filtered list containing only venvs meeting the policy.
+    
+    Raises:
+        ValueError: If the policy is malformed.
+    """
+    return compile_policy(policy).filter(venv_list)
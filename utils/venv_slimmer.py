@@ -0,0 +1,288 @@
+"""
+Utility module for slimming virtual environments that are kept.
+
+Instead of deleting a venv, slimming removes files that are not needed at
+runtime (bytecode caches, package test suites, dist-info documentation and
+pip caches) according to configurable rule sets.
+"""
+import os
+import shutil
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Any, Optional
+
+
+# Each rule may use the following keys:
+#   dir_patterns:        fnmatch patterns for directory names to remove
+#   file_patterns:       fnmatch patterns for file names to remove
+#   parent_patterns:     the containing directory name must match one of these
+#   site_packages_depth: match only at least this many levels below site-packages
+#   root_only:           match only directly inside the venv folder
+DEFAULT_SLIM_RULES: Dict[str, Dict[str, Any]] = {
+    "bytecode": {
+        "dir_patterns": ["__pycache__"],
+        "file_patterns": ["*.pyc", "*.pyo"]
+    },
+    "tests": {
+        "dir_patterns": ["tests", "test"],
+        "site_packages_depth": 2
+    },
+    "dist_info_docs": {
+        "dir_patterns": ["licenses"],
+        "file_patterns": ["LICENSE*", "LICENCE*", "COPYING*", "NOTICE*", "AUTHORS*", "*.md", "*.rst"],
+        "parent_patterns": ["*.dist-info"]
+    },
+    "pip_cache": {
+        "dir_patterns": [".cache", "pip-cache"],
+        "root_only": True
+    }
+}
+
+
+def _site_packages_depth(relative_parts: List[str]) -> int:
+    """
+    Get how deep a directory lies below the nearest site-packages folder.
+
+    Args:
+        relative_parts (List[str]): Path components relative to the venv.
+
+    Returns:
+        int: Depth below site-packages (site-packages itself is 0), or -1
+            if the directory is not inside site-packages.
+    """
+    for index in range(len(relative_parts) - 1, -1, -1):
+        if relative_parts[index] == "site-packages":
+            return len(relative_parts) - 1 - index
+    return -1
+
+
+def _rule_applies(rule: Dict[str, Any], relative_parts: List[str]) -> bool:
+    """
+    Check whether a rule's location constraints hold for a directory.
+
+    Args:
+        rule (Dict): Slim rule definition.
+        relative_parts (List[str]): Components of the containing directory
+            relative to the venv.
+
+    Returns:
+        bool: True if entries of this directory may match the rule.
+    """
+    if rule.get("root_only") and relative_parts:
+        return False
+    parent_patterns = rule.get("parent_patterns")
+    if parent_patterns:
+        parent = relative_parts[-1] if relative_parts else ""
+        if not any(fnmatch.fnmatch(parent, pattern) for pattern in parent_patterns):
+            return False
+    min_depth = rule.get("site_packages_depth")
+    if min_depth is not None and _site_packages_depth(relative_parts) + 1 < min_depth:
+        return False
+    return True
+
+
+def _tree_size(path: str) -> int:
+    """
+    Calculate the size of a directory tree in bytes.
+
+    Args:
+        path (str): Directory to measure.
+
+    Returns:
+        int: Total size of regular files in bytes.
+    """
+    total_bytes = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total_bytes += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                continue
+    return total_bytes
+
+
+def find_slim_targets(venv_path: str, rules: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Tuple[str, str, bool, int]]:
+    """
+    Find everything the slim rules would remove, in a single traversal.
+
+    Matched directories are not descended into by the main walk, so no part
+    of the venv is visited twice.
+
+    Args:
+        venv_path (str): Path to the venv folder.
+        rules (Optional[Dict]): Rule set, defaults to DEFAULT_SLIM_RULES.
+
+    Returns:
+        List[Tuple[str, str, bool, int]]: (rule_name, path, is_dir, size_bytes)
+    """
+    rules = DEFAULT_SLIM_RULES if rules is None else rules
+    targets = []
+
+    for dirpath, dirnames, filenames in os.walk(venv_path):
+        relative = os.path.relpath(dirpath, venv_path)
+        relative_parts = [] if relative == "." else relative.split(os.sep)
+        active_rules = [(name, rule) for name, rule in rules.items() if _rule_applies(rule, relative_parts)]
+        if not active_rules:
+            continue
+
+        kept_dirs = []
+        for dirname in dirnames:
+            full_path = os.path.join(dirpath, dirname)
+            matched = next((
+                name for name, rule in active_rules
+                if any(fnmatch.fnmatch(dirname, pattern) for pattern in rule.get("dir_patterns", []))
+            ), None)
+            if matched and not os.path.islink(full_path):
+                targets.append((matched, full_path, True, _tree_size(full_path)))
+            else:
+                kept_dirs.append(dirname)
+        dirnames[:] = kept_dirs
+
+        for filename in filenames:
+            matched = next((
+                name for name, rule in active_rules
+                if any(fnmatch.fnmatch(filename, pattern) for pattern in rule.get("file_patterns", []))
+            ), None)
+            if matched:
+                full_path = os.path.join(dirpath, filename)
+                try:
+                    targets.append((matched, full_path, False, os.lstat(full_path).st_size))
+                except OSError:
+                    continue
+
+    return targets
+
+
+def _remove_target(path: str, is_dir: bool) -> Optional[str]:
+    """
+    Remove a single slim target.
+
+    Args:
+        path (str): File or directory to remove.
+        is_dir (bool): Whether the target is a directory.
+
+    Returns:
+        Optional[str]: Error message, or None on success.
+    """
+    try:
+        if is_dir:
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+        return None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        return f"Error removing {path}: {str(e)}"
+
+
+def slim_venv(venv_path: str, rules: Optional[Dict[str, Dict[str, Any]]] = None, dry_run: bool = True,
+              max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Remove files not needed at runtime from a virtual environment.
+
+    Args:
+        venv_path (str): Path to the venv folder.
+        rules (Optional[Dict]): Rule set, defaults to DEFAULT_SLIM_RULES.
+        dry_run (bool): If True, only report what would be removed.
+        max_workers (Optional[int]): Thread pool size for removals.
+
+    Returns:
+        Dict containing:
+            - venv_path: Path to the venv folder
+            - size_mb: Space reclaimed (or reclaimable in dry run) in MB, so
+              reports can be passed to calculate_space_freed
+            - rules: Per-rule dictionaries with count and bytes
+            - total: Number of targets found
+            - successful: Number of targets removed (or that would be)
+            - failed: Number of targets that could not be removed
+            - failures: List of error messages
+
+    Raises:
+        ValueError: If venv_path is empty or not a directory.
+    """
+    if not venv_path or not venv_path.strip():
+        raise ValueError("venv_path cannot be empty")
+
+    if not os.path.isdir(venv_path):
+        raise ValueError(f"Venv path is not a directory: {venv_path}")
+
+    targets = find_slim_targets(venv_path, rules)
+    rule_names = DEFAULT_SLIM_RULES if rules is None else rules
+    rule_report = {name: {"count": 0, "bytes": 0} for name in rule_names}
+
+    if dry_run:
+        errors: List[Optional[str]] = [None] * len(targets)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            errors = list(executor.map(lambda target: _remove_target(target[1], target[2]), targets))
+
+    reclaimed = 0
+    failures = []
+    for (rule_name, _, _, size_bytes), error in zip(targets, errors):
+        if error:
+            failures.append(error)
+            continue
+        rule_report[rule_name]["count"] += 1
+        rule_report[rule_name]["bytes"] += size_bytes
+        reclaimed += size_bytes
+
+    return {
+        "venv_path": venv_path,
+        "size_mb": reclaimed / (1024 * 1024),
+        "rules": rule_report,
+        "total": len(targets),
+        "successful": len(targets) - len(failures),
+        "failed": len(failures),
+        "failures": failures
+    }
+
+
+def slim_multiple_venvs(venv_paths: List[str], rules: Optional[Dict[str, Dict[str, Any]]] = None,
+                        dry_run: bool = True, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Slim multiple virtual environments.
+
+    Args:
+        venv_paths (List[str]): List of venv folder paths to slim.
+        rules (Optional[Dict]): Rule set, defaults to DEFAULT_SLIM_RULES.
+        dry_run (bool): If True, only report what would be removed.
+        max_workers (Optional[int]): Thread pool size for removals.
+
+    Returns:
+        Dict containing:
+            - total: Total number of venvs attempted
+            - successful: Number of venvs slimmed without errors
+            - failed: Number of venvs with errors
+            - reports: List of slim_venv reports
+            - results: List of tuples (venv_path, success, message)
+    """
+    reports = []
+    results = []
+    successful = 0
+    failed = 0
+
+    for venv_path in venv_paths:
+        try:
+            report = slim_venv(venv_path, rules, dry_run, max_workers)
+        except ValueError as e:
+            results.append((venv_path, False, str(e)))
+            failed += 1
+            continue
+
+        reports.append(report)
+        prefix = "[DRY RUN] Would reclaim" if dry_run else "Reclaimed"
+        if report["failed"]:
+            results.append((venv_path, False, f"{prefix} {report['size_mb']:.1f} MB with {report['failed']} errors: {venv_path}"))
+            failed += 1
+        else:
+            results.append((venv_path, True, f"{prefix} {report['size_mb']:.1f} MB: {venv_path}"))
+            successful += 1
+
+    return {
+        "total": len(venv_paths),
+        "successful": successful,
+        "failed": failed,
+        "reports": reports,
+        "results": results
+    }
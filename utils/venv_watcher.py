@@ -0,0 +1,501 @@
+"""
+Utility module keeping a venv inventory live with inotify.
+
+A VenvWatcher scans the tree once, then subscribes to inotify events on the
+directories it walked and on each artifact and its site-packages folders.
+Records are added, removed or re-measured as projects and environments
+change, so "what is reclaimable now" is answered from memory. The set of
+venvs used by running interpreters is cached too and refreshed at most
+every active_refresh_seconds, by the watcher thread when it runs. On systems
+without inotify, after an event queue overflow or when the watch limit is
+reached, periodic rescans keep the inventory current instead.
+"""
+import os
+import time
+import errno
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+from typing import List, Dict, Any, Optional, Tuple, Set
+from utils.venv_scanner import (
+    detect_artifact_type,
+    validate_artifact_types,
+    build_artifact_info,
+    finalize_artifact_list,
+    get_active_venv_paths,
+    get_site_packages_dirs,
+    PROJECT_MARKER_FILES
+)
+from utils.venv_policy import compile_policy, default_policy_text
+
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Directories walked while searching for artifacts only need structural events.
+TREE_WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+# Artifact folders also report file writes, e.g. pip installing into site-packages.
+ARTIFACT_WATCH_MASK = TREE_WATCH_MASK | IN_MODIFY | IN_CLOSE_WRITE
+DEFAULT_RESCAN_INTERVAL = 600.0
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_ACTIVE_REFRESH_SECONDS = 5.0
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Thin ctypes wrapper around the Linux inotify API."""
+
+    def __init__(self, libc, fd: int):
+        """
+        Wrap an inotify file descriptor.
+
+        Args:
+            libc (ctypes.CDLL): The C library.
+            fd (int): Descriptor returned by inotify_init1.
+        """
+        self._libc = libc
+        self.fd = fd
+
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        """
+        Open an inotify instance.
+
+        Returns:
+            Optional[_Inotify]: The instance, or None if inotify is unavailable.
+        """
+        library = ctypes.util.find_library("c")
+        if library is None:
+            return None
+        try:
+            libc = ctypes.CDLL(library, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """
+        Watch a directory.
+
+        Args:
+            path (str): Directory to watch.
+            mask (int): inotify event mask.
+
+        Returns:
+            int: The watch descriptor.
+
+        Raises:
+            OSError: If the watch cannot be added (e.g. ENOSPC at the limit).
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """Remove a watch, ignoring watches the kernel already dropped."""
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """
+        Read pending events.
+
+        Args:
+            timeout (float): Seconds to wait for the first event.
+
+        Returns:
+            List[Tuple[int, int, str]]: (wd, mask, name) triples.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        """Close the inotify descriptor and all its watches."""
+        os.close(self.fd)
+
+
+class VenvWatcher:
+    """
+    A live inventory of the artifacts under one root directory.
+
+    Use rescan() (or start()) to build the inventory, then process_events()
+    or the background thread started by start() to keep it current.
+    """
+
+    def __init__(self, root_dir: str, days_unused: int = 60, min_size_mb: int = 200,
+                 artifact_types: Optional[Tuple[str, ...]] = ("venv",), policy: Optional[str] = None,
+                 rescan_interval: Optional[float] = DEFAULT_RESCAN_INTERVAL,
+                 settle_seconds: float = DEFAULT_SETTLE_SECONDS, use_inotify: bool = True,
+                 active_refresh_seconds: float = DEFAULT_ACTIVE_REFRESH_SECONDS):
+        """
+        Configure a watcher.
+
+        Args:
+            root_dir (str): Root directory to watch.
+            days_unused (int): Minimum age in days for deletion criteria.
+            min_size_mb (int): Minimum size in MB for deletion criteria.
+            artifact_types (Optional[Tuple[str, ...]]): Artifact types to
+                track, defaults to venvs only; None means all types.
+            policy (Optional[str]): Policy text deciding meets_criteria.
+            rescan_interval (Optional[float]): Seconds between safety-net
+                full rescans; None disables them while inotify works.
+            settle_seconds (float): Quiet time after the last change before
+                a modified artifact is re-measured.
+            use_inotify (bool): If False, rely on periodic rescans only.
+            active_refresh_seconds (float): Maximum age of the cached set of
+                venvs used by running interpreters, which decides in_use.
+
+        Raises:
+            ValueError: If root_dir is not a directory or an argument is invalid.
+        """
+        if not os.path.isdir(root_dir):
+            raise ValueError(f"Root path is not a directory: {root_dir}")
+
+        if rescan_interval is not None and rescan_interval <= 0:
+            raise ValueError("rescan_interval must be positive")
+
+        self.root_dir = os.path.abspath(root_dir)
+        self.days_unused = days_unused
+        self.min_size_mb = min_size_mb
+        self.artifact_types = validate_artifact_types(artifact_types)
+        self.policy = policy or default_policy_text(days_unused, min_size_mb)
+        compile_policy(self.policy)
+        self.rescan_interval = rescan_interval
+        self.settle_seconds = settle_seconds
+        self.active_refresh_seconds = active_refresh_seconds
+
+        self._inotify = _Inotify.create() if use_inotify else None
+        self._watches: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._watch_paths: Dict[str, int] = {}
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._measured_at: Dict[str, float] = {}
+        self._dirty: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_rescan = 0.0
+        self._active_paths: Optional[Set[str]] = None
+        self._active_checked = 0.0
+        self.rescans = 0
+
+    @property
+    def uses_inotify(self) -> bool:
+        """True while changes are delivered by inotify rather than rescans."""
+        return self._inotify is not None
+
+    def _fall_back_to_polling(self, reason: str) -> None:
+        """Stop using inotify and rely on periodic rescans."""
+        print(f"Watcher falling back to periodic rescans: {reason}")
+        self._inotify.close()
+        self._inotify = None
+        self._watches.clear()
+        self._watch_paths.clear()
+        if self.rescan_interval is None:
+            self.rescan_interval = DEFAULT_RESCAN_INTERVAL
+
+    def _active(self, refresh: bool = False) -> Set[str]:
+        """
+        Return the cached venv paths of running interpreters.
+
+        Args:
+            refresh (bool): Look them up even if the cache is still fresh.
+
+        Returns:
+            Set[str]: Result of get_active_venv_paths, at most
+                active_refresh_seconds old.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if refresh or self._active_paths is None or now - self._active_checked >= self.active_refresh_seconds:
+                self._active_paths = get_active_venv_paths()
+                self._active_checked = now
+            return self._active_paths
+
+    def _add_watch(self, path: str, artifact_path: Optional[str]) -> None:
+        """
+        Watch a directory, tagging it with the artifact it belongs to.
+
+        Args:
+            path (str): Directory to watch.
+            artifact_path (Optional[str]): Owning artifact, or None for
+                directories walked while searching for artifacts.
+        """
+        if self._inotify is None:
+            return
+        mask = TREE_WATCH_MASK if artifact_path is None else ARTIFACT_WATCH_MASK
+        try:
+            wd = self._inotify.add_watch(path, mask)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                self._fall_back_to_polling("inotify watch limit reached")
+            return
+        self._watches[wd] = (path, artifact_path)
+        self._watch_paths[path] = wd
+
+    def _drop_watches_under(self, path: str, include_self: bool = True) -> None:
+        """Remove the watches of a directory and everything below it."""
+        prefix = path + os.sep
+        for watched_path in [p for p in self._watch_paths if p.startswith(prefix) or (include_self and p == path)]:
+            wd = self._watch_paths.pop(watched_path)
+            self._watches.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.rm_watch(wd)
+
+    def _drop_records_under(self, path: str) -> None:
+        """Forget every artifact at or below a path."""
+        prefix = path + os.sep
+        for artifact_path in [p for p in self._records if p == path or p.startswith(prefix)]:
+            del self._records[artifact_path]
+            self._measured_at.pop(artifact_path, None)
+            self._dirty.pop(artifact_path, None)
+
+    def _measure(self, artifact_path: str, artifact_type: str) -> None:
+        """Build or rebuild the record of one artifact and watch it."""
+        try:
+            record = build_artifact_info(artifact_path, artifact_type)
+        except OSError:
+            self._drop_records_under(artifact_path)
+            return
+        self._records[artifact_path] = finalize_artifact_list([record], self.root_dir, self.policy, self._active())[0]
+        self._measured_at[artifact_path] = time.time()
+        self._dirty.pop(artifact_path, None)
+        self._add_watch(artifact_path, artifact_path)
+        if artifact_type == "venv":
+            for site_packages in get_site_packages_dirs(artifact_path):
+                self._add_watch(site_packages, artifact_path)
+
+    def _walk(self, top: str, found: Dict[str, str]) -> None:
+        """
+        Walk a subtree, watching its directories and collecting artifacts.
+
+        Args:
+            top (str): Directory to walk.
+            found (Dict[str, str]): Receives artifact_path -> artifact_type.
+        """
+        for dirpath, dirnames, filenames in os.walk(top):
+            self._add_watch(dirpath, None)
+            kept_dirnames = []
+            for dirname in dirnames:
+                artifact_type = detect_artifact_type(dirname, filenames, self.artifact_types)
+                if artifact_type is None:
+                    kept_dirnames.append(dirname)
+                else:
+                    found[os.path.join(dirpath, dirname)] = artifact_type
+            dirnames[:] = kept_dirnames
+
+    def _rescan_subtree(self, top: str, remeasure: bool) -> None:
+        """
+        Reconcile the inventory below a directory with the filesystem.
+
+        Args:
+            top (str): Directory whose subtree is rescanned.
+            remeasure (bool): If True, re-measure artifacts already known.
+        """
+        found: Dict[str, str] = {}
+        self._walk(top, found)
+        prefix = top + os.sep
+        for artifact_path in [p for p in self._records if p.startswith(prefix) and p not in found]:
+            self._drop_records_under(artifact_path)
+        for artifact_path, artifact_type in found.items():
+            known = self._records.get(artifact_path)
+            if known is None or remeasure or known["artifact_type"] != artifact_type:
+                self._drop_watches_under(artifact_path)
+                self._measure(artifact_path, artifact_type)
+
+    def rescan(self) -> None:
+        """
+        Rebuild the inventory with a full walk of the root directory.
+
+        Artifacts already known are re-measured only when no inotify events
+        were available to track them.
+        """
+        with self._lock:
+            self._active(refresh=True)
+            self._rescan_subtree(self.root_dir, remeasure=self.rescans > 0 and self._inotify is None)
+            self._last_rescan = time.monotonic()
+            self.rescans += 1
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> None:
+        """Apply one inotify event to the inventory."""
+        if mask & IN_Q_OVERFLOW:
+            self._rescan_subtree(self.root_dir, remeasure=True)
+            return
+        watch = self._watches.get(wd)
+        if watch is None:
+            return
+        dir_path, artifact_path = watch
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            if self._watch_paths.get(dir_path) == wd:
+                del self._watch_paths[dir_path]
+            return
+        if artifact_path is not None:
+            if artifact_path in self._records:
+                self._dirty[artifact_path] = time.monotonic()
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            return
+
+        path = os.path.join(dir_path, name)
+        if not mask & IN_ISDIR:
+            if name in PROJECT_MARKER_FILES:
+                # A project file decides whether sibling build/dist folders are artifacts.
+                self._rescan_subtree(dir_path, remeasure=False)
+            return
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            self._drop_records_under(path)
+            self._drop_watches_under(path)
+        elif mask & (IN_CREATE | IN_MOVED_TO):
+            try:
+                filenames = [entry.name for entry in os.scandir(dir_path) if not entry.is_dir()]
+            except OSError:
+                return
+            artifact_type = detect_artifact_type(name, filenames, self.artifact_types)
+            if artifact_type is not None:
+                self._measure(path, artifact_type)
+            elif os.path.isdir(path) and not os.path.islink(path):
+                self._rescan_subtree(path, remeasure=False)
+
+    def process_events(self, timeout: float = 0.0) -> int:
+        """
+        Apply pending changes to the inventory.
+
+        Reads inotify events, re-measures artifacts that have been quiet for
+        settle_seconds and runs a full rescan when one is due.
+
+        Args:
+            timeout (float): Seconds to wait for the first event.
+
+        Returns:
+            int: Number of inotify events processed.
+        """
+        events = []
+        if self._inotify is not None:
+            events = self._inotify.read_events(timeout)
+        elif timeout > 0:
+            self._stop_event.wait(timeout)
+
+        with self._lock:
+            for wd, mask, name in events:
+                self._handle_event(wd, mask, name)
+            settled = time.monotonic() - self.settle_seconds
+            for artifact_path in [p for p, changed in self._dirty.items() if changed <= settled]:
+                record = self._records.get(artifact_path)
+                if record is not None:
+                    self._drop_watches_under(artifact_path)
+                    self._measure(artifact_path, record["artifact_type"])
+            if self.rescan_interval is not None and time.monotonic() - self._last_rescan >= self.rescan_interval:
+                self.rescan()
+            else:
+                # Keep the cache warm so inventory() rarely walks the process table
+                self._active()
+        return len(events)
+
+    def _run(self) -> None:
+        """Background loop of the watcher thread."""
+        while not self._stop_event.is_set():
+            try:
+                self.process_events(timeout=1.0)
+            except Exception as e:
+                print(f"Watcher error: {e}")
+
+    def start(self) -> threading.Thread:
+        """
+        Build the inventory and keep it current in a daemon thread.
+
+        Returns:
+            threading.Thread: The watcher thread.
+        """
+        self.rescan()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Stop the watcher thread and release the inotify instance."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            self._watches.clear()
+            self._watch_paths.clear()
+
+    def inventory(self) -> List[Dict[str, Any]]:
+        """
+        Return the current inventory in the scan_for_artifacts format.
+
+        Ages are advanced by the time elapsed since each record was measured
+        and in_use and meets_criteria are re-evaluated, without touching the
+        artifact folders. in_use comes from the cached set of active venvs,
+        so it can be up to active_refresh_seconds old.
+
+        Returns:
+            List[Dict]: Copies of the artifact records, sorted by path.
+        """
+        now = time.time()
+        with self._lock:
+            records = []
+            for artifact_path in sorted(self._records):
+                record = dict(self._records[artifact_path])
+                record["age_days"] += (now - self._measured_at[artifact_path]) / (60 * 60 * 24)
+                records.append(record)
+            active_paths = self._active()
+        return finalize_artifact_list(records, self.root_dir, self.policy, active_paths)
+
+    def reclaimable(self, policy: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the artifacts that can be reclaimed right now.
+
+        Args:
+            policy (Optional[str]): Policy text; defaults to the watcher's policy.
+
+        Returns:
+            List[Dict]: Records meeting the policy.
+
+        Raises:
+            ValueError: If the policy is malformed.
+        """
+        records = self.inventory()
+        if policy is None:
+            return [record for record in records if record["meets_criteria"]]
+        return compile_policy(policy).filter(records)
+
+    def watched_paths(self) -> Set[str]:
+        """Return the directories currently watched with inotify."""
+        with self._lock:
+            return set(self._watch_paths)
@@ -5,11 +5,25 @@ Provides a graphical interface for scanning and removing unused venv folders.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
+import sqlite3
 import threading
 from typing import List, Dict
-from utils.venv_scanner import scan_for_venvs
-from utils.venv_deleter import delete_multiple_venvs, calculate_space_freed
+from utils.venv_scanner import get_folder_size
+from utils.size_estimator import refine_sizes_in_background
+from utils.venv_deleter import (delete_multiple_venvs, calculate_space_freed, calculate_space_freed_by_type,
+                                format_deletion_failures)
 from utils.requirements_generator import generate_requirements_for_multiple_venvs
+from utils.snapshot_cache import SnapshotCache
+from utils.lock_snapshot import lock_multiple_venvs
+from utils.venv_slimmer import slim_multiple_venvs
+from utils.reclaim_planner import plan_reclaim
+from utils.venv_policy import compile_policy, default_policy_text
+from utils.scan_runner import ScanRunner
+from utils.result_exporter import create_exporter, export_records, RESULT_FIELDS, RESULT_TABLE, DEFAULT_HISTORY_PATH
+from utils.scan_result_file import write_scan_results, load_scan_results, DEFAULT_RESULT_PATH
+from utils.size_history import record_scan_history
+from utils.record_sizer import measure_venv_by_record, format_package_breakdown
+from utils.scan_progress import ScanProgress, format_progress
 
 
 class VenvRemoverGUI:
@@ -37,10 +51,22 @@ class VenvRemoverGUI:
         self.min_size_mb_var = tk.IntVar(value=200)
         self.dry_run_var = tk.BooleanVar(value=True)
         self.create_requirements_var = tk.BooleanVar(value=True)
+        self.verify_lock_var = tk.BooleanVar(value=True)
+        self.archive_before_delete_var = tk.BooleanVar(value=False)
+        self.include_artifacts_var = tk.BooleanVar(value=False)
+        self.target_gb_var = tk.DoubleVar(value=10.0)
+        self.estimate_sizes_var = tk.BooleanVar(value=False)
+        self.policy_var = tk.StringVar(value="")
+        self.resumable_scan_var = tk.BooleanVar(value=False)
+        self.watch_var = tk.BooleanVar(value=False)
+        self.record_sizes_var = tk.BooleanVar(value=False)
+        self.archive_store_var = tk.StringVar(value=os.path.join(os.path.expanduser("~"), ".venv_remover", "archive"))
         
         # Data storage
         self.venv_list: List[Dict] = []
         self.selected_indices: List[int] = []
+        self.scan_runner = ScanRunner()
+        self.snapshot_cache = SnapshotCache()
         
         self._setup_ui()
     
@@ -75,6 +101,36 @@ class VenvRemoverGUI:
         
         # Create Requirements
         ttk.Checkbutton(config_frame, text="Create requirements.txt before deletion", variable=self.create_requirements_var).grid(row=4, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        # Verified Lock Snapshot
+        ttk.Checkbutton(config_frame, text="Hash installed files into the lock snapshot (slower)", variable=self.verify_lock_var).grid(row=13, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        # Archive Before Deletion
+        ttk.Checkbutton(config_frame, text="Archive venv before deletion (restorable)", variable=self.archive_before_delete_var).grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(config_frame, textvariable=self.archive_store_var, width=50).grid(row=5, column=1, padx=5, pady=5)
+        
+        # Other Artifacts
+        ttk.Checkbutton(config_frame, text="Also find node_modules, tox/nox, caches and build/dist folders", variable=self.include_artifacts_var).grid(row=6, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        # Fast Size Estimates
+        ttk.Checkbutton(config_frame, text="Fast size estimates (refined in background)", variable=self.estimate_sizes_var).grid(row=8, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        # Resumable Scan
+        ttk.Checkbutton(config_frame, text="Resumable scan (checkpointed, continues after interruption)", variable=self.resumable_scan_var).grid(row=10, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        # Watch Mode
+        ttk.Checkbutton(config_frame, text="Keep inventory live (watch for changes, instant rescans)", variable=self.watch_var).grid(row=11, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        # Metadata Sizing
+        ttk.Checkbutton(config_frame, text="Size venvs from package metadata (dist-info RECORD, faster)", variable=self.record_sizes_var).grid(row=12, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        # Policy
+        ttk.Label(config_frame, text="Policy (optional):").grid(row=9, column=0, sticky="w", padx=5, pady=5)
+        ttk.Entry(config_frame, textvariable=self.policy_var, width=50).grid(row=9, column=1, padx=5, pady=5)
+        
+        # Free Space Target
+        ttk.Label(config_frame, text="Free Target (GB):").grid(row=7, column=0, sticky="w", padx=5, pady=5)
+        ttk.Spinbox(config_frame, from_=1, to=100000, textvariable=self.target_gb_var, width=20).grid(row=7, column=1, sticky="w", padx=5, pady=5)
     
     def _create_action_frame(self):
         """Create the action buttons frame."""
@@ -82,9 +138,14 @@ class VenvRemoverGUI:
         action_frame.pack(fill="x", padx=10, pady=5)
         
         ttk.Button(action_frame, text="Scan for Venvs", command=self._scan_venvs).pack(side="left", padx=5)
+        ttk.Button(action_frame, text="Load Last Scan", command=self._load_last_scan).pack(side="left", padx=5)
+        ttk.Button(action_frame, text="Plan Free Target", command=self._plan_target).pack(side="left", padx=5)
         ttk.Button(action_frame, text="Select All", command=self._select_all).pack(side="left", padx=5)
         ttk.Button(action_frame, text="Deselect All", command=self._deselect_all).pack(side="left", padx=5)
         ttk.Button(action_frame, text="Delete Selected", command=self._delete_selected).pack(side="left", padx=5)
+        ttk.Button(action_frame, text="Slim Selected", command=self._slim_selected).pack(side="left", padx=5)
+        ttk.Button(action_frame, text="Package Sizes", command=self._show_package_sizes).pack(side="left", padx=5)
+        ttk.Button(action_frame, text="Export Results", command=self._export_results).pack(side="left", padx=5)
         ttk.Button(action_frame, text="Refresh", command=self._refresh_display).pack(side="left", padx=5)
     
     def _create_treeview_frame(self):
@@ -101,7 +162,7 @@ class VenvRemoverGUI:
         
         self.tree = ttk.Treeview(
             tree_frame,
-            columns=("Project", "Path", "Age", "Size", "Status"),
+            columns=("Project", "Type", "Path", "Age", "Size", "Status"),
             show="tree headings",
             yscrollcommand=tree_scroll_y.set,
             xscrollcommand=tree_scroll_x.set,
@@ -114,6 +175,7 @@ class VenvRemoverGUI:
         # Configure columns
         self.tree.heading("#0", text="Select")
         self.tree.heading("Project", text="Project Name")
+        self.tree.heading("Type", text="Type")
         self.tree.heading("Path", text="Venv Path")
         self.tree.heading("Age", text="Age (Days)")
         self.tree.heading("Size", text="Size (MB)")
@@ -121,6 +183,7 @@ class VenvRemoverGUI:
         
         self.tree.column("#0", width=50, stretch=False)
         self.tree.column("Project", width=150)
+        self.tree.column("Type", width=100)
         self.tree.column("Path", width=400)
         self.tree.column("Age", width=100)
         self.tree.column("Size", width=100)
@@ -162,22 +225,112 @@ class VenvRemoverGUI:
         thread.daemon = True
         thread.start()
     
+    def _load_last_scan(self):
+        """Reload the results of the previous scan without rescanning."""
+        if not os.path.exists(DEFAULT_RESULT_PATH):
+            messagebox.showinfo("Info", "No saved scan results found")
+            return
+        try:
+            self.venv_list = load_scan_results(DEFAULT_RESULT_PATH)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Load Error", f"Error loading scan results: {str(e)}")
+            return
+        self._update_treeview()
+        self.status_label.config(text=f"Loaded {len(self.venv_list)} venvs from the last scan.")
+    
     def _perform_scan(self):
         """Perform the actual scanning operation."""
         try:
-            root_dir = self.root_dir_var.get()
-            days_unused = self.days_unused_var.get()
-            min_size_mb = self.min_size_mb_var.get()
+            artifact_types = None if self.include_artifacts_var.get() else ("venv",)
+            self.venv_list, estimated = self.scan_runner.run(
+                self.root_dir_var.get(),
+                self.days_unused_var.get(),
+                self.min_size_mb_var.get(),
+                artifact_types,
+                self.estimate_sizes_var.get(),
+                self.policy_var.get().strip() or None,
+                resumable=self.resumable_scan_var.get(),
+                watch=self.watch_var.get(),
+                size_mode="record" if self.record_sizes_var.get() else "walk",
+                progress=ScanProgress(self.root_dir_var.get(), lambda report: self.root.after(
+                    0, lambda: self.status_label.config(text=format_progress(report))))
+            )
             
-            self.venv_list = scan_for_venvs(root_dir, days_unused, min_size_mb)
+            write_scan_results(self.venv_list, DEFAULT_RESULT_PATH)
+            if not estimated:
+                record_scan_history(self.venv_list)
             
             # Update GUI in main thread
             self.root.after(0, self._update_treeview)
             self.root.after(0, lambda: self.status_label.config(text=f"Scan complete. Found {len(self.venv_list)} venvs."))
+            
+            if estimated:
+                venv_list = self.venv_list
+                refine_sizes_in_background(
+                    venv_list,
+                    lambda idx, size_mb: self.root.after(0, self._apply_exact_size, venv_list, idx, size_mb),
+                    get_folder_size
+                )
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Scan Error", f"Error during scan: {str(e)}"))
             self.root.after(0, lambda: self.status_label.config(text="Scan failed"))
     
+    def _export_results(self):
+        """Export the current scan results to CSV, JSON lines or SQLite."""
+        if not self.venv_list:
+            messagebox.showinfo("Info", "No scan results to export")
+            return
+        export_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl"), ("SQLite", "*.db")]
+        )
+        if not export_path:
+            return
+        try:
+            success, message = export_records(self.venv_list, export_path)
+        except ValueError as e:
+            success, message = False, str(e)
+        if success:
+            self.status_label.config(text=message)
+        else:
+            messagebox.showerror("Export Error", message)
+    
+    def _plan_target(self):
+        """Plan the fewest deletions that reach the free space target."""
+        self.status_label.config(text="Planning...")
+        self.root.update()
+        
+        thread = threading.Thread(target=self._perform_plan)
+        thread.daemon = True
+        thread.start()
+    
+    def _perform_plan(self):
+        """Run the reclaim planner and pre-select its deletion set."""
+        try:
+            size_hints = {venv["venv_path"]: venv["size_mb"] for venv in self.venv_list}
+            artifact_types = None if self.include_artifacts_var.get() else ("venv",)
+            plan = plan_reclaim(
+                self.root_dir_var.get(),
+                self.target_gb_var.get() * 1024,
+                self.days_unused_var.get(),
+                self.min_size_mb_var.get(),
+                size_hints,
+                artifact_types
+            )
+            self.venv_list = plan["selected"]
+            
+            reached = "reached" if plan["target_reached"] else "NOT reached"
+            status = (
+                f"Plan: {len(plan['selected'])} items, {int(plan['planned_mb'])} MB, target {reached} "
+                f"(measured {plan['sized']} of {plan['candidates']} candidates, {plan['in_use']} in use skipped)"
+            )
+            self.root.after(0, self._update_treeview)
+            self.root.after(0, self._select_all)
+            self.root.after(0, lambda: self.status_label.config(text=status))
+        except Exception as e:
+            self.root.after(0, lambda: messagebox.showerror("Plan Error", f"Error during planning: {str(e)}"))
+            self.root.after(0, lambda: self.status_label.config(text="Planning failed"))
+    
     def _update_treeview(self):
         """Update the treeview with scanned venv data."""
         # Clear existing items
@@ -189,9 +342,10 @@ class VenvRemoverGUI:
         # Populate treeview
         for idx, venv_info in enumerate(self.venv_list):
             project_name = venv_info["project_name"]
+            artifact_type = venv_info.get("artifact_type", "venv")
             venv_path = venv_info["venv_path"]
             age_days = f"{int(venv_info['age_days'])}"
-            size_mb = f"{int(venv_info['size_mb'])}"
+            size_mb = self._format_size(venv_info)
             meets_criteria = "Yes" if venv_info["meets_criteria"] else "No"
             
             self.tree.insert(
@@ -199,12 +353,30 @@ class VenvRemoverGUI:
                 "end",
                 iid=str(idx),
                 text="☐",
-                values=(project_name, venv_path, age_days, size_mb, meets_criteria),
+                values=(project_name, artifact_type, venv_path, age_days, size_mb, meets_criteria),
                 tags=("unchecked",)
             )
         
         self._update_space_label()
     
+    def _format_size(self, venv_info: Dict) -> str:
+        """Format a size, showing the confidence interval for estimates."""
+        if venv_info.get("size_exact", True):
+            return f"{int(venv_info['size_mb'])}"
+        return f"~{int(venv_info['size_mb'])} ({int(venv_info['size_low_mb'])}-{int(venv_info['size_high_mb'])})"
+    
+    def _apply_exact_size(self, venv_list: List[Dict], idx: int, size_mb: float):
+        """Replace an estimated size with the exact value in place."""
+        if venv_list is not self.venv_list:
+            return
+        venv_info = self.venv_list[idx]
+        venv_info.update(size_mb=size_mb, size_low_mb=size_mb, size_high_mb=size_mb, size_exact=True)
+        policy = self.policy_var.get().strip() or default_policy_text(self.days_unused_var.get(), self.min_size_mb_var.get())
+        venv_info["meets_criteria"] = compile_policy(policy).matches(venv_info)
+        self.tree.set(str(idx), "Size", self._format_size(venv_info))
+        self.tree.set(str(idx), "Status", "Yes" if venv_info["meets_criteria"] else "No")
+        self._update_space_label()
+    
     def _on_tree_click(self, event):
         """Handle tree item click for checkbox toggle."""
         region = self.tree.identify("region", event.x, event.y)
@@ -248,7 +420,12 @@ class VenvRemoverGUI:
         
         selected_venvs = [self.venv_list[i] for i in self.selected_indices]
         total_space = calculate_space_freed(selected_venvs)
-        self.space_label.config(text=f"Space: {int(total_space)} MB")
+        by_type = calculate_space_freed_by_type(selected_venvs)
+        if len(by_type) > 1:
+            breakdown = ", ".join(f"{name}: {int(size)}" for name, size in sorted(by_type.items()))
+            self.space_label.config(text=f"Space: {int(total_space)} MB ({breakdown})")
+        else:
+            self.space_label.config(text=f"Space: {int(total_space)} MB")
     
     def _delete_selected(self):
         """Delete the selected virtual environments."""
@@ -271,6 +448,9 @@ class VenvRemoverGUI:
         if create_requirements:
             message += "\nrequirements.txt will be created for each venv.\n"
         
+        if self.archive_before_delete_var.get():
+            message += f"\nEach venv will be archived to {self.archive_store_var.get()} first.\n"
+        
         message += "\nContinue?"
         
         confirm = messagebox.askyesno(f"Confirm {mode_text}", message)
@@ -287,18 +467,42 @@ class VenvRemoverGUI:
         self.root.update()
         
         requirements_result = None
+        # Every result is also streamed to the history database; without it the deletion still runs
+        history = None
+        history_warning = ""
+        try:
+            history = create_exporter(DEFAULT_HISTORY_PATH, RESULT_FIELDS, RESULT_TABLE, append=True)
+        except (OSError, sqlite3.Error) as e:
+            history_warning = f"Results not recorded in {DEFAULT_HISTORY_PATH}: {str(e)}"
         
-        # Generate requirements.txt if requested
-        if create_requirements:
-            self.status_label.config(text="Generating requirements.txt files...")
-            self.root.update()
-            requirements_result = generate_requirements_for_multiple_venvs(selected_venvs, overwrite=True)
+        def on_result(operation):
+            return history.result_callback(operation) if history is not None else lambda *result: None
         
-        # Perform deletion
-        self.status_label.config(text="Deleting venvs...")
-        self.root.update()
-        venv_paths = [venv["venv_path"] for venv in selected_venvs]
-        deletion_result = delete_multiple_venvs(venv_paths, dry_run)
+        try:
+            # Generate requirements.txt if requested
+            if create_requirements:
+                self.status_label.config(text="Generating requirements.txt files...")
+                self.root.update()
+                venvs_only = [venv for venv in selected_venvs if venv.get("artifact_type", "venv") == "venv"]
+                requirements_result = generate_requirements_for_multiple_venvs(venvs_only, overwrite=True,
+                                                                               on_result=on_result("requirements"),
+                                                                               cache=self.snapshot_cache)
+                lock_multiple_venvs(venvs_only, overwrite=True, verify=self.verify_lock_var.get(),
+                                    on_result=on_result("lock"))
+            
+            # Perform deletion
+            self.status_label.config(text="Deleting venvs...")
+            self.root.update()
+            venv_paths = [venv["venv_path"] for venv in selected_venvs]
+            archive_store = self.archive_store_var.get() if self.archive_before_delete_var.get() else None
+            operation = "dry_run_delete" if dry_run else "delete"
+            deletion_result = delete_multiple_venvs(venv_paths, dry_run, archive_store, on_result=on_result(operation))
+        finally:
+            if history is not None:
+                try:
+                    history.close()
+                except (OSError, sqlite3.Error) as e:
+                    history_warning = f"Results not recorded in {DEFAULT_HISTORY_PATH}: {str(e)}"
         
         # Build results message
         message = "=== Deletion Results ===\n"
@@ -313,18 +517,98 @@ class VenvRemoverGUI:
             message += f"Failed: {requirements_result['failed']}\n"
         
         if deletion_result['failed'] > 0:
-            failed_details = "\n".join([
-                msg for path, success, msg in deletion_result['results'] if not success
-            ])
-            message += f"\nFailed deletions:\n{failed_details[:500]}"
+            message += f"\n{format_deletion_failures(deletion_result)}"
+        message += f"\n{history_warning}" if history_warning else f"\nFull results: {DEFAULT_HISTORY_PATH}"
         
         messagebox.showinfo("Operation Results", message)
-        self.status_label.config(text="Operation complete")
+        self.status_label.config(text=f"Operation complete - {history_warning}" if history_warning else "Operation complete")
         
         # Refresh the display
         if not dry_run:
             self._scan_venvs()
     
+    def _show_package_sizes(self):
+        """Show the per-package size breakdown of the first selected venv."""
+        selected_venvs = [
+            self.venv_list[i] for i in self.selected_indices
+            if self.venv_list[i].get("artifact_type", "venv") == "venv"
+        ]
+        if not selected_venvs:
+            messagebox.showwarning("No Selection", "Please select a venv to break down.")
+            return
+        venv_path = selected_venvs[0]["venv_path"]
+        self.status_label.config(text=f"Measuring {venv_path}...")
+        self.root.update()
+        
+        # The validating walk can take a while on large venvs
+        thread = threading.Thread(target=self._perform_package_sizes, args=(venv_path,))
+        thread.daemon = True
+        thread.start()
+    
+    def _perform_package_sizes(self, venv_path):
+        """Measure one venv from its RECORD files and show the breakdown."""
+        try:
+            measurement = measure_venv_by_record(venv_path, validate=True)
+        except OSError as e:
+            self.root.after(0, lambda: messagebox.showerror("Package Sizes", f"Error measuring {venv_path}: {str(e)}"))
+            self.root.after(0, lambda: self.status_label.config(text="Measuring failed"))
+            return
+        breakdown = format_package_breakdown(measurement)
+        self.root.after(0, lambda: self.status_label.config(text=f"Measured {venv_path}"))
+        self.root.after(0, lambda: messagebox.showinfo("Package Sizes", f"{venv_path}\n\n{breakdown}"))
+    
+    def _slim_selected(self):
+        """Slim the selected virtual environments instead of deleting them."""
+        if not self.selected_indices:
+            messagebox.showwarning("No Selection", "Please select venvs to slim.")
+            return
+        
+        selected_venvs = [
+            self.venv_list[i] for i in self.selected_indices
+            if self.venv_list[i].get("artifact_type", "venv") == "venv"
+        ]
+        if not selected_venvs:
+            messagebox.showwarning("No Venvs", "Slimming only applies to virtual environments.")
+            return
+        venv_paths = [venv["venv_path"] for venv in selected_venvs]
+        dry_run = self.dry_run_var.get()
+        
+        self.status_label.config(text="Calculating slim savings...")
+        self.root.update()
+        preview = slim_multiple_venvs(venv_paths, dry_run=True)
+        slim_space = calculate_space_freed(preview["reports"])
+        delete_space = calculate_space_freed(selected_venvs)
+        
+        rule_totals: Dict[str, int] = {}
+        for report in preview["reports"]:
+            for rule_name, rule_report in report["rules"].items():
+                rule_totals[rule_name] = rule_totals.get(rule_name, 0) + rule_report["bytes"]
+        
+        message = f"Slimming {len(venv_paths)} venv(s) reclaims {int(slim_space)} MB"
+        message += f" (deleting would reclaim {int(delete_space)} MB).\n\n"
+        for rule_name, rule_bytes in rule_totals.items():
+            message += f"{rule_name}: {rule_bytes / (1024 * 1024):.1f} MB\n"
+        
+        if dry_run:
+            messagebox.showinfo("Slim Preview", message)
+            self.status_label.config(text="Slim preview complete")
+            return
+        
+        if not messagebox.askyesno("Confirm SLIM", message + "\nContinue?"):
+            self.status_label.config(text="Ready")
+            return
+        
+        self.status_label.config(text="Slimming venvs...")
+        self.root.update()
+        result = slim_multiple_venvs(venv_paths, dry_run=False)
+        reclaimed = calculate_space_freed(result["reports"])
+        messagebox.showinfo(
+            "Slim Results",
+            f"Slimmed: {result['successful']}\nFailed: {result['failed']}\nReclaimed: {int(reclaimed)} MB"
+        )
+        self.status_label.config(text="Slim complete")
+        self._scan_venvs()
+    
     def _refresh_display(self):
         """Refresh the venv display."""
         self._update_treeview()